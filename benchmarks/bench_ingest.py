@@ -0,0 +1,67 @@
+"""Uploads with sha1 of many files: hashing then uploading each file in turn, against the process pool pipeline.
+
+Run from the root directory of PyOpenload::
+
+    $ python -m benchmarks.bench_ingest --files 32 --size 32 --hash-workers 4
+
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from openload import OpenLoad
+from openload.ingest import file_sha1
+from openload.ratelimit import clock
+
+from .stub_server import StubServer
+
+
+def sequential(ol, paths):
+    for path in paths:
+        ol.upload_file(path, sha1=file_sha1(path))
+
+
+def pipelined(ol, paths, hash_workers, upload_workers):
+    for upload in ol.ingest(paths, hash_workers=hash_workers, upload_workers=upload_workers):
+        if not upload.ok:
+            raise upload.error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=16)
+    parser.add_argument('--size', type=float, default=16, help='size of each file in MB')
+    parser.add_argument('--hash-workers', type=int, default=None, help='hashing processes (default: cores)')
+    parser.add_argument('--upload-workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated server time in seconds')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='openload-bench-')
+    paths = []
+    for i in range(args.files):
+        paths.append(os.path.join(directory, 'file{0}.bin'.format(i)))
+        with open(paths[-1], 'wb') as f:
+            f.write(os.urandom(int(args.size * 1024 * 1024)))
+    total = args.files * args.size
+
+    try:
+        with StubServer(latency=args.latency) as server:
+            server.keep_uploads = False
+            with OpenLoad('login', 'key', pool_maxsize=args.upload_workers) as ol:
+                ol.api_url = server.api_url
+                for name, run in (('sequential', lambda: sequential(ol, paths)),
+                                  ('pipelined', lambda: pipelined(ol, paths, args.hash_workers, args.upload_workers))):
+                    start = clock()
+                    run()
+                    elapsed = clock() - start
+                    print('{name:>10}: {elapsed:6.2f} s, {rate:7.1f} MB/s'.format(name=name, elapsed=elapsed,
+                                                                              rate=total / elapsed))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Peak memory and time of decoding a big list_folder response whole against streaming its entries.
+
+Run from the root directory of PyOpenload (Python 3, uses tracemalloc)::
+
+    $ python -m benchmarks.bench_json --files 200000
+
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from openload import OpenLoad
+from openload.jsonstream import iter_result, loads
+
+from .stub_server import DEFAULT_RESULTS
+
+CHUNK_SIZE = 64 * 1024
+
+
+def response_body(count):
+    template = DEFAULT_RESULTS['file/listfolder']['files'][0]
+    files = [dict(template, linkextid='{0:012d}'.format(i), name='video {0}.mp4'.format(i), size=str(i * 1000))
+             for i in range(count)]
+    return json.dumps({'status': 200, 'msg': 'OK', 'result': {'folders': [], 'files': files}}).encode('utf-8')
+
+
+def chunks(body):
+    return (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+
+
+def whole(body):
+    return sum(int(f['size']) for f in loads(b''.join(chunks(body)))['result']['files'])
+
+
+def streamed(body):
+    return sum(int(f['size']) for _, f in iter_result(chunks(body), OpenLoad._check_status))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=200000)
+    args = parser.parse_args()
+
+    body = response_body(args.files)
+    print('{0} files, {1:.1f} MB body'.format(args.files, len(body) / 1e6))
+
+    for name, decode in (('whole', whole), ('streamed', streamed)):
+        tracemalloc.start()
+        start = time.time()
+        decode(body)
+        elapsed = time.time() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{name:>8}: peak {peak:8.1f} MB  {elapsed:.2f} s  {rate:.1f} MB/s'.format(
+            name=name, peak=peak / 1e6, elapsed=elapsed, rate=len(body) / 1e6 / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Per-call cost of the hooks: no hooks, empty Hooks and the Metrics collector, against the stub server.
+
+Run from the root directory of PyOpenload::
+
+    $ python -m benchmarks.bench_metrics --calls 5000
+
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+
+from openload import OpenLoad
+from openload.metrics import Hooks, Metrics
+from openload.ratelimit import clock
+
+from .stub_server import StubServer
+
+
+def measure(ol, calls):
+    ol.account_info()
+    start = clock()
+    for _ in range(calls):
+        ol.account_info()
+    return (clock() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=3, help='the best round of each setting is kept')
+    args = parser.parse_args()
+
+    settings = (('none', None), ('Hooks', Hooks()), ('Metrics', Metrics()))
+    best = {}
+    with StubServer() as server:
+        # Rounds of the settings are interleaved, so a slower period of the machine affects all of them.
+        for _ in range(args.rounds):
+            for name, hooks in settings:
+                with OpenLoad('login', 'key', hooks=hooks) as ol:
+                    ol.api_url = server.api_url
+                    per_call = measure(ol, args.calls)
+                best[name] = min(best.get(name, per_call), per_call)
+
+    for name, _ in settings:
+        print('{name:>8}: {per_call:.1f} us/call ({overhead:+.1f} us)'.format(
+            name=name, per_call=best[name] * 1e6, overhead=(best[name] - best['none']) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Memory held by list_folder files as dicts against openload.models.File records.
+
+Run from the root directory of PyOpenload (Python 3, uses tracemalloc)::
+
+    $ python -m benchmarks.bench_models --files 1000000
+
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from openload.models import File
+
+from .stub_server import DEFAULT_RESULTS
+
+
+def decoded_files(count):
+    """Files decoded from a json body, every string is a distinct object as with a real response."""
+    template = DEFAULT_RESULTS['file/listfolder']['files'][0]
+    files = [dict(template, linkextid='{0:012d}'.format(i), name='video {0}.mp4'.format(i), size=str(i * 1000))
+             for i in range(count)]
+    return json.loads(json.dumps(files))
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.time()
+    records = build()
+    elapsed = time.time() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return records, size, elapsed
+
+
+def total_size(records, as_dicts):
+    start = time.time()
+    total = sum(int(f['size']) for f in records) if as_dicts else sum(f.size for f in records)
+    return total, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=200000)
+    args = parser.parse_args()
+
+    for name, build in (('dict', lambda: decoded_files(args.files)),
+                        ('File', lambda: [File(f) for f in decoded_files(args.files)])):
+        records, size, elapsed = measure(build)
+        as_dicts = name == 'dict'
+        _, first = total_size(records, as_dicts)
+        _, second = total_size(records, as_dicts)
+        print('{name:>5}: {per_record:6.0f} bytes/file  built in {elapsed:.2f} s  '
+              'sum of sizes {first:.3f} s, again {second:.3f} s'.format(
+                  name=name, per_record=float(size) / args.files, elapsed=elapsed, first=first, second=second))
+        del records
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""remotedl/status traffic of polling each remote upload by id against the batched, adaptive RemoteUploadManager.
+
+Run from the root directory of PyOpenload::
+
+    $ python -m benchmarks.bench_remote --uploads 200 --interval 0.5
+
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openload import OpenLoad
+
+from .stub_server import StubServer
+
+
+def poll_each(ol, urls, interval, workers):
+    """The usual loop: add the upload, then poll its id every interval seconds until it finished."""
+    def upload(url):
+        upload_id = ol.remote_upload(url)['id']
+        while ol.remote_upload_status(remote_upload_id=upload_id)[upload_id]['status'] != 'finished':
+            time.sleep(interval)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(upload, urls))
+
+
+def managed(ol, urls, interval, workers):
+    for upload in ol.remote_upload_many(urls, workers=workers, min_interval=interval, max_interval=60):
+        upload.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--uploads', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between two polls of an upload')
+    parser.add_argument('--rate', type=float, default=10 * 1024 * 1024, help='bytes per second of remote uploads')
+    parser.add_argument('--workers', type=int, default=32)
+    args = parser.parse_args()
+
+    # Files of 1 to 100 MiB.
+    sizes = dict(('http://example.com/{0}.bin'.format(i), random.randint(1, 100) * 1024 * 1024)
+                 for i in range(args.uploads))
+
+    for name, run in (('poll each', poll_each), ('managed', managed)):
+        with StubServer() as server, OpenLoad('login', 'key', pool_maxsize=args.workers) as ol:
+            ol.api_url = server.api_url
+            server.simulate_remote_uploads(size=sizes.get, rate=args.rate)
+
+            start = time.time()
+            run(ol, list(sizes), args.interval, args.workers)
+            print('{name:>9}: {elapsed:6.1f} s  remotedl/status calls {calls}'.format(
+                name=name, elapsed=time.time() - start, calls=server.count('remotedl/status')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Per-call latency of a pooled keep-alive session against one connection per call.
+
+Run from the root directory of PyOpenload::
+
+    $ python -m benchmarks.bench_session --calls 2000
+
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import time
+
+import requests
+
+from openload import OpenLoad
+
+from .stub_server import StubServer
+
+
+class UnpooledOpenLoad(OpenLoad):
+    """OpenLoad as it used to be, every call goes through module level ``requests.get``."""
+
+    def _get(self, url, params=None):
+        params = dict(params or {}, login=self.login, key=self.key)
+        return self._process_response(requests.get(self.api_url + url, params).json())
+
+
+def measure(ol, calls):
+    latencies = []
+    for _ in range(calls):
+        start = time.time()
+        ol.file_info('72fA-_Lq8Ak3')
+        latencies.append(time.time() - start)
+
+    latencies.sort()
+    return {
+        'mean_ms': 1000 * sum(latencies) / len(latencies),
+        'p50_ms': 1000 * latencies[len(latencies) // 2],
+        'p99_ms': 1000 * latencies[int(len(latencies) * 0.99)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated server time in seconds')
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as server:
+        for name, cls in (('unpooled', UnpooledOpenLoad), ('pooled', OpenLoad)):
+            with cls('login', 'key') as ol:
+                ol.api_url = server.api_url
+                opened = server.connections
+                stats = measure(ol, args.calls)
+
+            print('{name:>9}: mean {mean_ms:.3f} ms  p50 {p50_ms:.3f} ms  p99 {p99_ms:.3f} ms  '
+                  'connections {connections}'.format(name=name, connections=server.connections - opened, **stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Cost of syncing a synthetic local tree with a stub account: first run, unchanged run, run after a few changes.
+
+Run from the root directory of PyOpenload::
+
+    $ python -m benchmarks.bench_sync --files 100000 --per-folder 1000 --changes 100
+
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+from openload import OpenLoad
+from openload.index import AccountIndex
+from openload.sync import sync
+
+from .stub_server import StubServer
+
+
+def content_of(i):
+    return 'file {0}\n'.format(i).encode('ascii')
+
+
+def build_tree(root, files, per_folder):
+    """Writes files small files in folders of per_folder files, returns the matching remote listings."""
+    listings = {'home': {'folders': [], 'files': []}}
+    for i in range(files):
+        folder = 'dir{0}'.format(i // per_folder)
+        if folder not in listings:
+            os.mkdir(os.path.join(root, folder))
+            listings['home']['folders'].append({'id': folder, 'name': folder})
+            listings[folder] = {'folders': [], 'files': []}
+
+        name = '{0}.mp4'.format(i)
+        content = content_of(i)
+        with open(os.path.join(root, folder, name), 'wb') as f:
+            f.write(content)
+        listings[folder]['files'].append({'linkextid': 'f{0}'.format(i), 'folderid': folder, 'name': name,
+                                          'size': str(len(content)), 'sha1': hashlib.sha1(content).hexdigest(),
+                                          'content_type': 'video/mp4', 'status': 'active'})
+    return listings
+
+
+def run(server, index, root, workers):
+    del server.requests[:]
+    start = time.time()
+    actions = sync(index, root, workers=workers)
+    elapsed = time.time() - start
+
+    kinds = Counter(action.kind for action in actions)
+    calls = Counter(endpoint for _, endpoint, _ in server.requests)
+    return elapsed, kinds, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--per-folder', type=int, default=1000)
+    parser.add_argument('--changes', type=int, default=100, help='files edited before the last run')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    state = tempfile.mkdtemp()
+    try:
+        start = time.time()
+        listings = build_tree(root, args.files, args.per_folder)
+        print('tree of {0} files written in {1:.1f} s'.format(args.files, time.time() - start))
+
+        with StubServer() as server, OpenLoad('login', 'key') as ol:
+            ol.api_url = server.api_url
+            server.set_result('file/listfolder', lambda params: listings[params.get('folder', 'home')])
+
+            with AccountIndex(ol, os.path.join(state, 'sync.sqlite')) as index:
+                step = max(args.files // max(args.changes, 1), 1)
+                for name in ('first', 'unchanged', 'changed'):
+                    if name == 'changed':
+                        for i in range(0, args.files, step)[:args.changes]:
+                            path = os.path.join(root, 'dir{0}'.format(i // args.per_folder), '{0}.mp4'.format(i))
+                            with open(path, 'ab') as f:
+                                f.write(b'edited\n')
+
+                    elapsed, kinds, calls = run(server, index, root, args.workers)
+                    print('{name:>9}: {elapsed:8.2f} s  actions {kinds}  api calls {calls}'.format(
+                        name=name, elapsed=elapsed, kinds=dict(kinds), calls=dict(calls)))
+    finally:
+        shutil.rmtree(root)
+        shutil.rmtree(state)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,576 @@
+"""Local stand-in for the openload.co API, used by the offline tests and the benchmarks.
+
+The server speaks HTTP/1.1 with keep-alive, answers every api endpoint used by :class:`openload.OpenLoad`
+with canned results (taken from the openload.co API documentation), accepts multipart uploads
+and serves the files added with :meth:`StubServer.add_file` (with Range requests).
+Latency, random server errors, 429 throttling and the size of listings are configurable,
+so the client can be measured against a slow or unreliable api (see :mod:`benchmarks.suite`).
+
+Example::
+
+    with StubServer() as server:
+        ol = OpenLoad('login', 'key')
+        ol.api_url = server.api_url
+        ol.account_info()
+
+"""
+from __future__ import absolute_import
+
+import copy
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+
+API_VERSION = '1'
+
+
+def file_info_result(params):
+    """Builds a ``file/info`` result for the comma-separated file ids in params."""
+    return dict((file_id, {
+        'id': file_id,
+        'status': 200,
+        'name': 'The quick brown fox.txt',
+        'size': 123456789012,
+        'sha1': '2fd4e1c67a2d28fced849ee1bb76e7391b93eb12',
+        'content_type': 'plain/text',
+    }) for file_id in params.get('file', '').split(',') if file_id)
+
+
+DEFAULT_RESULTS = {
+    'account/info': {
+        'extid': 'extuserid',
+        'email': 'jeff@openload.io',
+        'signup_at': '2015-01-09 23:59:54',
+        'storage_left': -1,
+        'storage_used': '32922117680',
+        'traffic': {'left': -1, 'used_24h': 0},
+        'balance': 0,
+    },
+    'file/dlticket': {
+        'ticket': '72fA-_Lq8Ak~~1440353112~n~~0~nXtN3RI-nsEa28Iq',
+        'captcha_url': False,
+        'captcha_w': False,
+        'captcha_h': False,
+        'wait_time': 0,
+        'valid_until': '2035-08-23 18:20:13',
+    },
+    'file/dl': {
+        'name': 'The quick brown fox.txt',
+        'size': 12345,
+        'sha1': '2fd4e1c67a2d28fced849ee1bb76e7391b93eb12',
+        'content_type': 'plain/text',
+        'upload_at': '2011-01-26 13:33:37',
+        'url': 'https://abvzps.example.com/dl/l/4spxX_-cSO4/The+quick+brown+fox.txt',
+        'token': '4spxX_-cSO4',
+    },
+    'file/info': file_info_result,
+    'file/ul': {
+        'url': None,
+        'valid_until': '2035-08-19 19:06:46',
+    },
+    'remotedl/add': {'id': '12', 'folderid': '4248'},
+    'remotedl/status': {
+        '24': {
+            'id': '24',
+            'remoteurl': 'http://proof.ovh.net/files/100Mio.dat',
+            'status': 'new',
+            'folderid': '4248',
+            'added': '2015-02-21 09:20:26',
+            'last_update': '2015-02-21 09:20:26',
+            'extid': False,
+            'url': False,
+        },
+    },
+    'file/listfolder': {
+        'folders': [
+            {'id': '5144', 'name': '.videothumb'},
+            {'id': '5792', 'name': '.subtitles'},
+        ],
+        'files': [
+            {
+                'name': 'big_buck_bunny.mp4.mp4',
+                'sha1': 'c6531f5ce9669d6547023d92aea4805b7c45d133',
+                'folderid': '4258',
+                'upload_at': '1419791256',
+                'status': 'active',
+                'size': '5114011',
+                'content_type': 'video/mp4',
+                'download_count': '48',
+                'cstatus': 'ok',
+                'link': 'https://openload.co/f/UPPjeAk--30/big_buck_bunny.mp4.mp4',
+                'linkextid': 'UPPjeAk--30',
+            },
+        ],
+    },
+    'file/renamefolder': True,
+    'file/rename': True,
+    'file/delete': True,
+    'file/convert': True,
+    'file/runningconverts': [],
+    'file/getsplash': 'https://openload.co/splash/4spxX_-cSO4/4spxX_-cSO4.jpg',
+}
+
+
+def listing_result(folders=0, files=0, folder_id='4258'):
+    """Builds a ``file/listfolder`` result with the given number of subfolders and files."""
+    template = DEFAULT_RESULTS['file/listfolder']['files'][0]
+    return {
+        'folders': [{'id': str(10000 + i), 'name': 'folder {0}'.format(i)} for i in range(folders)],
+        'files': [dict(template, folderid=folder_id, linkextid='{0:011d}'.format(i), name='video {0}.mp4'.format(i),
+                       link='https://openload.co/f/{0:011d}/video_{0}.mp4'.format(i)) for i in range(files)],
+    }
+
+
+def remote_status_result(count):
+    """Builds a ``remotedl/status`` result with the given number of remote uploads."""
+    template = DEFAULT_RESULTS['remotedl/status']['24']
+    return dict((str(i), dict(template, id=str(i), remoteurl='http://example.com/{0}.dat'.format(i)))
+                for i in range(1, count + 1))
+
+
+def _read_chunked(rfile):
+    chunks = []
+    while True:
+        size = int(rfile.readline().split(b';')[0].strip(), 16)
+        if not size:
+            rfile.readline()
+            return b''.join(chunks)
+        chunks.append(rfile.read(size))
+        rfile.readline()
+
+
+def _multipart_file(body, content_type):
+    """Returns (file name, file content) of the first file part of a multipart/form-data body."""
+    boundary = re.search(r'boundary=([^;]+)', content_type).group(1).strip('"').encode('ascii')
+    for part in body.split(b'--' + boundary):
+        headers, _, content = part.partition(b'\r\n\r\n')
+        match = re.search(br'filename="([^"]*)"', headers)
+        if match:
+            return match.group(1).decode('utf-8'), content[:-2]
+    return None, b''
+
+
+def _remote_status(job, rate):
+    now = time.time()
+    loaded = min(int(max(now - job['started'], 0) * rate), job['bytes_total'])
+    status = {'id': job['id'], 'remoteurl': job['remoteurl'], 'folderid': job['folderid'], 'extid': False,
+              'url': False, 'bytes_loaded': str(loaded), 'bytes_total': str(job['bytes_total'])}
+
+    if now < job['started']:
+        status['status'] = 'new'
+    elif job['fails'] and loaded >= job['bytes_total'] // 2:
+        status['status'] = 'error'
+    elif loaded < job['bytes_total']:
+        status['status'] = 'downloading'
+    else:
+        status.update(status='finished', extid='remote' + job['id'],
+                      url='https://openload.co/f/remote{id}/file.bin'.format(id=job['id']))
+    return status
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.stub.connection_opened()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, payload, headers=None, cut=None):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+        headers = dict({'Content-Type': 'application/json'}, **(headers or {}))
+        self.send_response(code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if cut is None:
+            self.wfile.write(body)
+        else:
+            # Connection dropped in the middle of the body.
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+
+    def _body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            return _read_chunked(self.rfile)
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = dict((key, values[-1]) for key, values in parse_qs(parsed.query).items())
+        self._send(*self.server.stub.handle('GET', parsed.path, params, None, self.headers))
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        body = self._body()
+        self._send(*self.server.stub.handle('POST', parsed.path, {}, body, self.headers))
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients closing their pooled connections
+
+
+class StubServer(object):
+    """Threaded HTTP server emulating openload.co API.
+
+    Args:
+        host (:obj:`str`, optional): address to bind to.
+        port (:obj:`int`, optional): port to bind to, a free port is picked by default.
+        latency (:obj:`float`, optional): seconds to sleep before answering each request (simulated server time).
+        jitter (:obj:`float`, optional): up to this many random seconds added to the latency of each request.
+        error_rate (:obj:`float`, optional): fraction of the api calls and uploads answered with a 500 status.
+        throttle (:obj:`float`, optional): api calls per second accepted (bursts of as many calls in a row),
+                                           calls above it are answered with a 429 status like the real api.
+        seed (:obj:`int`, optional): seed of the random jitter and errors, for repeatable runs.
+
+    Attributes:
+        connections (int): number of TCP connections accepted so far.
+        max_in_flight (int): highest number of requests handled at the same time.
+        requests (list): (method, endpoint, params) of every handled request,
+                         downloads are logged as ``download`` with their Range header in params.
+        uploads (list): (file name, content) of every uploaded file.
+        upload_result (dict): values overriding the result of uploads (sha1, ...).
+        files (dict): (file name, content) of the downloadable files by file id.
+        link_generation (int): download links of older generations are expired (HTTP 410).
+        accept_ranges (bool): If this is set to false, Range headers of downloads are ignored.
+        remote_jobs (list): remote uploads added since :meth:`simulate_remote_uploads`, oldest first.
+        conversions (dict): conversions started since :meth:`simulate_conversions` by file id.
+        keep_uploads (bool): If this is set to false, contents of uploaded files are not kept (None in uploads).
+        errors (int): number of calls answered with a random 500 status.
+        throttled (int): number of calls answered with a 429 status.
+
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0, throttle=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle = throttle
+        self.errors = 0
+        self.throttled = 0
+        self.keep_uploads = True
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        self.uploads = []
+        self.upload_result = {}
+        self.files = {}
+        self.link_generation = 0
+        self.accept_ranges = True
+        self.remote_jobs = []
+        self.conversions = {}
+        self.results = copy.deepcopy(DEFAULT_RESULTS)
+        self.statuses = {}
+        self.failures = {}
+        self._random = random.Random(seed)
+        self._tokens = throttle or 0
+        self._refilled = time.time()
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{host}:{port}/'.format(host=host, port=port)
+
+    @property
+    def api_url(self):
+        return '{url}{version}/'.format(url=self.url, version=API_VERSION)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+
+    def set_result(self, endpoint, result, status=200, msg='OK'):
+        """Overrides the result (and status) returned by an endpoint, result may be a callable taking params."""
+        self.results[endpoint] = result
+        self.statuses[endpoint] = (status, msg)
+
+    def fail(self, endpoint, times=1, status=500, msg='Internal Server Error', body=None):
+        """Makes the next calls to an endpoint (``upload`` for uploads) fail.
+
+        Args:
+            endpoint (str): endpoint to fail.
+            times (int): number of calls failing before the endpoint works again.
+            status (int): api status of the failures.
+            msg (str): api message of the failures.
+            body (bytes): raw (not json) body answered with HTTP 502 instead of an api error.
+
+        """
+        if body is not None:
+            failure = (502, body)
+        else:
+            failure = (200, {'status': status, 'msg': msg, 'result': None})
+
+        with self._lock:
+            self.failures.setdefault(endpoint, []).extend([failure] * times)
+
+    def set_listing(self, folders=0, files=0):
+        """Makes ``file/listfolder`` answer the given number of subfolders and files (payload size)."""
+        self.set_result('file/listfolder', listing_result(folders, files))
+
+    def set_remote_statuses(self, count):
+        """Makes ``remotedl/status`` answer the given number of remote uploads (payload size)."""
+        self.set_result('remotedl/status', remote_status_result(count))
+
+    def add_file(self, file_id, content, name='file.bin'):
+        """Makes a file downloadable, ``file/dl`` answers its download link for file_id."""
+        self.files[file_id] = (name, content)
+
+    def expire_links(self):
+        """Expires every download link given so far."""
+        with self._lock:
+            self.link_generation += 1
+
+    def simulate_remote_uploads(self, size=10 * 1024 * 1024, rate=100 * 1024 * 1024, start_delay=0.0, failing=()):
+        """Makes ``remotedl/add`` start simulated remote uploads, reported by ``remotedl/status`` as they progress.
+
+        ``remotedl/status`` answers the given id, or the latest ``limit`` (default 5) uploads like the real api.
+
+        Args:
+            size (int or callable): size of the remote files in bytes, or a callable taking the remote url.
+            rate (float): bytes per second downloaded by each remote upload.
+            start_delay (float): seconds each upload stays ``new`` before downloading.
+            failing (iterable): remote urls whose upload ends with the ``error`` status halfway through.
+
+        """
+        failing = set(failing)
+
+        def add(params):
+            total = size(params['url']) if callable(size) else size
+            started = time.time() + start_delay
+            with self._lock:
+                job = {'id': str(len(self.remote_jobs) + 1), 'remoteurl': params['url'],
+                       'folderid': params.get('folder', '4248'), 'bytes_total': total, 'started': started,
+                       'finished': started + total / float(rate), 'fails': params['url'] in failing}
+                self.remote_jobs.append(job)
+            return {'id': job['id'], 'folderid': job['folderid']}
+
+        def status(params):
+            with self._lock:
+                if params.get('id'):
+                    jobs = [job for job in self.remote_jobs if job['id'] == params['id']]
+                else:
+                    jobs = self.remote_jobs[::-1][:int(params.get('limit') or 5)]
+            return dict((job['id'], _remote_status(job, rate)) for job in jobs)
+
+        self.set_result('remotedl/add', add)
+        self.set_result('remotedl/status', status)
+
+    def simulate_conversions(self, duration=1.0, folder_of=None, failing=()):
+        """Makes ``file/convert`` start simulated conversions, listed by ``file/runningconverts`` until they finish.
+
+        Args:
+            duration (float): seconds a conversion takes, its progress grows linearly meanwhile.
+            folder_of (callable): takes a file id, returns the id of its folder (``Home`` folder if not provided).
+            failing (iterable): ids of the files whose conversion stays listed with the ``failed`` status.
+
+        """
+        failing = set(failing)
+
+        def convert(params):
+            folder_id = folder_of(params['file']) if folder_of is not None else None
+            with self._lock:
+                self.conversions[params['file']] = {'folder': folder_id, 'started': time.time()}
+            return True
+
+        def running(params):
+            now = time.time()
+            with self._lock:
+                conversions = [(file_id, conversion) for file_id, conversion in self.conversions.items()
+                               if conversion['folder'] == params.get('folder')]
+            result = []
+            for file_id, conversion in conversions:
+                progress = (now - conversion['started']) / duration
+                if progress < 1 or file_id in failing:
+                    result.append({'name': file_id + '.avi', 'id': file_id, 'linkextid': file_id,
+                                   'status': 'failed' if file_id in failing else 'processing',
+                                   'progress': round(min(progress, 1.0), 2), 'retries': '0',
+                                   'link': 'https://openload.co/f/{id}/{id}.avi'.format(id=file_id)})
+            return result
+
+        self.set_result('file/convert', convert)
+        self.set_result('file/runningconverts', running)
+
+    def cut(self, times=1, after=0):
+        """Makes the next downloads drop the connection after sending ``after`` bytes of the body."""
+        with self._lock:
+            self.failures.setdefault('download', []).extend([('cut', after)] * times)
+
+    def _pop_failure(self, endpoint):
+        with self._lock:
+            failures = self.failures.get(endpoint)
+            return failures.pop(0) if failures else None
+
+    def count(self, endpoint):
+        """Returns how many times an endpoint was requested."""
+        return sum(1 for _, requested, _ in self.requests if requested == endpoint)
+
+    def handle(self, method, path, params, body, headers):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            latency = self.latency
+            if self.jitter:
+                with self._lock:
+                    latency += self._random.uniform(0, self.jitter)
+            if latency:
+                time.sleep(latency)
+            return self._handle(method, path, params, body, headers)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _throttled(self):
+        """Token bucket of the throttle rate, returns True when the call is over the quota."""
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.throttle, self._tokens + (now - self._refilled) * self.throttle)
+            self._refilled = now
+            if self._tokens < 1:
+                self.throttled += 1
+                return True
+            self._tokens -= 1
+            return False
+
+    def _random_error(self):
+        with self._lock:
+            if self._random.random() < self.error_rate:
+                self.errors += 1
+                return True
+            return False
+
+    def _handle(self, method, path, params, body, headers):
+        if method == 'POST':
+            endpoint = 'upload'
+        elif path.startswith('/dl/'):
+            endpoint = 'download'
+            params = {'range': headers.get('Range')}
+        else:
+            endpoint = path.split('/{version}/'.format(version=API_VERSION), 1)[-1]
+
+        with self._lock:
+            self.requests.append((method, endpoint, params))
+
+        failure = self._pop_failure(endpoint)
+        cut = None
+        if failure is not None and failure[0] == 'cut':
+            cut = failure[1]
+        elif failure is not None:
+            return failure
+
+        if endpoint != 'download':
+            if self.throttle and self._throttled():
+                return 200, {'status': 429, 'msg': 'Too Many Requests', 'result': None}
+            if self.error_rate and self._random_error():
+                return 200, {'status': 500, 'msg': 'Internal Server Error', 'result': None}
+
+        if endpoint == 'download':
+            return self._download(path, headers.get('Range')) + (cut,)
+
+        if method == 'POST':
+            return 200, self._upload_response(body, headers.get('Content-Type', ''))
+
+        if endpoint not in self.results:
+            return 404, {'status': 404, 'msg': 'Not Found', 'result': None}
+
+        status, msg = self.statuses.get(endpoint, (200, 'OK'))
+        result = self._result(endpoint, params)
+        return 200, {'status': status, 'msg': msg, 'result': result if status == 200 else None}
+
+    def _result(self, endpoint, params):
+        result = self.results[endpoint]
+        if callable(result):
+            return result(params)
+        if endpoint == 'file/dl' and params.get('file') in self.files:
+            name, content = self.files[params['file']]
+            result = dict(result, name=name, size=len(content), sha1=hashlib.sha1(content).hexdigest(),
+                          url='{url}dl/{id}/{generation}/{name}'.format(url=self.url, id=params['file'], name=name,
+                                                                        generation=self.link_generation))
+        if endpoint == 'file/ul':
+            result = dict(result, url=result['url'] or self.url + 'upload')
+        return result
+
+    def _download(self, path, range_header):
+        file_id, generation = path.split('/')[2:4]
+        if file_id not in self.files:
+            return 404, b'Not Found', {}
+        if int(generation) != self.link_generation:
+            return 410, b'Gone', {}
+
+        content = self.files[file_id][1]
+        headers = {'Content-Type': 'application/octet-stream'}
+        match = re.match(r'bytes=(\d+)-(\d*)$', range_header or '')
+        if not self.accept_ranges or not match:
+            return 200, content, headers
+
+        headers['Accept-Ranges'] = 'bytes'
+
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(content) - 1), len(content) - 1)
+        if start > end:
+            headers['Content-Range'] = 'bytes */{size}'.format(size=len(content))
+            return 416, b'', headers
+
+        headers['Content-Range'] = 'bytes {start}-{end}/{size}'.format(start=start, end=end, size=len(content))
+        return 206, content[start:end + 1], headers
+
+    def _upload_response(self, body, content_type):
+        name, content = _multipart_file(body, content_type)
+        with self._lock:
+            self.uploads.append((name, content if self.keep_uploads else None))
+            file_id = 'stub{count}'.format(count=len(self.uploads))
+
+        result = {
+            'content_type': 'application/octet-stream',
+            'id': file_id,
+            'name': name,
+            'sha1': hashlib.sha1(content).hexdigest(),
+            'size': str(len(content)),
+            'url': 'https://openload.co/f/{id}/{name}'.format(id=file_id, name=name),
+        }
+        result.update(self.upload_result)
+        return {'status': 200, 'msg': 'OK', 'result': result}
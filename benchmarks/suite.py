@@ -0,0 +1,231 @@
+"""Calls/s, p50/p99 latency, MB/s and peak RSS of every OpenLoad method against the local stub server.
+
+Run from the root directory of PyOpenload (Python 3)::
+
+    $ python -m benchmarks.suite --save benchmarks/results/0.7.json
+    $ python -m benchmarks.suite --latency 0.02 --jitter 0.01 --error-rate 0.01 --throttle 200
+    $ python -m benchmarks.suite --cases list_folder,download --compare benchmarks/results/0.7.json
+
+Each method runs in a process of its own, so its peak RSS is neither the server's nor another method's.
+Results saved with ``--save`` are json files (settings, python, platform and the numbers of every method),
+``--compare`` prints the change of each number against such a file, so releases can be compared.
+"""
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import collections
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+
+from openload import OpenLoad
+from openload.ratelimit import clock
+
+from .stub_server import StubServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FILE_ID = 'bench'
+TICKET = '72fA-_Lq8Ak~~1440353112~n~~0~nXtN3RI-nsEa28Iq'
+# 120 ids: file_info_many requests them in 3 chunks of at most 50.
+FILE_IDS = ['bench{0}'.format(i) for i in range(120)]
+METRICS = (('calls_per_s', 'calls/s', '{0:9.1f}'), ('p50_ms', 'p50 ms', '{0:8.2f}'), ('p99_ms', 'p99 ms', '{0:8.2f}'),
+           ('mb_per_s', 'MB/s', '{0:8.1f}'), ('peak_rss_mb', 'RSS MB', '{0:8.1f}'), ('errors', 'errors', '{0:6d}'))
+
+
+def _download(ol, env):
+    path = ol.download(FILE_ID, env['download_path'])
+    size = os.path.getsize(path)
+    os.remove(path)
+    return size
+
+
+# name: (function called with (ol, env), True for transfers: made --transfers times, return the bytes transferred).
+CASES = collections.OrderedDict([
+    ('account_info', (lambda ol, env: ol.account_info(), False)),
+    ('file_info', (lambda ol, env: ol.file_info('72fA-_Lq8Ak3'), False)),
+    ('file_info_many', (lambda ol, env: ol.file_info_many(FILE_IDS), False)),
+    ('list_folder', (lambda ol, env: ol.list_folder('4258'), False)),
+    ('iter_list_folder', (lambda ol, env: collections.deque(ol.iter_list_folder('4258'), maxlen=0), False)),
+    ('remote_upload', (lambda ol, env: ol.remote_upload('http://example.com/file.dat'), False)),
+    ('remote_upload_status', (lambda ol, env: ol.remote_upload_status(limit=100), False)),
+    ('running_conversions', (lambda ol, env: ol.running_conversions('4258'), False)),
+    ('rename_folder', (lambda ol, env: ol.rename_folder('4258', 'renamed'), False)),
+    ('rename_file', (lambda ol, env: ol.rename_file(FILE_ID, 'renamed.bin'), False)),
+    ('convert_file', (lambda ol, env: ol.convert_file(FILE_ID), False)),
+    ('delete_file', (lambda ol, env: ol.delete_file(FILE_ID), False)),
+    ('splash_image', (lambda ol, env: ol.splash_image(FILE_ID), False)),
+    ('prepare_download', (lambda ol, env: ol.prepare_download(FILE_ID), False)),
+    ('get_download_link', (lambda ol, env: ol.get_download_link(FILE_ID, TICKET), False)),
+    ('upload_link', (lambda ol, env: ol.upload_link('4258'), False)),
+    ('upload_file', (lambda ol, env: ol.upload_file(env['upload_path']) and env['size'], True)),
+    ('download', (_download, True)),
+])
+
+
+def peak_rss_mb():
+    """Peak resident memory of the current process in MB, None where unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024 if sys.platform == 'darwin' else 1024.0)
+
+
+def percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run_case(name, api_url, iterations, env):
+    """Calls the method of a case iterations times (after a first call opening the connection), returns its stats."""
+    function, transfer = CASES[name]
+    latencies = []
+    errors = 0
+    transferred = 0
+
+    with OpenLoad('login', 'key') as ol:
+        ol.api_url = api_url
+        try:
+            function(ol, env)
+        except Exception:
+            pass
+
+        start = clock()
+        for _ in range(iterations):
+            began = clock()
+            try:
+                result = function(ol, env)
+                if transfer:
+                    transferred += result
+            except Exception:
+                errors += 1
+            latencies.append(clock() - began)
+        elapsed = clock() - start
+
+    latencies.sort()
+    return {
+        'calls': iterations,
+        'calls_per_s': iterations / elapsed,
+        'p50_ms': 1000 * percentile(latencies, 0.5),
+        'p99_ms': 1000 * percentile(latencies, 0.99),
+        'mb_per_s': transferred / 1e6 / elapsed if transfer else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'errors': errors,
+    }
+
+
+def run(cases, calls=200, transfers=5, size=16 * 1024 * 1024, listing=1000, isolate=True, **server_options):
+    """Runs the cases against a new stub server, returns their stats by name.
+
+    Args:
+        cases (iterable): names of the cases (keys of :data:`CASES`).
+        calls (int): calls made by each api case.
+        transfers (int): uploads or downloads made by each transfer case.
+        size (int): size in bytes of the uploaded and downloaded file.
+        listing (int): number of files listed by ``list_folder`` (and of uploads of ``remote_upload_status``).
+        isolate (bool): If this is set to true, each case runs in a spawned process (peak RSS of its own).
+        server_options: latency, jitter, error_rate, throttle and seed of the :class:`StubServer`.
+
+    """
+    workdir = tempfile.mkdtemp(prefix='openload-bench-')
+    content = os.urandom(size)
+    env = {'upload_path': os.path.join(workdir, 'upload.bin'), 'download_path': os.path.join(workdir, 'download.bin'),
+           'size': size}
+    with open(env['upload_path'], 'wb') as f:
+        f.write(content)
+
+    pool = multiprocessing.get_context('spawn').Pool(1, maxtasksperchild=1) if isolate else None
+    results = collections.OrderedDict()
+    try:
+        with StubServer(**server_options) as server:
+            server.keep_uploads = False
+            server.add_file(FILE_ID, content, name='download.bin')
+            server.set_listing(folders=listing // 100, files=listing)
+            server.set_remote_statuses(min(listing, 100))
+
+            for name in cases:
+                args = (name, server.api_url, transfers if CASES[name][1] else calls, env)
+                results[name] = pool.apply(run_case, args) if pool is not None else run_case(*args)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        shutil.rmtree(workdir)
+    return results
+
+
+def report(results, baseline=None):
+    """Returns the results as a table, with the change of each number against baseline results if given."""
+    lines = ['{0:<22}'.format('method') + ''.join('{0:>{1}}'.format(title, len(fmt.format(0)) + 1)
+                                                  for _, title, fmt in METRICS)]
+    for name, stats in results.items():
+        line = '{0:<22}'.format(name)
+        for key, _, fmt in METRICS:
+            value = stats.get(key)
+            line += ' ' + (fmt.format(value) if value is not None else ' ' * (len(fmt.format(0)) - 1) + '-')
+        lines.append(line)
+
+        previous = (baseline or {}).get(name)
+        if previous:
+            line = '{0:<22}'.format('  vs baseline')
+            for key, _, fmt in METRICS:
+                value, before = stats.get(key), previous.get(key)
+                change = '{0:+.0f}%'.format(100.0 * (value - before) / before) if value is not None and before else '-'
+                line += ' {0:>{1}}'.format(change, len(fmt.format(0)))
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', default=','.join(CASES), help='comma separated methods (default: all)')
+    parser.add_argument('--calls', type=int, default=200, help='calls made by each api method')
+    parser.add_argument('--transfers', type=int, default=5, help='uploads and downloads made')
+    parser.add_argument('--size', type=float, default=16, help='size of the transferred file in MB')
+    parser.add_argument('--listing', type=int, default=1000, help='files listed by list_folder')
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated server time in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random seconds added to the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of calls failing with a 500 status')
+    parser.add_argument('--throttle', type=float, default=None, help='api calls per second before 429 statuses')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--in-process', action='store_true', help='run every method in this process')
+    parser.add_argument('--save', help='json file to store the results to')
+    parser.add_argument('--compare', help='json file of results to compare with')
+    args = parser.parse_args(argv)
+
+    cases = [name for name in args.cases.split(',') if name]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error('unknown methods: {0}'.format(', '.join(unknown)))
+
+    settings = dict((key, getattr(args, key)) for key in ('calls', 'transfers', 'size', 'listing', 'latency',
+                                                          'jitter', 'error_rate', 'throttle', 'seed'))
+    results = run(cases, calls=args.calls, transfers=args.transfers, size=int(args.size * 1024 * 1024),
+                  listing=args.listing, isolate=not args.in_process, latency=args.latency, jitter=args.jitter,
+                  error_rate=args.error_rate, throttle=args.throttle, seed=args.seed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print(report(results, baseline))
+
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(args.save, 'w') as f:
+            json.dump({'date': datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+                       'python': platform.python_version(), 'platform': platform.platform(),
+                       'settings': settings, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
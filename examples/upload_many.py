@@ -0,0 +1,22 @@
+from __future__ import print_function
+
+import glob
+
+from openload import OpenLoad
+
+username = 'FTP Username/API Login'
+key = 'FTP Password/API Key'
+
+ol = OpenLoad(username, key, pool_maxsize=8)
+paths = glob.glob('/home/username/videos/*.mp4')
+
+
+def show_progress(progress):
+    print('{0.done_files}/{0.total_files} files, {1:.1f} MB/s'.format(progress, progress.rate / 1e6), end='\r')
+
+
+for upload in ol.upload_many(paths, workers=8, on_progress=show_progress):
+    if upload.ok:
+        print(upload.path, upload.result.get('url'))
+    else:
+        print(upload.path, 'failed:', upload.error)
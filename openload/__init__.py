@@ -1 +1,7 @@
+import sys
+
 from .openload import OpenLoad
+from .accounts import OpenLoadPool
+
+if sys.version_info >= (3, 5):
+    from .async_openload import AsyncOpenLoad
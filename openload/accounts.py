@@ -0,0 +1,310 @@
+from __future__ import absolute_import
+
+import copy
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .api_exceptions import BandwidthUsageExceeded, NoAccountAvailableException, TooManyRequestsException
+from .bulk import UploadResult
+from .openload import OpenLoad
+from .ratelimit import clock
+from .streaming import string_types
+
+UNLIMITED = float('inf')
+
+
+def _left(value):
+    """Converts a quota left reported by ``account/info`` to a number, -1 (no limit) to infinity."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return UNLIMITED
+    return UNLIMITED if value < 0 else value
+
+
+class Account(object):
+    """State of one account of an :class:`OpenLoadPool`.
+
+    Attributes:
+        client (OpenLoad): client of the account.
+        traffic_left (float): bytes the account may still download (``traffic.left``), infinity if unlimited or
+                              unknown. Lowered by the downloads made through the pool until the next refresh.
+        storage_left (float): bytes the account may still store (``storage_left``), same as traffic_left.
+        benched_until (float): :func:`openload.ratelimit.clock` time the account is out of rotation until.
+        in_flight (int): calls made through the account at the moment.
+        calls (int): calls made through the account so far.
+
+    """
+
+    __slots__ = ('client', 'traffic_left', 'storage_left', 'benched_until', 'in_flight', 'calls')
+
+    def __init__(self, client):
+        self.client = client
+        self.traffic_left = UNLIMITED
+        self.storage_left = UNLIMITED
+        self.benched_until = 0.0
+        self.in_flight = 0
+        self.calls = 0
+
+    @property
+    def login(self):
+        return self.client.login
+
+    def __repr__(self):
+        return '<Account {login} {in_flight} in flight>'.format(login=self.login, in_flight=self.in_flight)
+
+
+class OpenLoadPool(object):
+    """Spreads the calls which don't depend on the account (file info, downloads, uploads) over many accounts.
+
+    Each call goes to the healthy account with the most quota left (``traffic.left`` for downloads and file info,
+    ``storage_left`` for uploads) per call in flight, ties going to the account with the fewest calls made, so the
+    bandwidth and request quotas of all accounts add up. An account whose call raises
+    :class:`TooManyRequestsException` (429) or :class:`BandwidthUsageExceeded` (509) is benched for ``cooldown``
+    (``bandwidth_cooldown``) seconds and the call is made again through another account, the api rejected it
+    without running it. Quotas are read from ``account/info`` on the first call and every ``refresh_interval``
+    seconds after.
+
+    Note:
+        Calls bound to an account (list_folder, rename_file, delete_file, ...) are made with the client of that
+        account, see :meth:`client`. The pool is thread-safe, each account has its own :class:`OpenLoad` client
+        (and connection pool).
+
+    Args:
+        credentials (iterable): (api_login, api_key) pairs of the accounts.
+        cooldown (:obj:`float`, optional): seconds an account answering 429 is left out.
+        bandwidth_cooldown (:obj:`float`, optional): seconds an account answering 509 is left out.
+        refresh_interval (:obj:`float`, optional): seconds between two reads of the quotas of the accounts.
+        options: arguments given to the :class:`OpenLoad` client of every account (timeout, pool_maxsize,
+                 retry_policy, upload_link_pool_size, ...). A rate_limiter given here is shared by all accounts.
+                 The clients get a copy of retry_policy with ``retry_throttled`` off: a call answered with 429
+                 or 509 moves to another account at once instead of being retried by the same one.
+
+    """
+
+    def __init__(self, credentials, cooldown=60.0, bandwidth_cooldown=3600.0, refresh_interval=300.0, **options):
+        self.cooldown = cooldown
+        self.bandwidth_cooldown = bandwidth_cooldown
+        self.refresh_interval = refresh_interval
+
+        retry_policy = options.get('retry_policy')
+        if retry_policy is not None and retry_policy.retry_throttled:
+            options['retry_policy'] = retry_policy = copy.copy(retry_policy)
+            retry_policy.retry_throttled = False
+
+        self.accounts = [Account(OpenLoad(login, key, **options)) for login, key in credentials]
+        if not self.accounts:
+            raise ValueError('OpenLoadPool needs at least one account')
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_due = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the clients of all accounts."""
+        for account in self.accounts:
+            account.client.close()
+
+    def client(self, login):
+        """Returns the :class:`OpenLoad` client of an account, for the calls bound to it.
+
+        Args:
+            login (str): API Login of the account.
+
+        Returns:
+            OpenLoad: client of the account.
+
+        Raises:
+            KeyError: no account of the pool has this login.
+
+        """
+        for account in self.accounts:
+            if account.login == login:
+                return account.client
+        raise KeyError(login)
+
+    def refresh(self):
+        """Reads the quotas left of every account not benched from ``account/info``.
+
+        Returns:
+            None
+
+        """
+        self._refresh_due = clock() + self.refresh_interval
+        for account in self.accounts:
+            if account.benched_until > clock():
+                continue
+            try:
+                info = account.client._get('account/info')
+            except (TooManyRequestsException, BandwidthUsageExceeded) as e:
+                self._bench(account, e)
+                continue
+            except Exception:
+                continue  # quotas known so far are kept
+
+            with self._lock:
+                account.traffic_left = _left((info.get('traffic') or {}).get('left'))
+                account.storage_left = _left(info.get('storage_left'))
+
+    def _refresh_if_due(self):
+        if clock() < self._refresh_due:
+            return
+        with self._refresh_lock:
+            # Threads arriving meanwhile wait for the quotas instead of routing on stale ones.
+            if clock() >= self._refresh_due:
+                self.refresh()
+
+    def _bench(self, account, exception):
+        cooldown = self.bandwidth_cooldown if isinstance(exception, BandwidthUsageExceeded) else self.cooldown
+        with self._lock:
+            account.benched_until = max(account.benched_until, clock() + cooldown)
+
+    def _acquire(self, quota, excluded):
+        """Picks the account of the next call and counts the call in flight, None when every account is out."""
+        with self._lock:
+            now = clock()
+            candidates = [account for account in self.accounts
+                          if account.benched_until <= now and account not in excluded]
+            if not candidates:
+                return None
+
+            account = max(candidates, key=lambda account: (getattr(account, quota) / (account.in_flight + 1),
+                                                           -account.in_flight, -account.calls))
+            account.in_flight += 1
+            account.calls += 1
+            return account
+
+    def run(self, function, quota='traffic_left', size=0):
+        """Calls function with the client of the account picked, moving to the next account on 429 and 509.
+
+        Args:
+            function (callable): takes an :class:`OpenLoad` client, returns the result of the call.
+            quota (:obj:`str`, optional): ``traffic_left`` or ``storage_left``, the quota the call uses.
+            size (:obj:`int` or :obj:`callable`, optional): bytes of the quota used by the call, or a function
+                                                            taking the result and returning them.
+
+        Returns:
+            tuple: (login of the account used, result of function).
+
+        Raises:
+            NoAccountAvailableException: every account is benched.
+
+        """
+        self._refresh_if_due()
+        tried = []
+        while True:
+            account = self._acquire(quota, tried)
+            if account is None:
+                raise NoAccountAvailableException('no account of the pool is available')
+
+            try:
+                result = function(account.client)
+            except (TooManyRequestsException, BandwidthUsageExceeded) as e:
+                self._bench(account, e)
+                tried.append(account)
+                if len(tried) == len(self.accounts):
+                    raise
+                continue
+            finally:
+                with self._lock:
+                    account.in_flight -= 1
+
+            used = size(result) if callable(size) else size
+            if used:
+                with self._lock:
+                    setattr(account, quota, getattr(account, quota) - used)
+            return account.login, result
+
+    def file_info(self, file_id):
+        """Same as :meth:`OpenLoad.file_info`, made through the account picked."""
+        return self.run(lambda ol: ol.file_info(file_id))[1]
+
+    def prepare_download(self, file_id):
+        """Same as :meth:`OpenLoad.prepare_download`, returns (login, ticket).
+
+        Note:
+            The ticket must be used with :meth:`get_download_link` of the same account, ``client(login)``.
+
+        """
+        return self.run(lambda ol: ol.prepare_download(file_id))
+
+    def download(self, file_id, dest, **kwargs):
+        """Same as :meth:`OpenLoad.download` (same keyword arguments), made through the account picked.
+
+        Returns:
+            str: path of the downloaded file.
+
+        """
+        return self.run(lambda ol: ol.download(file_id, dest, **kwargs), size=os.path.getsize)[1]
+
+    def upload_file(self, file_path, folder_ids=None, **kwargs):
+        """Same as :meth:`OpenLoad.upload_file` (same keyword arguments but folder_id), to the account picked.
+
+        Args:
+            file_path (str): full path of the file to be uploaded, or a file-like object or iterable of bytes.
+            folder_ids (:obj:`dict`, optional): folder-ID to upload to by login, ``Home`` folder of the accounts
+                                                missing.
+
+        Returns:
+            tuple: (login of the account the file was uploaded to, uploaded file info).
+
+        """
+        folder_ids = folder_ids or {}
+        size = os.path.getsize(file_path) if isinstance(file_path, string_types) else 0
+        return self.run(lambda ol: ol.upload_file(file_path, folder_id=folder_ids.get(ol.login), **kwargs),
+                        quota='storage_left', size=size)
+
+    def remote_upload(self, remote_url, folder_ids=None, headers=None):
+        """Same as :meth:`OpenLoad.remote_upload`, to the account picked, returns (login, result)."""
+        folder_ids = folder_ids or {}
+        return self.run(lambda ol: ol.remote_upload(remote_url, folder_id=folder_ids.get(ol.login), headers=headers),
+                        quota='storage_left')
+
+    def upload_many(self, file_paths, folder_ids=None, workers_per_account=4, **kwargs):
+        """Uploads many files concurrently over all accounts, yielding their results as soon as each one finishes.
+
+        Note:
+            Each file goes to the account picked when its upload starts, so faster accounts take more of them.
+            Create the pool with ``upload_link_pool_size`` to keep upload links of every account ready.
+
+        Args:
+            file_paths (iterable): full paths of the files to be uploaded.
+            folder_ids (:obj:`dict`, optional): folder-ID to upload to by login, ``Home`` folder of the accounts
+                                                missing.
+            workers_per_account (:obj:`int`, optional): number of files uploaded at the same time per account.
+            kwargs: keyword arguments of :meth:`OpenLoad.upload_file` (httponly, verify_sha1, ...).
+
+        Returns:
+            generator: :class:`openload.bulk.UploadResult` of every file, in completion order, its ``account``
+                       is the login of the account the file was uploaded to.
+
+        """
+        def upload(path):
+            size = 0
+            started_at = clock()
+            try:
+                # A missing or unreadable file fails its own upload only.
+                size = os.path.getsize(path)
+                login, result = self.upload_file(path, folder_ids=folder_ids, **kwargs)
+            except Exception as e:
+                return UploadResult(path, error=e, size=size, elapsed=clock() - started_at)
+            return UploadResult(path, result=result, size=size, elapsed=clock() - started_at, account=login)
+
+        executor = ThreadPoolExecutor(max_workers=workers_per_account * len(self.accounts))
+        futures = []
+        try:
+            futures.extend(executor.submit(upload, path) for path in file_paths)
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
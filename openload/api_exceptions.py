@@ -24,3 +24,27 @@ class BandwidthUsageExceeded(Exception):
 
 class ServerErrorException(Exception):
     pass
+
+
+class CircuitOpenException(Exception):
+    pass
+
+
+class ChecksumMismatchException(Exception):
+    pass
+
+
+class CaptchaRequiredException(Exception):
+    pass
+
+
+class RemoteUploadFailedException(Exception):
+    pass
+
+
+class ConversionFailedException(Exception):
+    pass
+
+
+class NoAccountAvailableException(Exception):
+    pass
@@ -0,0 +1,515 @@
+import asyncio
+import hashlib
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, pip install pyopenload[async]
+    aiohttp = None
+
+from .api_exceptions import ChecksumMismatchException
+from .cache import ACCOUNT_TAG, MISSING, folder_tag
+from .openload import OpenLoad
+from .ratelimit import clock
+from .streaming import CHUNK_SIZE, ByteCounter, string_types
+
+
+def _sync_only(name):
+    """Returns a method rejecting a helper of :class:`OpenLoad` which can't run on top of the coroutine api methods.
+
+    Args:
+        name (str): name of the method of :class:`OpenLoad`.
+
+    Returns:
+        function: method raising TypeError.
+
+    """
+    def method(self, *args, **kwargs):
+        raise TypeError('{name} is not available on AsyncOpenLoad, use it on an OpenLoad instance'.format(name=name))
+
+    method.__name__ = name
+    method.__doc__ = 'Not available on :class:`AsyncOpenLoad`, see :meth:`OpenLoad.{name}`.'.format(name=name)
+    return method
+
+
+class AsyncOpenLoad(OpenLoad):
+    """asyncio version of :class:`OpenLoad`.
+
+    Every api method of :class:`OpenLoad` is available with the same arguments and results,
+    but returns an awaitable, so many calls can be in flight at the same time. ::
+
+        async with AsyncOpenLoad('login', 'key') as ol:
+            infos = await asyncio.gather(*(ol.file_info(file_id) for file_id in file_ids))
+
+    The helpers built on top of the api methods with threads (:meth:`~OpenLoad.walk`,
+    :meth:`~OpenLoad.iter_list_folder`, :meth:`~OpenLoad.iter_remote_upload_status`, :meth:`~OpenLoad.download`,
+    :meth:`~OpenLoad.download_links`, :meth:`~OpenLoad.upload_many`, :meth:`~OpenLoad.ingest`,
+    :meth:`~OpenLoad.sync`, :meth:`~OpenLoad.remote_upload_many` and :meth:`~OpenLoad.convert_files`)
+    are not available, they raise :class:`TypeError`: use them on an :class:`OpenLoad` instance.
+
+    Note:
+        Requires `aiohttp`_ (``pip install pyopenload[async]``).
+
+    .. _aiohttp: https://docs.aiohttp.org
+
+    """
+
+    walk = _sync_only('walk')
+    iter_list_folder = _sync_only('iter_list_folder')
+    iter_remote_upload_status = _sync_only('iter_remote_upload_status')
+    download = _sync_only('download')
+    download_links = _sync_only('download_links')
+    upload_many = _sync_only('upload_many')
+    ingest = _sync_only('ingest')
+    sync = _sync_only('sync')
+    remote_upload_many = _sync_only('remote_upload_many')
+    convert_files = _sync_only('convert_files')
+
+    def __init__(self, api_login, api_key, session=None, timeout=None,
+                 max_concurrency=100, limit=100, limit_per_host=0, rate_limiter=None, retry_policy=None,
+                 circuit_breaker=None, cache=None, hooks=None):
+        """Initializes AsyncOpenLoad instance with given parameters and formats api base url.
+
+        Note:
+            The underlying :class:`aiohttp.ClientSession` is created on the first request (it needs a running loop),
+            call :meth:`close` (or use the instance as an async context manager) to release its connections.
+
+        Args:
+            api_login (str): API Login found in openload.co
+            api_key (str): API Key found in openload.co
+            session (:obj:`aiohttp.ClientSession`, optional): session to be used instead of creating a new one,
+                                                              pool options are ignored and it is not closed by
+                                                              :meth:`close`.
+            timeout (:obj:`float` or :obj:`tuple`, optional): timeout of every request in seconds,
+                                                              either a single value or a (connect, read) tuple.
+            max_concurrency (:obj:`int`, optional): maximum number of requests in flight at the same time,
+                                                    other calls wait for a free slot.
+            limit (:obj:`int`, optional): maximum number of pooled connections (0 for no limit).
+            limit_per_host (:obj:`int`, optional): maximum number of pooled connections per host (0 for no limit).
+            rate_limiter (:obj:`openload.ratelimit.RateLimiter`, optional): limits the rate of api calls,
+                                                                          it may be shared by many instances.
+            retry_policy (:obj:`openload.retry.RetryPolicy`, optional): retries calls failing with transient errors.
+            circuit_breaker (:obj:`openload.retry.CircuitBreaker`, optional): fails api calls fast while
+                                                                            the api keeps failing.
+            cache (:obj:`openload.cache.ResponseCache`, optional): caches results of read only calls
+                                                                  (account_info, file_info, list_folder, splash_image).
+            hooks (:obj:`openload.metrics.Hooks`, optional): called on the events of every api request
+                                                             (timings, bytes, retries, ...).
+
+        Returns:
+            None
+
+        """
+        if aiohttp is None:
+            raise ImportError('AsyncOpenLoad requires aiohttp, install it with "pip install pyopenload[async]"')
+
+        self.login = api_login
+        self.key = api_key
+        # Credentials added to the params of every api call, already as the strings aiohttp expects.
+        self._credentials = {'login': str(api_login), 'key': str(api_key)}
+        self.api_url = self.api_base_url.format(api_version=self.api_version)
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.cache = cache
+        self.hooks = hooks
+
+        self._owns_session = session is None
+        self.session = session
+        self._semaphore = None
+        self._file_info_batcher = None
+        self.upload_link_pool = None
+        self.models = False
+
+    def __enter__(self):
+        raise TypeError('Use "async with" with AsyncOpenLoad')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _client_timeout(self):
+        """Converts timeout given in the constructor to :class:`aiohttp.ClientTimeout`.
+
+        Returns:
+            aiohttp.ClientTimeout: timeout of every request.
+
+        """
+        if self.timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+            return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+    def _ensure_session(self):
+        """Creates the pooled session and the concurrency semaphore, they must be created inside the running loop.
+
+        Returns:
+            aiohttp.ClientSession: session used by every request made by the instance.
+
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self._client_timeout())
+
+        return self.session
+
+    async def close(self):
+        """Closes the underlying session and all of its pooled connections.
+
+        Note:
+            A session passed to the constructor is left open, its owner is responsible for closing it.
+
+        Returns:
+            None
+
+        """
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get(self, url, params=None):
+        """Used by every other method, it makes a GET request with the given params.
+
+        Args:
+            url (str): relative path of a specific service (account_info, ...).
+            params (:obj:`dict`, optional): contains parameters to be sent in the GET request, it is not modified.
+
+        Returns:
+            dict: results of the response of the GET request.
+
+        """
+        params = dict((key, str(value)) for key, value in params.items()) if params else {}
+        params.update(self._credentials)
+
+        if self.cache is not None:
+            result = self.cache.get(url, params)
+            if result is not MISSING:
+                if self.hooks is not None:
+                    self.hooks.cache_hit(url)
+                return result
+
+        result = await self._with_retries(url, self._get_once, url, params)
+
+        if self.cache is not None:
+            self.cache.store(url, params, result)
+
+        return result
+
+    async def _with_retries(self, endpoint, coroutine_function, *args):
+        """Awaits coroutine_function(*args), retrying it as allowed by the retry policy if any.
+
+        Args:
+            endpoint (str): endpoint of the call (account_info, upload, ...) the retry policy decides on.
+            coroutine_function (callable): makes one attempt of the call.
+            args: arguments of coroutine_function.
+
+        Returns:
+            object: result of the call.
+
+        """
+        if self.retry_policy is None:
+            return await coroutine_function(*args)
+
+        started_at = clock()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                return await coroutine_function(*args)
+            except Exception as e:
+                delay = self.retry_policy.next_delay(endpoint, e, attempt, started_at)
+                if delay is None:
+                    raise
+                if self.hooks is not None:
+                    self.hooks.retry(endpoint, attempt, delay, e)
+
+            await asyncio.sleep(delay)
+
+    async def _get_once(self, url, params):
+        """Makes a single GET request, going through the rate limiter and the circuit breaker if any.
+
+        Args:
+            url (str): relative path of a specific service (account_info, ...).
+            params (dict): parameters to be sent in the GET request, credentials included.
+
+        Returns:
+            dict: results of the response of the GET request.
+
+        """
+        session = self._ensure_session()
+        hooks = self.hooks
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_call()
+
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(url)
+            if delay:
+                if hooks is not None:
+                    hooks.throttle(url, delay)
+                await asyncio.sleep(delay)
+
+        if hooks is not None:
+            return await self._get_once_instrumented(session, url, params)
+
+        try:
+            async with self._semaphore:
+                async with session.get(self.api_url + url, params=params) as response:
+                    response_json = await response.json(content_type=None, loads=self.json_loads)
+
+            result = self._process_response(response_json)
+        except Exception as e:
+            self._record_failure(url, e)
+            raise
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record()
+
+        return result
+
+    async def _get_once_instrumented(self, session, url, params):
+        """Same request as :meth:`_get_once`, timing its steps for the hooks.
+
+        Args:
+            session (aiohttp.ClientSession): session of the instance.
+            url (str): relative path of a specific service (account_info, ...).
+            params (dict): parameters to be sent in the GET request, credentials included.
+
+        Returns:
+            dict: results of the response of the GET request.
+
+        """
+        hooks = self.hooks
+        body = error = started = response_time = decode_time = None
+
+        try:
+            async with self._semaphore:
+                hooks.request_start(url)
+                started = clock()
+                async with session.get(self.api_url + url, params=params) as response:
+                    response_time = clock() - started
+                    body = await response.read()
+
+            decoding = clock()
+            response_json = self.json_loads(body)
+            decode_time = clock() - decoding
+            result = self._process_response(response_json)
+        except Exception as e:
+            error = e
+            self._record_failure(url, e)
+            raise
+        finally:
+            if started is not None:
+                hooks.request_end(url, clock() - started, exception=error,
+                                  received=len(body) if body is not None else 0,
+                                  response_time=response_time, decode_time=decode_time)
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record()
+
+        return result
+
+    async def file_info_many(self, file_ids, max_workers=4):
+        """Requests info of any number of files, ids are sent in chunks of 50 (api limit) concurrently.
+
+        Args:
+            file_ids (iterable): ids of the files.
+            max_workers (:obj:`int`, optional): maximum number of chunks requested at the same time.
+
+        Returns:
+            tuple: (files, errors), same as :meth:`OpenLoad.file_info_many`.
+
+        """
+        chunks = self._chunk_file_ids(file_ids)
+        semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+        async def fetch(chunk):
+            async with semaphore:
+                return await self._fetch_file_info(chunk)
+
+        return self._merge_file_infos(await asyncio.gather(*(fetch(chunk) for chunk in chunks)))
+
+    async def upload_file(self, file_path, folder_id=None, sha1=None, httponly=False, file_name=None,
+                          verify_sha1=False, callback=None):
+        """Calls upload_link request to get valid url, then it makes a post request with given file to be uploaded.
+        No need to call upload_link explicitly since upload_file calls it.
+
+        Note:
+            If folder_id is not provided, the file will be uploaded to ``Home`` folder.
+
+        Note:
+            The file is streamed (files are read in the default executor), it is sent with chunked transfer
+            encoding. The upload is retried by the retry policy (endpoint ``upload``) when its source can be
+            sent again, it goes through the circuit breaker and is reported to the hooks.
+
+        Args:
+            file_path (str): full path of the file to be uploaded, or a file-like object opened in binary mode,
+                             or an iterable (generator, ...) of bytes.
+            folder_id (:obj:`str`, optional): folder-ID to upload to.
+            sha1 (:obj:`str`, optional): expected sha1 If sha1 of uploaded file doesn't match this value, upload fails.
+            httponly (:obj:`bool`, optional): If this is set to true, use only http upload links.
+            file_name (:obj:`str`, optional): name of the uploaded file, defaults to the base name of file_path
+                                              (or of the ``name`` of the file-like object).
+            verify_sha1 (:obj:`bool`, optional): If this is set to true, raise ChecksumMismatchException when
+                                                 the sha1 of the sent bytes differs from the uploaded file sha1.
+            callback (:obj:`callable`, optional): called with the number of bytes sent, each time a chunk is sent.
+
+        Returns:
+            dict: dictionary containing uploaded file info, same as :meth:`OpenLoad.upload_file`.
+
+        """
+        upload_url_response_json = await self.upload_link(folder_id=folder_id, sha1=sha1, httponly=httponly)
+        upload_url = upload_url_response_json['url']
+
+        file_name = file_name or self._source_name(file_path)
+        rewind_to = self._rewind_position(file_path)
+        args = (upload_url, file_path, file_name, verify_sha1, rewind_to, callback)
+
+        if isinstance(file_path, string_types) or rewind_to is not None:
+            result = await self._with_retries('upload', self._post_file, *args)
+        else:
+            result = await self._post_file(*args)
+
+        if self.cache is not None:
+            self.cache.invalidate([folder_tag(folder_id), ACCOUNT_TAG])
+
+        return result
+
+    async def _post_file(self, upload_url, source, file_name, verify_sha1=False, rewind_to=None, callback=None):
+        """Uploads a file to an upload url generated by :meth:`upload_link`, going through the circuit breaker if any.
+
+        Args:
+            upload_url (str): url returned by :meth:`upload_link`.
+            source (object): full path of the file, file-like object or iterable of bytes.
+            file_name (str): name of the uploaded file.
+            verify_sha1 (:obj:`bool`, optional): compare the sha1 of the sent bytes with the uploaded file sha1.
+            rewind_to (:obj:`int`, optional): position a file-like source is moved to before being sent.
+            callback (:obj:`callable`, optional): called with the number of bytes sent, each time a chunk is sent.
+
+        Returns:
+            dict: dictionary containing uploaded file info, see :meth:`upload_file`.
+
+        """
+        session = self._ensure_session()
+        hooks = self.hooks
+        hasher = hashlib.sha1() if verify_sha1 else None
+        counter = ByteCounter(callback)
+        error = started = None
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_call()
+
+        try:
+            async with self._semaphore:
+                if hooks is not None:
+                    hooks.request_start('upload')
+                    started = clock()
+                if isinstance(source, string_types):
+                    with open(source, 'rb') as f:
+                        response_json = await self._post_stream(session, upload_url, f, file_name, hasher, counter)
+                else:
+                    if rewind_to is not None:
+                        source.seek(rewind_to)
+                    response_json = await self._post_stream(session, upload_url, source, file_name, hasher, counter)
+
+            self._check_status(response_json)
+        except Exception as e:
+            error = e
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(e)
+            raise
+        finally:
+            if started is not None:
+                hooks.request_end('upload', clock() - started, exception=error, sent=counter.count)
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record()
+
+        result = response_json['result']
+
+        if hasher is not None and result.get('sha1') != hasher.hexdigest():
+            raise ChecksumMismatchException('sent {sent}, uploaded file sha1 is {uploaded}'.format(
+                sent=hasher.hexdigest(), uploaded=result.get('sha1')))
+
+        return result
+
+    async def _post_stream(self, session, upload_url, source, file_name, hasher=None, callback=None):
+        """Sends a multipart POST request streaming the source.
+
+        Args:
+            session (aiohttp.ClientSession): session of the instance.
+            upload_url (str): url returned by :meth:`upload_link`.
+            source (object): file-like object or iterable of bytes.
+            file_name (str): name of the uploaded file.
+            hasher (:obj:`object`, optional): hashlib object fed with the sent bytes.
+            callback (:obj:`callable`, optional): called with the number of bytes sent, each time a chunk is sent.
+
+        Returns:
+            dict: json of the response.
+
+        """
+        data = aiohttp.FormData()
+        data.add_field('files', _ChunkReader(source, hasher, callback), filename=file_name,
+                       content_type='application/octet-stream')
+
+        async with session.post(upload_url, data=data) as response:
+            return await response.json(content_type=None, loads=self.json_loads)
+
+
+class _ChunkReader(object):
+    """Async iterator over the chunks of an upload source, feeding them to a hash object and a callback.
+
+    Note:
+        File-like objects are read in the default executor, so the loop is not blocked by disk reads.
+
+    Args:
+        source (object): file-like object opened in binary mode or iterable of bytes.
+        hasher (:obj:`object`, optional): hashlib object, bytes are not hashed if None.
+        callback (:obj:`callable`, optional): called with the number of bytes of each chunk.
+
+    """
+
+    def __init__(self, source, hasher=None, callback=None):
+        self.hasher = hasher
+        self.callback = callback
+        self._read = getattr(source, 'read', None)
+        self._chunks = iter(source) if self._read is None else None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._read is not None:
+            chunk = await asyncio.get_event_loop().run_in_executor(None, self._read, CHUNK_SIZE)
+        else:
+            # Empty chunks would end a chunked request early, they are skipped.
+            chunk = next(self._chunks, None)
+            while chunk is not None and not chunk:
+                chunk = next(self._chunks, None)
+
+        if not chunk:
+            raise StopAsyncIteration
+
+        if self.hasher is not None:
+            self.hasher.update(chunk)
+
+        if self.callback is not None:
+            self.callback(len(chunk))
+
+        return chunk
@@ -0,0 +1,87 @@
+from __future__ import absolute_import
+
+import threading
+import time
+
+from concurrent.futures import Future
+
+
+class FileInfoBatcher(object):
+    """Coalesces concurrent single file info lookups into ``file/info`` requests of up to ``max_ids`` ids.
+
+    The first lookup of a batch waits ``window`` seconds for other lookups to join it, then requests
+    info of every id collected so far with a single call. A batch reaching ``max_ids`` ids is sent right away.
+
+    Args:
+        fetch (callable): takes a list of file ids, returns ``file/info`` result (dict keyed by file id).
+        window (:obj:`float`, optional): seconds a batch stays open for other lookups.
+        max_ids (:obj:`int`, optional): maximum number of ids per request.
+
+    """
+
+    def __init__(self, fetch, window=0.005, max_ids=50):
+        self.fetch = fetch
+        self.window = window
+        self.max_ids = max_ids
+
+        self._lock = threading.Lock()
+        self._pending = None
+
+    def file_info(self, file_id):
+        """Requests info of a single file, blocks until the batch it joined is done.
+
+        Args:
+            file_id (str): id of the file.
+
+        Returns:
+            dict: ``{file_id: info}``, empty if the api returned nothing for this id.
+
+        """
+        with self._lock:
+            leader = self._pending is None
+            if leader:
+                self._pending = {}
+
+            batch = self._pending
+            future = batch.get(file_id)
+            if future is None:
+                future = batch[file_id] = Future()
+
+            full = len(batch) >= self.max_ids
+            if full:
+                self._pending = None
+
+        if full:
+            self._flush(batch)
+        elif leader:
+            time.sleep(self.window)
+            with self._lock:
+                # A full batch has already been sent by the lookup that filled it.
+                still_open = self._pending is batch
+                if still_open:
+                    self._pending = None
+
+            if still_open:
+                self._flush(batch)
+
+        info = future.result()
+        return {file_id: info} if info is not None else {}
+
+    def _flush(self, batch):
+        """Requests info of every id of the batch and resolves their futures.
+
+        Args:
+            batch (dict): file id to :class:`concurrent.futures.Future`.
+
+        Returns:
+            None
+
+        """
+        try:
+            infos = self.fetch(list(batch)) or {}
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+        else:
+            for file_id, future in batch.items():
+                future.set_result(infos.get(file_id))
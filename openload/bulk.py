@@ -0,0 +1,196 @@
+from __future__ import absolute_import
+
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .ratelimit import clock
+from .upload_pool import UploadLinkPool
+
+
+class UploadResult(object):
+    """Outcome of the upload of one file by :func:`upload_many`.
+
+    Attributes:
+        path (str): path of the file.
+        result (dict): uploaded file info (see :meth:`OpenLoad.upload_file`), None if the upload failed.
+        error (Exception): exception raised by the upload, None if it succeeded.
+        size (int): size of the file in bytes.
+        elapsed (float): seconds spent uploading the file.
+        account (str): login of the account the file was uploaded to, set by :meth:`OpenLoadPool.upload_many`.
+
+    """
+
+    __slots__ = ('path', 'result', 'error', 'size', 'elapsed', 'account')
+
+    def __init__(self, path, result=None, error=None, size=0, elapsed=0.0, account=None):
+        self.path = path
+        self.result = result
+        self.error = error
+        self.size = size
+        self.elapsed = elapsed
+        self.account = account
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = 'ok' if self.ok else repr(self.error)
+        return '<UploadResult {path!r} {status}>'.format(path=self.path, status=status)
+
+
+class UploadProgress(object):
+    """Thread-safe progress of a batch of uploads.
+
+    Attributes:
+        total_files (int): number of files of the batch.
+        total_bytes (int): size of all files of the batch.
+        sent_bytes (int): bytes sent so far (bytes sent again by retries included).
+        done_files (int): number of files uploaded.
+        failures (list): :class:`UploadResult` of the failed uploads.
+
+    """
+
+    def __init__(self, total_files, total_bytes):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.sent_bytes = 0
+        self.done_files = 0
+        self.failures = []
+        self.started_at = clock()
+        self._lock = threading.Lock()
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.sent_bytes += count
+
+    def add_result(self, upload_result):
+        with self._lock:
+            if upload_result.ok:
+                self.done_files += 1
+            else:
+                self.failures.append(upload_result)
+
+    @property
+    def elapsed(self):
+        return clock() - self.started_at
+
+    @property
+    def rate(self):
+        """Bytes sent per second since the start of the batch."""
+        elapsed = self.elapsed
+        return self.sent_bytes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds left, None while nothing was sent."""
+        rate = self.rate
+        if not rate:
+            return None
+        return max(0, self.total_bytes - self.sent_bytes) / rate
+
+    def __repr__(self):
+        return '<UploadProgress {done}/{total} files, {sent}/{size} bytes, {failed} failed>'.format(
+            done=self.done_files, total=self.total_files, sent=self.sent_bytes, size=self.total_bytes,
+            failed=len(self.failures))
+
+
+def _file_size(path):
+    """Size of a file in bytes, 0 if it can't be read (its upload then fails and is reported in its result)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def upload_many(ol, paths, folder_id=None, workers=4, httponly=False, verify_sha1=False, prefetch=None,
+                on_progress=None, on_file_progress=None, dedup_index=None):
+    """Uploads many files concurrently, yielding their results as soon as each upload finishes.
+
+    Upload links are taken from the upload link pool of ol if it has one, otherwise from a pool
+    of ``prefetch`` links made for the batch, so workers don't wait for ``file/ul`` round trips.
+    A failed upload is reported in its result, the rest of the batch goes on.
+
+    Args:
+        ol (OpenLoad): client used for the uploads.
+        paths (iterable): full paths of the files to be uploaded.
+        folder_id (:obj:`str`, optional): folder-ID to upload to, ``Home`` folder if not provided.
+        workers (:obj:`int`, optional): number of files uploaded at the same time.
+        httponly (:obj:`bool`, optional): If this is set to true, use only http upload links.
+        verify_sha1 (:obj:`bool`, optional): verify the sha1 of each uploaded file (see :meth:`OpenLoad.upload_file`).
+        prefetch (:obj:`int`, optional): number of upload links kept ready (when ol has no upload link pool),
+                                         defaults to workers.
+        on_progress (:obj:`callable`, optional): called with the :class:`UploadProgress` of the batch
+                                                 each time a chunk is sent and each time a file is done.
+        on_file_progress (:obj:`callable`, optional): called with (path, bytes sent, file size)
+                                                      each time a chunk of a file is sent.
+        dedup_index (:obj:`openload.index.AccountIndex`, optional): files already in the account (same sha1)
+                                                                   are not uploaded, see
+                                                                   :meth:`AccountIndex.upload_file`.
+                                                                   Their bytes count as sent in the progress.
+
+    Returns:
+        generator: :class:`UploadResult` of every file, in completion order.
+
+    """
+    paths = list(paths)
+    progress = UploadProgress(len(paths), sum(_file_size(path) for path in paths))
+
+    if not paths:
+        return
+
+    # Uploads of dedup_index use links bound to the sha1 of each file, they are not pooled.
+    links = ol.upload_link_pool
+    owns_links = links is None and dedup_index is None
+    if owns_links:
+        prefetch = min(prefetch or workers, len(paths))
+        links = UploadLinkPool(ol._fetch_upload_link, size=prefetch, workers=prefetch)
+
+    def upload(path):
+        sent = [0]
+        size = [0]
+
+        def callback(count):
+            sent[0] += count
+            progress.add_bytes(count)
+            if on_file_progress is not None:
+                on_file_progress(path, sent[0], size[0])
+            if on_progress is not None:
+                on_progress(progress)
+
+        started_at = clock()
+        try:
+            # A missing or unreadable file fails its own upload only.
+            size[0] = os.path.getsize(path)
+            if dedup_index is not None:
+                result = dedup_index.upload_file(path, folder_id=folder_id, httponly=httponly, callback=callback)
+                if result['duplicate']:
+                    callback(size[0])
+            else:
+                upload_url = links.get(folder_id=folder_id, httponly=httponly)
+                result = ol._upload_to(upload_url, path, folder_id=folder_id, verify_sha1=verify_sha1,
+                                       callback=callback)
+        except Exception as e:
+            return UploadResult(path, error=e, size=size[0], elapsed=clock() - started_at)
+
+        return UploadResult(path, result=result, size=size[0], elapsed=clock() - started_at)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = []
+    try:
+        futures.extend(executor.submit(upload, path) for path in paths)
+
+        for future in as_completed(futures):
+            upload_result = future.result()
+            progress.add_result(upload_result)
+            if on_progress is not None:
+                on_progress(progress)
+            yield upload_result
+    finally:
+        for future in futures:
+            future.cancel()
+        if owns_links:
+            links.close()
+        executor.shutdown(wait=True)
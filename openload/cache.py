@@ -0,0 +1,347 @@
+from __future__ import absolute_import
+
+import collections
+import copy
+import json
+import sqlite3
+import threading
+import time
+
+try:
+    from urllib.parse import urlencode
+except ImportError:  # Python 2
+    from urllib import urlencode
+
+MISSING = object()
+
+# Default time to live (seconds) of cached results, endpoints missing here are never cached.
+DEFAULT_TTLS = {
+    'account/info': 60,
+    'file/info': 300,
+    'file/listfolder': 60,
+    'file/getsplash': 3600,
+}
+
+ACCOUNT_TAG = 'account'
+
+
+def file_tag(file_id):
+    return 'file:{0}'.format(file_id)
+
+
+def folder_tag(folder_id):
+    return 'folder:{0}'.format(folder_id or 'home')
+
+
+class MemoryCache(object):
+    """In memory, thread-safe LRU backend of :class:`ResponseCache`.
+
+    Args:
+        maxsize (:obj:`int`, optional): maximum number of entries, least recently used ones are evicted first.
+
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._tags = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the value stored under key, :data:`MISSING` if there is none or it expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+
+            value, expires_at, _ = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return MISSING
+
+            self._entries[key] = self._entries.pop(key)
+            return copy.deepcopy(value)
+
+    def set(self, key, value, ttl, tags=()):
+        """Stores value under key for ttl seconds, tags are used by :meth:`invalidate`."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (copy.deepcopy(value), time.time() + ttl, tags)
+            for tag in tags:
+                self._tags[tag].add(key)
+
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        """Removes every entry having one of the given tags."""
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+class SQLiteCache(object):
+    """On disk backend of :class:`ResponseCache`, entries survive restarts and may be shared by processes.
+
+    Args:
+        path (str): path of the sqlite database file, created if missing.
+        maxsize (:obj:`int`, optional): maximum number of entries, least recently used ones are evicted first.
+
+    """
+
+    def __init__(self, path, maxsize=100000):
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+        with self._lock:
+            self._connection.executescript('''
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL);
+                CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at);
+                CREATE TABLE IF NOT EXISTS tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key));
+                CREATE INDEX IF NOT EXISTS tags_key ON tags (key);
+            ''')
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def get(self, key):
+        """Returns the value stored under key, :data:`MISSING` if there is none or it expired."""
+        now = time.time()
+
+        with self._lock:
+            row = self._connection.execute('SELECT value, expires_at FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return MISSING
+
+            value, expires_at = row
+            if expires_at <= now:
+                self._remove(key)
+                return MISSING
+
+            self._connection.execute('UPDATE entries SET used_at = ? WHERE key = ?', (now, key))
+
+        return json.loads(value)
+
+    def set(self, key, value, ttl, tags=()):
+        """Stores value under key for ttl seconds, tags are used by :meth:`invalidate`."""
+        now = time.time()
+        value = json.dumps(value)
+
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.execute('DELETE FROM tags WHERE key = ?', (key,))
+                self._connection.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                                         (key, value, now + ttl, now))
+                self._connection.executemany('INSERT OR IGNORE INTO tags VALUES (?, ?)',
+                                             [(tag, key) for tag in tags])
+                self._evict()
+
+    def invalidate(self, tags):
+        """Removes every entry having one of the given tags."""
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                for tag in tags:
+                    keys = self._connection.execute('SELECT key FROM tags WHERE tag = ?', (tag,)).fetchall()
+                    for key, in keys:
+                        self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._connection.executescript('DELETE FROM entries; DELETE FROM tags;')
+
+    def close(self):
+        self._connection.close()
+
+    def _remove(self, key):
+        self._connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+        self._connection.execute('DELETE FROM tags WHERE key = ?', (key,))
+
+    def _evict(self):
+        excess = self._connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0] - self.maxsize
+        if excess > 0:
+            keys = self._connection.execute('SELECT key FROM entries ORDER BY used_at LIMIT ?', (excess,)).fetchall()
+            for key, in keys:
+                self._remove(key)
+
+
+class ResponseCache(object):
+    """Caches results of read only api calls and drops them when a call changes the files or folders they describe.
+
+    Results of ``account/info``, ``file/info``, ``file/listfolder`` and ``file/getsplash`` are cached,
+    each for its own time to live. Renaming, deleting or uploading files (and renaming folders) invalidates
+    the cached info and listings the change shows up in. ::
+
+        cache = ResponseCache(SQLiteCache('/tmp/openload.sqlite'), ttls={'file/listfolder': 30})
+        ol = OpenLoad('login', 'key', cache=cache)
+
+    Args:
+        backend (:obj:`object`, optional): :class:`MemoryCache` (default) or :class:`SQLiteCache`.
+        ttls (:obj:`dict`, optional): endpoint to time to live in seconds, merged with :data:`DEFAULT_TTLS`,
+                                      an endpoint with ttl 0 (or None) is not cached.
+
+    Attributes:
+        hits (int): number of results served from the cache.
+        misses (int): number of cacheable calls which went to the api.
+
+    """
+
+    def __init__(self, backend=None, ttls=None):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self.endpoint_stats = collections.defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self._lock = threading.Lock()
+
+    def stats(self):
+        """Returns hit/miss counters, overall and per endpoint.
+
+        Returns:
+            dict: counters. ::
+
+                {
+                    "hits": 120,
+                    "misses": 8,
+                    "hit_ratio": 0.9375,
+                    "endpoints": {
+                        "file/info": {"hits": 100, "misses": 5},
+                        ...
+                    }
+                }
+
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': float(self.hits) / total if total else 0.0,
+                'endpoints': dict((endpoint, dict(counters)) for endpoint, counters in self.endpoint_stats.items()),
+            }
+
+    def cacheable(self, url):
+        return bool(self.ttls.get(url))
+
+    @staticmethod
+    def key(url, params):
+        """Builds the cache key of an api call, the api key is left out (login identifies the account)."""
+        items = sorted((name, value) for name, value in params.items() if name != 'key' and value is not None)
+        return url + '?' + urlencode(items)
+
+    def get(self, url, params):
+        """Returns the cached result of an api call, :data:`MISSING` if there is none.
+
+        Args:
+            url (str): relative api path (file/info, ...).
+            params (dict): parameters of the call.
+
+        Returns:
+            object: cached result or :data:`MISSING`.
+
+        """
+        if not self.cacheable(url):
+            return MISSING
+
+        value = self.backend.get(self.key(url, params))
+        hit = value is not MISSING
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.endpoint_stats[url]['hits' if hit else 'misses'] += 1
+
+        return value
+
+    def store(self, url, params, result):
+        """Caches the result of a read only call, or invalidates the entries a mutating call changes.
+
+        Args:
+            url (str): relative api path (file/info, ...).
+            params (dict): parameters of the call.
+            result (object): result of the call.
+
+        Returns:
+            None
+
+        """
+        if self.cacheable(url):
+            self.backend.set(self.key(url, params), result, self.ttls[url], self.tags(url, params, result))
+        else:
+            tags = self.invalidated_tags(url, params)
+            if tags:
+                self.backend.invalidate(tags)
+
+    def invalidate(self, tags):
+        """Drops every cached result having one of the tags (built with :func:`file_tag`, :func:`folder_tag`, ...).
+
+        Args:
+            tags (iterable): tags to invalidate.
+
+        Returns:
+            None
+
+        """
+        self.backend.invalidate(list(tags))
+
+    def clear(self):
+        self.backend.clear()
+
+    @staticmethod
+    def tags(url, params, result):
+        """Returns tags of a cached result, naming the files and folders it describes."""
+        if url == 'account/info':
+            return [ACCOUNT_TAG]
+
+        if url in ('file/info', 'file/getsplash'):
+            return [file_tag(file_id) for file_id in params.get('file', '').split(',') if file_id]
+
+        if url == 'file/listfolder':
+            result = result or {}
+            tags = [folder_tag(params.get('folder'))]
+            tags.extend(folder_tag(folder.get('id')) for folder in result.get('folders') or ())
+            tags.extend(file_tag(f.get('linkextid')) for f in result.get('files') or ())
+            return tags
+
+        return []
+
+    @staticmethod
+    def invalidated_tags(url, params):
+        """Returns tags of the cached results a mutating call changes."""
+        if url == 'file/rename':
+            return [file_tag(params.get('file'))]
+
+        if url == 'file/delete':
+            return [file_tag(params.get('file')), ACCOUNT_TAG]
+
+        if url == 'file/renamefolder':
+            return [folder_tag(params.get('folder'))]
+
+        return []
@@ -0,0 +1,290 @@
+from __future__ import absolute_import
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from .api_exceptions import ConversionFailedException
+from .models import untyped
+from .ratelimit import clock
+
+FAILED_STATUSES = ('failed', 'error')
+
+
+class Conversion(object):
+    """Conversion of a file watched by :class:`ConversionTracker`.
+
+    Attributes:
+        file_id (str): id of the converted file.
+        folder_id (str): id of the folder of the file, None for ``Home`` folder.
+        info (dict): latest :meth:`OpenLoad.running_conversions` entry of the file, None until listed.
+        future (:obj:`concurrent.futures.Future`): resolves to the last listed entry (None if never listed)
+                                                   once the file dropped off the list, or to
+                                                   ConversionFailedException if it got a failed status.
+
+    The conversion can be awaited from asyncio code (``info = await conversion``).
+
+    """
+
+    __slots__ = ('file_id', 'folder_id', 'info', 'future', '_missing')
+
+    def __init__(self, file_id, folder_id=None):
+        self.file_id = file_id
+        self.folder_id = folder_id
+        self.info = None
+        self.future = Future()
+        self._missing = 0
+
+    @property
+    def progress(self):
+        """float: progress of the conversion between 0 and 1, 1 once finished, None until listed."""
+        if self.future.done() and not self.future.exception():
+            return 1.0
+        return float(self.info['progress']) if self.info and self.info.get('progress') is not None else None
+
+    @property
+    def status(self):
+        """str: listed status of the conversion, ``finished`` once it dropped off the list."""
+        if self.future.done() and not self.future.exception():
+            return 'finished'
+        return (self.info or {}).get('status')
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """Waits for the conversion to finish, returns its last listed entry, raises ConversionFailedException."""
+        return self.future.result(timeout)
+
+    def __await__(self):
+        import asyncio
+        return asyncio.wrap_future(self.future).__await__()
+
+    def __repr__(self):
+        return '<Conversion {file_id!r} {status} {progress}>'.format(file_id=self.file_id, status=self.status,
+                                                                    progress=self.progress)
+
+
+class ConversionTracker(object):
+    """Watches file conversions, polling ``running_conversions`` once per interval for each folder.
+
+    A folder is listed once per poll however many of its files are watched, so thousands of conversions in a few
+    folders cost a few calls per interval. Folders due at the same time are listed by workers threads.
+    Changes of the ``progress`` or ``status`` of a file are reported to on_event. A file not listed by
+    missing_polls consecutive polls of its folder has finished converting (running conversions only are listed).
+
+    Args:
+        ol (OpenLoad): client used for the api calls.
+        interval (:obj:`float`, optional): seconds between two polls of a folder.
+        workers (:obj:`int`, optional): number of folders listed at the same time.
+        missing_polls (:obj:`int`, optional): consecutive polls a file must be missing from to be finished.
+        max_poll_errors (:obj:`int`, optional): consecutive failed polls after which conversions of a folder fail.
+        on_event (:obj:`callable`, optional): called with (:class:`Conversion`, event), event being ``progress``
+                                              (progress or status changed), ``finished`` or ``failed``.
+
+    """
+
+    def __init__(self, ol, interval=5.0, workers=4, missing_polls=2, max_poll_errors=5, on_event=None):
+        self.ol = ol
+        self.interval = interval
+        self.missing_polls = missing_polls
+        self.max_poll_errors = max_poll_errors
+        self.on_event = on_event
+
+        self._folders = {}
+        self._due = {}
+        self._errors = {}
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._poller = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(wait=exc_type is None)
+
+    def __len__(self):
+        with self._condition:
+            return sum(len(conversions) for conversions in self._folders.values())
+
+    def convert(self, file_id, folder_id=None, callback=None):
+        """Starts the conversion of a file (:meth:`OpenLoad.convert_file`) and watches it.
+
+        Args:
+            file_id (str): id of the file to be converted.
+            folder_id (:obj:`str`, optional): id of the folder of the file, ``Home`` folder if not provided.
+            callback (:obj:`callable`, optional): called with the :class:`Conversion` once it finished or failed.
+
+        Returns:
+            Conversion: the watched conversion.
+
+        """
+        with self._condition:
+            closed = self._closed
+        if not closed:
+            self.ol.convert_file(file_id)
+        return self.watch(file_id, folder_id=folder_id, callback=callback)
+
+    def watch(self, file_id, folder_id=None, callback=None):
+        """Watches the conversion of a file, already started.
+
+        Args:
+            file_id (str): id of the converted file.
+            folder_id (:obj:`str`, optional): id of the folder of the file, ``Home`` folder if not provided.
+            callback (:obj:`callable`, optional): called with the :class:`Conversion` once it finished or failed.
+
+        Returns:
+            Conversion: the watched conversion, the one already watched for file_id if any. Once the tracker
+                        is closed, a conversion failed with ConversionFailedException.
+
+        """
+        with self._condition:
+            if self._closed:
+                conversion = None
+            else:
+                conversions = self._folders.setdefault(folder_id, {})
+                conversion = conversions.get(file_id)
+                if conversion is None:
+                    conversion = conversions[file_id] = Conversion(file_id, folder_id)
+                    conversion.future.set_running_or_notify_cancel()
+                if folder_id not in self._due:
+                    self._due[folder_id] = clock()
+                self._start()
+                self._condition.notify_all()
+
+        if conversion is None:
+            conversion = _failed_conversion(file_id, folder_id, ConversionFailedException(
+                '{0} not watched, the tracker is closed'.format(file_id)))
+
+        if callback is not None:
+            conversion.future.add_done_callback(lambda future: callback(conversion))
+        return conversion
+
+    def close(self, wait=True):
+        """Stops watching conversions.
+
+        Args:
+            wait (:obj:`bool`, optional): If this is set to true, wait for every conversion to finish first,
+                                          unfinished ones fail with ConversionFailedException otherwise.
+
+        """
+        with self._condition:
+            while wait and self._folders:
+                self._condition.wait()
+            self._closed = True
+            self._condition.notify_all()
+            unfinished = [conversion for conversions in self._folders.values() for conversion in conversions.values()]
+            self._folders.clear()
+
+        for conversion in unfinished:
+            conversion.future.set_exception(ConversionFailedException('{0} stopped being watched'
+                                                                      .format(conversion.file_id)))
+        if self._poller is not None:
+            self._poller.join()
+        self._executor.shutdown(wait=True)
+
+    def _start(self):
+        if self._poller is None:
+            self._poller = threading.Thread(target=self._poll_forever)
+            self._poller.daemon = True
+            self._poller.start()
+
+    def _poll_forever(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    now = clock()
+                    due = [folder_id for folder_id, due_at in self._due.items() if due_at <= now]
+                    if due:
+                        break
+                    self._condition.wait(min(self._due.values()) - now if self._due else None)
+                if self._closed:
+                    return
+                for folder_id in due:
+                    self._due[folder_id] = now + self.interval
+
+            list(self._executor.map(self._poll, due))
+
+    def _poll(self, folder_id):
+        try:
+            listed = untyped(self.ol).running_conversions(folder_id) or []
+        except Exception as e:
+            with self._condition:
+                self._errors[folder_id] = errors = self._errors.get(folder_id, 0) + 1
+                failed = list(self._folders.get(folder_id, {}).values()) if errors >= self.max_poll_errors else []
+            for conversion in failed:
+                self._finish(conversion, error=e)
+            return
+
+        listed = dict((info.get('linkextid'), info) for info in listed)
+        with self._condition:
+            self._errors.pop(folder_id, None)
+            conversions = list(self._folders.get(folder_id, {}).values())
+
+        for conversion in conversions:
+            info = listed.get(conversion.file_id)
+            if info is None:
+                conversion._missing += 1
+                if conversion._missing >= self.missing_polls:
+                    self._finish(conversion, info=conversion.info)
+                continue
+
+            conversion._missing = 0
+            previous, conversion.info = conversion.info, info
+            if info.get('status') in FAILED_STATUSES:
+                self._finish(conversion, error=ConversionFailedException(
+                    'conversion of {0} {1}'.format(conversion.file_id, info.get('status'))))
+            elif previous is None or any(previous.get(key) != info.get(key) for key in ('progress', 'status')):
+                self._event(conversion, 'progress')
+
+    def _finish(self, conversion, info=None, error=None):
+        with self._condition:
+            conversions = self._folders.get(conversion.folder_id, {})
+            if conversions.pop(conversion.file_id, None) is None:
+                return
+            if not conversions:
+                del self._folders[conversion.folder_id]
+                self._due.pop(conversion.folder_id, None)
+            self._condition.notify_all()
+
+        if error is not None:
+            conversion.future.set_exception(error)
+        else:
+            conversion.future.set_result(info)
+        self._event(conversion, 'failed' if error is not None else 'finished')
+
+    def _event(self, conversion, event):
+        if self.on_event is not None:
+            self.on_event(conversion, event)
+
+
+def _failed_conversion(file_id, folder_id, error):
+    """Returns a :class:`Conversion` which is not watched, failed with error."""
+    conversion = Conversion(file_id, folder_id)
+    conversion.future.set_running_or_notify_cancel()
+    conversion.future.set_exception(error)
+    return conversion
+
+
+def convert_files(ol, file_ids, folder_id=None, interval=5.0):
+    """Converts many files of a folder and yields each :class:`Conversion` as soon as it finished or failed.
+
+    See :class:`ConversionTracker`, conversions still running when the generator is closed stop being watched.
+    A file whose conversion can't be started (``file/convert`` error) is yielded failed with that error,
+    the others go on.
+
+    """
+    tracker = ConversionTracker(ol, interval=interval)
+    try:
+        conversions = {}
+        for file_id in file_ids:
+            try:
+                conversion = tracker.convert(file_id, folder_id=folder_id)
+            except Exception as e:
+                conversion = _failed_conversion(file_id, folder_id, e)
+            conversions[conversion.future] = conversion
+        for future in as_completed(conversions):
+            yield conversions[future]
+    finally:
+        tracker.close(wait=False)
@@ -0,0 +1,375 @@
+from __future__ import absolute_import
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .api_exceptions import CaptchaRequiredException, ChecksumMismatchException
+from .models import untyped
+from .ratelimit import clock
+from .streaming import CHUNK_SIZE, ByteCounter, sha1_of
+
+PART_SUFFIX = '.part'
+RANGES_SUFFIX = '.ranges'
+RANGE_SIZE = 16 * 1024 * 1024
+
+# Answers of the download servers to a url whose ticket expired.
+EXPIRED_STATUSES = (403, 404, 410)
+
+replace_file = getattr(os, 'replace', os.rename)
+
+
+def request_download_link(ol, file_id, captcha_solver=None):
+    """Gets a download ticket, solves its captcha, waits its wait_time and requests the download link.
+
+    The captcha is solved during the wait_time, only the rest of the wait is slept.
+
+    Args:
+        ol (OpenLoad): client used for the api calls.
+        file_id (str): id of the file to be downloaded.
+        captcha_solver (:obj:`callable`, optional): called with the :meth:`OpenLoad.prepare_download` result
+                                                    when it has a captcha_url, returns the captcha solution.
+
+    Returns:
+        dict: same as :meth:`OpenLoad.get_download_link`.
+
+    """
+    ticket = untyped(ol).prepare_download(file_id)
+    ready_at = clock() + (ticket.get('wait_time') or 0)
+
+    captcha_response = None
+    if ticket.get('captcha_url'):
+        if captcha_solver is None:
+            raise CaptchaRequiredException('download of {0} requires a captcha_solver'.format(file_id))
+        captcha_response = captcha_solver(ticket)
+
+    wait = ready_at - clock()
+    if wait > 0:
+        time.sleep(wait)
+
+    return untyped(ol).get_download_link(file_id, ticket['ticket'], captcha_response)
+
+
+class RangesNotSupported(Exception):
+    pass
+
+
+class DownloadLink(object):
+    """Download link of a file, shared by the connections downloading it and renewed when it expires.
+
+    Args:
+        ol (OpenLoad): client used for the api calls and the download.
+        file_id (str): id of the file to be downloaded.
+        captcha_solver (:obj:`callable`, optional): see :func:`request_download_link`.
+        max_renewals (:obj:`int`, optional): maximum number of times the link is requested again.
+        info (:obj:`dict`, optional): get_download_link result to start with, requested if not provided.
+
+    Attributes:
+        info (dict): latest :meth:`OpenLoad.get_download_link` result (url, size, sha1, ...).
+        renewals (int): number of times the link was requested again.
+
+    """
+
+    def __init__(self, ol, file_id, captcha_solver=None, max_renewals=3, info=None):
+        self.ol = ol
+        self.file_id = file_id
+        self.captcha_solver = captcha_solver
+        self.max_renewals = max_renewals
+        self.renewals = 0
+        self.info = info or request_download_link(ol, file_id, captcha_solver=captcha_solver)
+        self._lock = threading.Lock()
+
+    def renew(self, expired_url):
+        """Requests a new link (new ticket) unless another connection already did.
+
+        Args:
+            expired_url (str): url found expired.
+
+        Returns:
+            bool: True if a link newer than expired_url is available.
+
+        """
+        with self._lock:
+            if self.info['url'] != expired_url:
+                return True
+            if self.renewals >= self.max_renewals:
+                return False
+            self.renewals += 1
+            self.info = request_download_link(self.ol, self.file_id, captcha_solver=self.captcha_solver)
+            return True
+
+    def open(self, start=0, end=None):
+        """Makes a streamed GET request of the file bytes from start to end (included), renewing expired links.
+
+        Args:
+            start (:obj:`int`, optional): first byte.
+            end (:obj:`int`, optional): last byte, None for the end of the file.
+
+        Returns:
+            requests.Response: response, 206 if a range was requested and the server supports ranges.
+
+        """
+        headers = None
+        if start or end is not None:
+            headers = {'Range': 'bytes={0}-{1}'.format(start, '' if end is None else end)}
+
+        while True:
+            url = self.info['url']
+            response = self.ol.session.get(url, headers=headers, stream=True, timeout=self.ol.timeout)
+            if response.status_code not in EXPIRED_STATUSES or not self.renew(url):
+                break
+            response.close()
+
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        return response
+
+
+def download(ol, file_id, dest, captcha_solver=None, chunk_size=CHUNK_SIZE, verify_sha1=True, callback=None,
+             connections=1, range_size=RANGE_SIZE, link=None):
+    """Downloads a file to disk in chunks, resuming what a previous attempt left.
+
+    Bytes are written to ``<path>.part``, renamed to path once the size (and sha1) of the file are checked.
+    An existing ``.part`` file is resumed with a Range request, attempts retried by the retry policy of ol
+    (endpoint ``download``) resume from the bytes already written as well.
+
+    With more than one connection, the file is preallocated and split in ranges of range_size bytes fetched
+    over that many connections, each written in place. The ranges done are recorded in ``<path>.part.ranges``,
+    so a failed download only fetches the missing ranges again. Expired links are requested again.
+    A file whose size the api doesn't report (``size: false``) is downloaded over one connection, from the start.
+
+    Args:
+        ol (OpenLoad): client used for the api calls and the download.
+        file_id (str): id of the file to be downloaded.
+        dest (str): path of the downloaded file, or directory to download the file to (under its own name).
+        captcha_solver (:obj:`callable`, optional): see :func:`request_download_link`.
+        chunk_size (:obj:`int`, optional): bytes read from the connection and written to disk at a time.
+        verify_sha1 (:obj:`bool`, optional): If this is set to true, check the sha1 of the downloaded file.
+        callback (:obj:`callable`, optional): called with the number of bytes of each written chunk
+                                              (from several threads if connections > 1).
+        connections (:obj:`int`, optional): number of ranges downloaded at the same time.
+        range_size (:obj:`int`, optional): size in bytes of the ranges.
+        link (:obj:`dict`, optional): get_download_link result of the file (see :class:`DownloadLink`).
+
+    Returns:
+        str: path of the downloaded file.
+
+    """
+    link = DownloadLink(ol, file_id, captcha_solver=captcha_solver, info=link)
+
+    path = dest
+    if os.path.isdir(dest):
+        path = os.path.join(dest, os.path.basename(link.info['name']))
+    part_path = path + PART_SUFFIX
+    ranges_path = part_path + RANGES_SUFFIX
+    size = _size_of(link.info)
+    verify_sha1 = verify_sha1 and bool(link.info.get('sha1'))
+
+    hasher = None
+    if size is None and os.path.exists(ranges_path):
+        # Ranges need the size, the file is downloaded again sequentially.
+        os.remove(ranges_path)
+    # A download made in ranges goes on in ranges, its .part file is not filled from the start.
+    if size is not None and ((connections > 1 and size > range_size) or os.path.exists(ranges_path)):
+        try:
+            _fetch_ranges(ol, link, part_path, size, max(connections, 1), range_size, chunk_size, callback)
+        except RangesNotSupported:
+            os.remove(part_path)
+            os.remove(ranges_path)
+        else:
+            os.remove(ranges_path)
+            hasher = sha1_of(part_path, chunk_size) if verify_sha1 else None
+            verify_sha1 = False
+
+    if size is None or not os.path.exists(part_path) or os.path.getsize(part_path) < size or verify_sha1:
+        hasher = _transfer(ol, _fetch, (link, part_path, size, chunk_size, verify_sha1), callback)
+
+    if hasher is not None and hasher.hexdigest() != link.info['sha1']:
+        # Resuming a corrupted file would fail again, the next attempt starts over.
+        os.remove(part_path)
+        raise ChecksumMismatchException('sha1 of downloaded {0} is {1}, expected {2}'.format(
+            file_id, hasher.hexdigest(), link.info['sha1']))
+
+    replace_file(part_path, path)
+    return path
+
+
+def _size_of(info):
+    """Size of the file of a get_download_link result, None when the api doesn't know it (``size: false``)."""
+    size = info.get('size')
+    if size is None or size is False:
+        return None
+    try:
+        return int(size)
+    except (TypeError, ValueError):
+        return None
+
+
+def _transfer(ol, fetch, args, callback):
+    """Calls fetch with args and a progress callback, retried by the retry policy of ol.
+
+    Each attempt is reported to the hooks of ol (endpoint ``download``), its bytes are counted
+    by the progress callback.
+    """
+    hooks = ol.hooks
+
+    def attempt():
+        if hooks is None:
+            return fetch(*args + (callback,))
+
+        counter = ByteCounter(callback)
+        hooks.request_start('download')
+        started = clock()
+        error = None
+        try:
+            return fetch(*args + (counter,))
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            hooks.request_end('download', clock() - started, exception=error, received=counter.count)
+
+    if ol.retry_policy is not None:
+        on_retry = hooks.retry if hooks is not None else None
+        return ol.retry_policy.run('download', attempt, on_retry=on_retry)
+    return attempt()
+
+
+def _fetch(link, part_path, size, chunk_size, verify_sha1, callback):
+    """Appends the missing bytes of the file to part_path, raises if the connection ends before size bytes.
+
+    When size is None (unknown), the whole file is fetched again and written until the connection ends.
+    Returns the sha1 hash object of the whole file (bytes already on disk included), None if not verify_sha1.
+    """
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if size is None or offset > size:
+        offset = 0
+
+    # Bytes left by a previous attempt are read once, the new ones are hashed as they arrive.
+    hasher = None
+    if verify_sha1:
+        hasher = sha1_of(part_path, chunk_size) if offset else hashlib.sha1()
+
+    with open(part_path, 'ab' if offset else 'wb') as f:
+        if size is None or offset < size:
+            response = link.open(offset)
+            try:
+                if offset and response.status_code != 206:
+                    # Range ignored by the server, the whole file is sent again.
+                    f.truncate(0)
+                    offset = 0
+                    hasher = hashlib.sha1() if verify_sha1 else None
+
+                for chunk in response.iter_content(chunk_size):
+                    f.write(chunk)
+                    offset += len(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    if callback is not None:
+                        callback(len(chunk))
+            finally:
+                response.close()
+
+    if size is None:
+        return hasher
+
+    if offset < size:
+        raise requests.exceptions.ChunkedEncodingError(
+            'connection closed after {0} of {1} bytes'.format(offset, size))
+
+    if offset > size:
+        os.remove(part_path)
+        raise ChecksumMismatchException('downloaded {0} bytes, expected {1}'.format(offset, size))
+
+    return hasher
+
+
+def _preallocate(path, size):
+    with open(path, 'wb') as f:
+        fallocate = getattr(os, 'posix_fallocate', None)
+        try:
+            fallocate(f.fileno(), 0, size)
+        except (TypeError, OSError):  # Python 2, Windows, file systems without fallocate
+            f.truncate(size)
+
+
+def _load_ranges(ranges_path, size, range_size):
+    try:
+        with open(ranges_path) as f:
+            state = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+    if state.get('size') != size or state.get('range_size') != range_size:
+        return None
+    return set(state['done'])
+
+
+def _save_ranges(ranges_path, size, range_size, done):
+    temporary_path = ranges_path + '.tmp'
+    with open(temporary_path, 'w') as f:
+        json.dump({'size': size, 'range_size': range_size, 'done': sorted(done)}, f)
+    replace_file(temporary_path, ranges_path)
+
+
+def _fetch_ranges(ol, link, part_path, size, connections, range_size, chunk_size, callback):
+    """Fetches the ranges of the file missing in part_path over several connections."""
+    ranges_path = part_path + RANGES_SUFFIX
+    done = _load_ranges(ranges_path, size, range_size)
+    if done is None or not os.path.exists(part_path):
+        done = set()
+        _preallocate(part_path, size)
+        _save_ranges(ranges_path, size, range_size, done)
+
+    lock = threading.Lock()
+
+    def fetch(start):
+        end = min(start + range_size, size) - 1
+        _transfer(ol, _fetch_range, (link, part_path, [start], end, chunk_size), callback)
+
+        with lock:
+            done.add(start)
+            _save_ranges(ranges_path, size, range_size, done)
+
+    starts = [start for start in range(0, size, range_size) if start not in done]
+    executor = ThreadPoolExecutor(max_workers=min(connections, len(starts)) or 1)
+    try:
+        futures = [executor.submit(fetch, start) for start in starts]
+        errors = [future.exception() for future in futures]
+    finally:
+        executor.shutdown(wait=True)
+
+    for error in errors:
+        if error is not None:
+            raise error
+
+
+def _fetch_range(link, part_path, position, end, chunk_size, callback):
+    """Writes the bytes from position[0] to end in place, position[0] follows the bytes written."""
+    response = link.open(position[0], end)
+    try:
+        if response.status_code != 206:
+            raise RangesNotSupported('download server ignored the Range header')
+
+        with open(part_path, 'r+b') as f:
+            f.seek(position[0])
+            for chunk in response.iter_content(chunk_size):
+                chunk = chunk[:end + 1 - position[0]]
+                f.write(chunk)
+                position[0] += len(chunk)
+                if callback is not None:
+                    callback(len(chunk))
+    finally:
+        response.close()
+
+    if position[0] <= end:
+        raise requests.exceptions.ChunkedEncodingError(
+            'connection closed {0} bytes before the end of the range'.format(end + 1 - position[0]))
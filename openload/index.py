@@ -0,0 +1,428 @@
+from __future__ import absolute_import
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .api_exceptions import FileNotFoundException
+from .models import untyped
+from .streaming import sha1_of
+from .walk import walk
+
+# Key of the Home folder, its id is not given by the api.
+HOME = 'home'
+
+SUBTREE = '''
+    WITH RECURSIVE subtree(id) AS (
+        SELECT ? UNION ALL SELECT folders.id FROM folders JOIN subtree ON folders.parent_id = subtree.id)
+'''
+
+WILDCARDS = frozenset('*?[')
+
+
+def _file_row(folder_id, f):
+    return (f['linkextid'], folder_id, f.get('name'), f.get('sha1'), int(f.get('size') or 0), f.get('content_type'),
+            f.get('upload_at'), f.get('status'), json.dumps(f))
+
+
+def _listing_signature(subfolders, files):
+    listing = [[(folder['id'], folder.get('name')) for folder in subfolders], files]
+    return hashlib.sha1(json.dumps(listing, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class AccountIndex(object):
+    """Local mirror of the folders and files of an account in a sqlite database, queried instead of the api.
+
+    :meth:`refresh` walks the account (see :func:`openload.walk.walk`) and stores every listing.
+    Folders whose listing didn't change are not rewritten, folders refreshed less than ``max_age`` seconds ago
+    are not listed again (their known subfolders are walked). Files are indexed by linkextid, sha1, folder,
+    name and content type. ::
+
+        index = AccountIndex(ol, '/tmp/account.sqlite')
+        index.refresh(max_age=3600)
+        index.find(sha1='c6531f5ce9669d6547023d92aea4805b7c45d133')
+        index.folder_size('4258')
+
+    The index also makes uploads skip files already in the account (same sha1), see :meth:`upload_file`.
+
+    Args:
+        ol (OpenLoad): client used to refresh the index.
+        path (str): path of the sqlite database file, created if missing (``:memory:`` for a temporary index).
+
+    """
+
+    def __init__(self, ol, path):
+        self.ol = ol
+        self.path = path
+        self._lock = threading.Lock()
+        self._uploading = {}
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+        with self._lock:
+            self._connection.executescript('''
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS folders (
+                    id TEXT PRIMARY KEY, parent_id TEXT, name TEXT, path TEXT NOT NULL DEFAULT '',
+                    signature TEXT, refreshed_at REAL);
+                CREATE INDEX IF NOT EXISTS folders_parent_id ON folders (parent_id);
+                CREATE TABLE IF NOT EXISTS files (
+                    linkextid TEXT PRIMARY KEY, folderid TEXT NOT NULL, name TEXT, sha1 TEXT, size INTEGER,
+                    content_type TEXT, upload_at TEXT, status TEXT, data TEXT NOT NULL);
+                CREATE INDEX IF NOT EXISTS files_folderid ON files (folderid);
+                CREATE INDEX IF NOT EXISTS files_sha1 ON files (sha1);
+                CREATE INDEX IF NOT EXISTS files_name ON files (name);
+                CREATE INDEX IF NOT EXISTS files_content_type ON files (content_type);
+                CREATE TABLE IF NOT EXISTS local_files (
+                    path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, sha1 TEXT NOT NULL);
+            ''')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def refresh(self, folder_id=None, max_age=None, workers=4):
+        """Lists the folder tree and mirrors it in the index.
+
+        Args:
+            folder_id (:obj:`str`, optional): id of the folder to refresh (with its subfolders), ``Home`` by default.
+            max_age (:obj:`float`, optional): folders refreshed less than max_age seconds ago are not listed again.
+            workers (:obj:`int`, optional): maximum number of folders listed at the same time.
+
+        Returns:
+            dict: number of folders ``listed``, ``changed`` (rewritten) and ``skipped`` (fresh enough).
+
+        """
+        root = folder_id or HOME
+        base_path = self._folder_path(root)
+        fresh_after = time.time() - max_age if max_age is not None else None
+        from_index = set()
+        stats = {'listed': 0, 'changed': 0, 'skipped': 0}
+
+        def list_folder(key):
+            key = key or HOME
+            if fresh_after is not None:
+                listing = self._stored_listing(key, fresh_after)
+                if listing is not None:
+                    from_index.add(key)
+                    return listing
+            return untyped(self.ol).list_folder(None if key == HOME else key)
+
+        with self._lock:
+            self._connection.execute('INSERT OR IGNORE INTO folders (id, path) VALUES (?, ?)', (root, base_path))
+
+        for folder, subfolders, files in walk(self.ol, folder_id, workers=workers, list_folder=list_folder):
+            key = folder['id'] or HOME
+            path = '/'.join(part for part in (base_path, folder['path']) if part)
+
+            if key in from_index:
+                stats['skipped'] += 1
+                with self._lock:
+                    self._connection.execute('UPDATE folders SET path = ? WHERE id = ?', (path, key))
+                continue
+
+            stats['listed'] += 1
+            if self._store_listing(key, path, subfolders, files):
+                stats['changed'] += 1
+
+        return stats
+
+    def update_file_info(self, file_ids=None, max_workers=4):
+        """Updates the indexed files with their file_info (sha1, size, status, ...), files not found are removed.
+
+        Args:
+            file_ids (:obj:`iterable`, optional): ids of the files to update, all indexed files by default.
+            max_workers (:obj:`int`, optional): see :meth:`OpenLoad.file_info_many`.
+
+        Returns:
+            tuple: (number of files updated, number of files removed).
+
+        """
+        if file_ids is None:
+            with self._lock:
+                file_ids = [row[0] for row in self._connection.execute('SELECT linkextid FROM files')]
+
+        infos, errors = untyped(self.ol).file_info_many(file_ids, max_workers=max_workers)
+        missing = [file_id for file_id, error in errors.items() if isinstance(error, FileNotFoundException)]
+
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                for file_id, info in infos.items():
+                    row = self._connection.execute('SELECT data FROM files WHERE linkextid = ?', (file_id,)).fetchone()
+                    if row is None:
+                        continue
+                    data = dict(json.loads(row[0]), **dict((k, v) for k, v in info.items() if k != 'id'))
+                    self._connection.execute(
+                        'UPDATE files SET name = ?, sha1 = ?, size = ?, content_type = ?, data = ? '
+                        'WHERE linkextid = ?', (data.get('name'), data.get('sha1'), int(data.get('size') or 0),
+                                                data.get('content_type'), json.dumps(data), file_id))
+                self._connection.executemany('DELETE FROM files WHERE linkextid = ?', [(i,) for i in missing])
+
+        return len(infos), len(missing)
+
+    def local_sha1(self, file_path):
+        """Returns the sha1 of a local file, remembered until the size or modification time of the file change."""
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+
+        with self._lock:
+            row = self._connection.execute('SELECT size, mtime, sha1 FROM local_files WHERE path = ?',
+                                           (file_path,)).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime:
+            return row[2]
+
+        sha1 = sha1_of(file_path).hexdigest()
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO local_files VALUES (?, ?, ?, ?)',
+                                     (file_path, stat.st_size, stat.st_mtime, sha1))
+        return sha1
+
+    def find_duplicate(self, sha1, folder_id=None, same_folder=False):
+        """Returns an indexed file having the given sha1, preferably one of folder_id, None if there is none.
+
+        Args:
+            sha1 (str): sha1 of the content.
+            folder_id (:obj:`str`, optional): id of the folder searched first (``home`` for ``Home`` folder).
+            same_folder (:obj:`bool`, optional): If this is set to true, only files of folder_id are returned.
+
+        Returns:
+            dict: list_folder dict of the file.
+
+        """
+        query = 'SELECT data FROM files WHERE sha1 = ?'
+        args = [sha1]
+        if same_folder:
+            query += ' AND folderid = ?'
+            args.append(folder_id or HOME)
+        else:
+            query += ' ORDER BY folderid = ? DESC'
+            args.append(folder_id or HOME)
+
+        with self._lock:
+            row = self._connection.execute(query + ' LIMIT 1', args).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def add_file(self, folder_id, file_info):
+        """Indexes a file (list_folder dict) added to a folder since the last refresh."""
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                     _file_row(folder_id or HOME, file_info))
+
+    def upload_file(self, file_path, folder_id=None, rename=False, same_folder=False, httponly=False,
+                    callback=None):
+        """Uploads a file unless a file with the same content (sha1) is already in the account.
+
+        Note:
+            The local file is hashed first, its sha1 is remembered with its size and modification time,
+            re-ingesting the same files doesn't hash them again. The api has no way to copy a file,
+            a duplicate in another folder is returned as is (unless same_folder is set).
+
+        Args:
+            file_path (str): full path of the file to be uploaded.
+            folder_id (:obj:`str`, optional): folder-ID to upload to, ``Home`` folder if not provided.
+            rename (:obj:`bool`, optional): If this is set to true, a duplicate is renamed to the local file name.
+            same_folder (:obj:`bool`, optional): If this is set to true, only duplicates in folder_id are reused.
+            httponly (:obj:`bool`, optional): If this is set to true, use only http upload links.
+            callback (:obj:`callable`, optional): see :meth:`OpenLoad.upload_file`.
+
+        Returns:
+            dict: uploaded (or already present) file info (id, name, sha1, size, content_type, url)
+                  with ``duplicate`` True if nothing was uploaded.
+
+        """
+        sha1 = self.local_sha1(file_path)
+        name = os.path.basename(file_path)
+
+        # Identical files uploaded at the same time: the first one uploads, the others wait and reuse it.
+        with self._lock:
+            uploading = self._uploading.get(sha1)
+            if uploading is None:
+                self._uploading[sha1] = threading.Event()
+        if uploading is not None:
+            uploading.wait()
+            return self.upload_file(file_path, folder_id=folder_id, rename=rename, same_folder=same_folder,
+                                    httponly=httponly, callback=callback)
+
+        try:
+            duplicate = self.find_duplicate(sha1, folder_id, same_folder=same_folder)
+            if duplicate is None:
+                result = self.ol.upload_file(file_path, folder_id=folder_id, sha1=sha1, httponly=httponly,
+                                             callback=callback)
+                self._add_upload(folder_id, result, sha1)
+                return dict(result, duplicate=False)
+        finally:
+            with self._lock:
+                self._uploading.pop(sha1).set()
+
+        if rename and duplicate.get('name') != name:
+            self.ol.rename_file(duplicate['linkextid'], name)
+            duplicate = dict(duplicate, name=name)
+            self.add_file(self.folder_of(duplicate['linkextid']), duplicate)
+
+        return {'id': duplicate['linkextid'], 'name': duplicate.get('name'), 'sha1': sha1,
+                'size': duplicate.get('size'), 'content_type': duplicate.get('content_type'),
+                'url': duplicate.get('link'), 'duplicate': True}
+
+    def _add_upload(self, folder_id, result, sha1=None):
+        self.add_file(folder_id, {
+            'linkextid': result['id'], 'folderid': folder_id, 'name': result.get('name'),
+            'sha1': result.get('sha1') or sha1, 'size': result.get('size'),
+            'content_type': result.get('content_type'), 'link': result.get('url'), 'status': 'active'})
+
+    def remove_file(self, linkextid):
+        """Removes a file deleted since the last refresh from the index."""
+        with self._lock:
+            self._connection.execute('DELETE FROM files WHERE linkextid = ?', (linkextid,))
+
+    def subfolders(self, folder_id=HOME):
+        """Returns the ids of the indexed folders of a subtree by path relative to folder_id ('' for folder_id)."""
+        with self._lock:
+            rows = self._connection.execute(SUBTREE + 'SELECT folders.id, folders.path FROM folders '
+                                                      'JOIN subtree ON folders.id = subtree.id',
+                                            (folder_id,)).fetchall()
+            base = self._connection.execute('SELECT path FROM folders WHERE id = ?', (folder_id,)).fetchone()
+
+        prefix = len(base[0]) + 1 if base is not None and base[0] else 0
+        return dict((path[prefix:] if folder_id != id_ else '', id_) for id_, path in rows)
+
+    def folder_of(self, linkextid):
+        """Returns the id of the folder of an indexed file (``home`` for ``Home`` folder), None if not indexed."""
+        with self._lock:
+            row = self._connection.execute('SELECT folderid FROM files WHERE linkextid = ?', (linkextid,)).fetchone()
+        return row[0] if row is not None else None
+
+    def get(self, linkextid):
+        """Returns the list_folder dict of an indexed file, None if it is not indexed."""
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM files WHERE linkextid = ?', (linkextid,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def find(self, sha1=None, name=None, content_type=None, folder_id=None, recursive=False, limit=None):
+        """Finds indexed files, every given criterion must match.
+
+        Args:
+            sha1 (:obj:`str`, optional): sha1 of the files.
+            name (:obj:`str`, optional): name of the files, glob pattern (``*.mp4``) if it has wildcards.
+            content_type (:obj:`str`, optional): content type of the files, glob pattern (``video/*``) accepted.
+            folder_id (:obj:`str`, optional): id of the folder of the files (``home`` for ``Home`` folder).
+            recursive (:obj:`bool`, optional): If this is set to true, files of subfolders of folder_id match too.
+            limit (:obj:`int`, optional): maximum number of files returned.
+
+        Returns:
+            list: list_folder dicts of the files.
+
+        """
+        query, args = 'SELECT data FROM files', []
+        clauses = []
+
+        if folder_id is not None and recursive:
+            query = SUBTREE + 'SELECT data FROM files JOIN subtree ON files.folderid = subtree.id'
+            args.append(folder_id)
+        elif folder_id is not None:
+            clauses.append('folderid = ?')
+            args.append(folder_id)
+
+        for column, value in (('sha1', sha1), ('name', name), ('content_type', content_type)):
+            if value is not None:
+                clauses.append('{0} {1} ?'.format(column, 'GLOB' if WILDCARDS & set(value) else '='))
+                args.append(value)
+
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        if limit is not None:
+            query += ' LIMIT ?'
+            args.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(query, args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def folder(self, folder_id):
+        """Returns id, parent_id, name, path and refreshed_at of an indexed folder, None if it is not indexed."""
+        with self._lock:
+            row = self._connection.execute('SELECT id, parent_id, name, path, refreshed_at FROM folders WHERE id = ?',
+                                           (folder_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('id', 'parent_id', 'name', 'path', 'refreshed_at'), row))
+
+    def folder_size(self, folder_id=HOME, recursive=True):
+        """Returns the total size in bytes of the files of a folder (and of its subfolders if recursive)."""
+        if recursive:
+            query = SUBTREE + 'SELECT COALESCE(SUM(size), 0) FROM files JOIN subtree ON files.folderid = subtree.id'
+        else:
+            query = 'SELECT COALESCE(SUM(size), 0) FROM files WHERE folderid = ?'
+
+        with self._lock:
+            return self._connection.execute(query, (folder_id,)).fetchone()[0]
+
+    def _folder_path(self, folder_id):
+        with self._lock:
+            row = self._connection.execute('SELECT path FROM folders WHERE id = ?', (folder_id,)).fetchone()
+        return row[0] if row is not None else ''
+
+    def _stored_listing(self, folder_id, fresh_after):
+        with self._lock:
+            row = self._connection.execute('SELECT refreshed_at FROM folders WHERE id = ?', (folder_id,)).fetchone()
+            if row is None or row[0] is None or row[0] < fresh_after:
+                return None
+
+            folders = self._connection.execute('SELECT id, name FROM folders WHERE parent_id = ? ORDER BY rowid',
+                                               (folder_id,)).fetchall()
+            files = self._connection.execute('SELECT data FROM files WHERE folderid = ? ORDER BY rowid',
+                                             (folder_id,)).fetchall()
+
+        return {'folders': [{'id': id_, 'name': name} for id_, name in folders],
+                'files': [json.loads(data) for data, in files]}
+
+    def _store_listing(self, folder_id, path, subfolders, files):
+        """Stores a folder listing, returns False if it didn't change since the last refresh."""
+        signature = _listing_signature(subfolders, files)
+        now = time.time()
+
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.execute('INSERT OR IGNORE INTO folders (id) VALUES (?)', (folder_id,))
+                row = self._connection.execute('SELECT signature FROM folders WHERE id = ?', (folder_id,)).fetchone()
+                self._connection.execute('UPDATE folders SET path = ?, refreshed_at = ? WHERE id = ?',
+                                         (path, now, folder_id))
+                if row[0] == signature:
+                    return False
+
+                subfolder_ids = [subfolder['id'] for subfolder in subfolders]
+                removed = self._connection.execute(
+                    'SELECT id FROM folders WHERE parent_id = ? AND id NOT IN ({0})'.format(
+                        ', '.join('?' * len(subfolder_ids))), [folder_id] + subfolder_ids).fetchall()
+                for removed_id, in removed:
+                    self._remove_subtree(removed_id)
+
+                for subfolder in subfolders:
+                    self._connection.execute('INSERT OR IGNORE INTO folders (id) VALUES (?)', (subfolder['id'],))
+                    self._connection.execute('UPDATE folders SET parent_id = ?, name = ?, path = ? WHERE id = ?',
+                                             (folder_id, subfolder.get('name'),
+                                              '/'.join(part for part in (path, subfolder.get('name')) if part),
+                                              subfolder['id']))
+
+                self._connection.execute('DELETE FROM files WHERE folderid = ?', (folder_id,))
+                self._connection.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                             [_file_row(folder_id, f) for f in files])
+                self._connection.execute('UPDATE folders SET signature = ? WHERE id = ?', (signature, folder_id))
+
+        return True
+
+    def _remove_subtree(self, folder_id):
+        self._connection.execute(SUBTREE + 'DELETE FROM files WHERE folderid IN subtree', (folder_id,))
+        self._connection.execute(SUBTREE + 'DELETE FROM folders WHERE id IN subtree', (folder_id,))
@@ -0,0 +1,105 @@
+from __future__ import absolute_import
+
+import multiprocessing
+import os
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from .bulk import UploadResult
+from .ratelimit import clock
+from .streaming import sha1_of
+
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+def file_sha1(path, buffer_size=HASH_BUFFER_SIZE, use_mmap=True):
+    """Returns the sha1 hex digest of the content of a file, run by the hashing processes of :func:`ingest`.
+
+    Note:
+        Same as :func:`openload.streaming.sha1_of`, with the file mapped by default. The hex digest is returned
+        as hash objects can't be sent back from another process.
+
+    Args:
+        path (str): path of the file.
+        buffer_size (:obj:`int`, optional): size of the blocks read when the file is not mapped.
+        use_mmap (:obj:`bool`, optional): If this is set to true (default), map the file instead of reading it.
+
+    Returns:
+        str: sha1 of the file content.
+
+    """
+    return sha1_of(path, buffer_size, use_mmap=use_mmap).hexdigest()
+
+
+def ingest(ol, paths, folder_id=None, hash_workers=None, upload_workers=4, max_pending=None, httponly=False,
+           executor=None):
+    """Hashes files in a process pool and uploads each one with its sha1 as soon as it is hashed.
+
+    Hashing (CPU bound) and uploading (network bound) overlap: while files are being uploaded, the next ones
+    are hashed by other processes, so neither the GIL nor a single core limits the rate. At most max_pending
+    files are between the start of their hashing and the end of their upload, the next paths are taken from
+    the iterable only when one of them is done, so memory stays bounded for any number of files.
+
+    Args:
+        ol (OpenLoad): client used for the uploads.
+        paths (iterable): full paths of the files to be uploaded, consumed as the pipeline goes.
+        folder_id (:obj:`str`, optional): folder-ID to upload to, ``Home`` folder if not provided.
+        hash_workers (:obj:`int`, optional): number of hashing processes, defaults to the number of cores.
+        upload_workers (:obj:`int`, optional): number of files uploaded at the same time.
+        max_pending (:obj:`int`, optional): maximum number of files hashed or uploaded at the same time (hashed
+                                            files waiting for an upload worker included),
+                                            defaults to hash_workers + 2 * upload_workers.
+        httponly (:obj:`bool`, optional): If this is set to true, use only http upload links.
+        executor (:obj:`concurrent.futures.Executor`, optional): executor running :func:`file_sha1`
+                                                                 instead of a new process pool, it is not shut down.
+
+    Returns:
+        generator: :class:`openload.bulk.UploadResult` of every file, in completion order. The upload of a file
+                   whose sha1 doesn't match the sent bytes fails (the api checks it).
+
+    """
+    hash_workers = hash_workers or multiprocessing.cpu_count()
+    max_pending = max_pending or hash_workers + 2 * upload_workers
+    paths = iter(paths)
+
+    hashers = executor if executor is not None else ProcessPoolExecutor(max_workers=hash_workers)
+    uploaders = ThreadPoolExecutor(max_workers=upload_workers)
+    # future: (path, started_at, True for hashing futures)
+    pending = {}
+
+    def upload(path, sha1, started_at):
+        size = 0
+        try:
+            # The file may have been removed since it was hashed, that fails its own upload only.
+            size = os.path.getsize(path)
+            result = ol.upload_file(path, folder_id=folder_id, sha1=sha1, httponly=httponly)
+        except Exception as e:
+            return UploadResult(path, error=e, size=size, elapsed=clock() - started_at)
+        return UploadResult(path, result=result, size=size, elapsed=clock() - started_at)
+
+    try:
+        while True:
+            while len(pending) < max_pending:
+                path = next(paths, None)
+                if path is None:
+                    break
+                pending[hashers.submit(file_sha1, path)] = (path, clock(), True)
+
+            if not pending:
+                return
+
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                path, started_at, hashing = pending.pop(future)
+                if not hashing:
+                    yield future.result()
+                elif future.exception() is not None:
+                    yield UploadResult(path, error=future.exception(), elapsed=clock() - started_at)
+                else:
+                    pending[uploaders.submit(upload, path, future.result(), started_at)] = (path, started_at, False)
+    finally:
+        for future in pending:
+            future.cancel()
+        uploaders.shutdown(wait=True)
+        if executor is None:
+            hashers.shutdown(wait=True)
@@ -0,0 +1,185 @@
+"""Json decoding of api responses: a fast decoder when one is installed, and an incremental parser for big results.
+
+:func:`loads` decodes a whole body with orjson if it is installed, with the standard json module otherwise.
+
+:func:`iter_result` parses a body as its chunks arrive and yields the entries of its result one by one, each entry
+decoded by the C scanner of the json module. Only the entry being decoded and the unparsed end of the last chunk
+are held in memory, whatever the size of the response.
+"""
+from __future__ import absolute_import
+
+import codecs
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+RESULT = ('result',)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def loads(data):
+    """Decodes a json document (bytes or text) with the fastest decoder installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def iter_result(chunks, check_status):
+    """Parses an api response from an iterable of byte chunks, yielding the entries of its result as they arrive.
+
+    Entries of a result object are its (key, value) members, members holding an array are expanded into one
+    (key, element) entry per element: a ``list_folder`` result gives (``'folders'``, folder) and
+    (``'files'``, file) entries, a ``remote_upload_status`` result (id, status) entries.
+    Entries of a result array are (index, element).
+
+    Args:
+        chunks (iterable): bytes of the response body, in any number of chunks.
+        check_status (callable): called with {status, msg} before the first entry is yielded,
+                                 raises the exception of an error status (see :meth:`OpenLoad._check_status`).
+
+    Returns:
+        generator: entries of the result.
+
+    Raises:
+        ValueError: the body is not valid json, ends early or has no status.
+
+    """
+    header = {}
+    pending = []
+    checked = False
+
+    for path, key, value in _Scanner(chunks).events(RESULT, ()):
+        if path != RESULT:
+            header[path[0]] = value
+            continue
+        if key is None:
+            # Not an object nor an array (``false`` result of errors).
+            continue
+
+        if not checked and 'status' in header:
+            check_status({'status': header['status'], 'msg': header.get('msg')})
+            checked = True
+
+        if checked:
+            yield key, value
+        else:
+            # Result sent before the status, held until the status is known.
+            pending.append((key, value))
+
+    if not checked:
+        if 'status' not in header:
+            raise ValueError('api response without status')
+        check_status({'status': header['status'], 'msg': header.get('msg')})
+        for entry in pending:
+            yield entry
+
+
+class _Scanner(object):
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decode = codecs.getincrementaldecoder('utf-8')().decode
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read(self):
+        """Appends the next chunk to the unparsed text, returns False once the document is over."""
+        if self._eof:
+            return False
+
+        text = ''
+        for chunk in self._chunks:
+            text = self._decode(chunk)
+            if text:
+                break
+        else:
+            text = self._decode(b'', True)
+            self._eof = True
+
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return bool(text) or not self._eof
+
+    def _peek(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                raise ValueError('json document ends early')
+
+    def _next(self, expected):
+        char = self._peek()
+        if char not in expected:
+            raise ValueError('expected one of {0!r} at {1!r}'.format(expected, self._buffer[self._pos:self._pos + 20]))
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if self._read():
+                    continue
+                raise
+            # A number ending the buffer may go on in the next chunk.
+            if end == len(self._buffer) and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def _elements(self):
+        self._next('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._next(',]') == ']':
+                return
+
+    def _members(self):
+        self._next('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._next(':')
+            yield key
+            if self._next(',}') == '}':
+                return
+
+    def events(self, target, path):
+        """Yields (path, key, value) of the entries at target and of the values off the way to it (key None)."""
+        char = self._peek()
+
+        if path == target and char == '[':
+            for index, element in enumerate(self._elements()):
+                yield path, index, element
+
+        elif path == target and char == '{':
+            for key in self._members():
+                if self._peek() == '[':
+                    for element in self._elements():
+                        yield path, key, element
+                else:
+                    yield path, key, self._value()
+
+        elif char == '{' and target[:len(path)] == path:
+            for key in self._members():
+                for event in self.events(target, path + (key,)):
+                    yield event
+
+        else:
+            yield path, None, self._value()
@@ -0,0 +1,311 @@
+"""Hooks called on the events of api requests and uploads, and a collector exporting them as metrics.
+
+A :class:`Hooks` given to :class:`openload.OpenLoad` (``hooks=``) is called on every request start and end,
+retry, throttle and cache hit. Without hooks the client only checks ``hooks is not None``: no time is measured
+and no event is built. :class:`Metrics` keeps per endpoint latency histograms, error counts by exception class
+and byte counters, exported in the Prometheus text format or as OpenTelemetry (OTLP/JSON) metrics. ::
+
+    metrics = Metrics()
+    ol = OpenLoad('login', 'key', hooks=metrics)
+    ...
+    print(metrics.prometheus())
+
+Endpoints are api paths (``file/info``, ...), ``upload`` for the transfer of uploaded files.
+"""
+from __future__ import absolute_import
+
+import bisect
+import collections
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Hooks(object):
+    """Base of the hooks, every method does nothing, subclasses override the events they need.
+
+    Hooks are called in the thread making the request and may be shared by many clients, so they must be
+    thread-safe. Exceptions they raise are not caught.
+    """
+
+    def request_start(self, endpoint):
+        """Called before a request is sent (after the rate limiter let it go)."""
+
+    def request_end(self, endpoint, elapsed, exception=None, sent=0, received=0, response_time=None,
+                    decode_time=None):
+        """Called once a request is over.
+
+        Args:
+            endpoint (str): relative api path, ``upload`` for uploads.
+            elapsed (float): seconds from request_start.
+            exception (Exception): exception raised by the request, None if it succeeded.
+            sent (int): bytes of the uploaded file.
+            received (int): bytes of the response body.
+            response_time (float): seconds from the request sent to the response headers parsed (connection
+                                   setup and server time), None if no response was received.
+            decode_time (float): seconds spent decoding the json body, None if unknown.
+
+        """
+
+    def retry(self, endpoint, attempt, delay, exception):
+        """Called when the retry policy makes another attempt after the failed attempt number ``attempt``."""
+
+    def throttle(self, endpoint, delay):
+        """Called when a request was delayed ``delay`` seconds by the rate limiter, 0 when the api answered 429."""
+
+    def cache_hit(self, endpoint):
+        """Called when a result was taken from the cache, no request was made."""
+
+
+class HookList(Hooks):
+    """Calls several hooks, in order."""
+
+    def __init__(self, hooks):
+        self.hooks = list(hooks)
+
+    def request_start(self, endpoint):
+        for hooks in self.hooks:
+            hooks.request_start(endpoint)
+
+    def request_end(self, endpoint, elapsed, exception=None, sent=0, received=0, response_time=None,
+                    decode_time=None):
+        for hooks in self.hooks:
+            hooks.request_end(endpoint, elapsed, exception=exception, sent=sent, received=received,
+                              response_time=response_time, decode_time=decode_time)
+
+    def retry(self, endpoint, attempt, delay, exception):
+        for hooks in self.hooks:
+            hooks.retry(endpoint, attempt, delay, exception)
+
+    def throttle(self, endpoint, delay):
+        for hooks in self.hooks:
+            hooks.throttle(endpoint, delay)
+
+    def cache_hit(self, endpoint):
+        for hooks in self.hooks:
+            hooks.cache_hit(endpoint)
+
+
+class _Histogram(object):
+    __slots__ = ('counts', 'count', 'sum')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Metrics(Hooks):
+    """Hooks collecting per endpoint metrics, thread-safe.
+
+    Metrics are a latency histogram of the requests, counts of errors by exception class
+    (:mod:`openload.api_exceptions` ones, ``ConnectionError``, ...), of retries, throttles and cache hits,
+    bytes sent and received, seconds waiting for responses and decoding them, and requests in flight.
+
+    Args:
+        buckets (:obj:`tuple`, optional): upper bounds in seconds of the latency histogram buckets.
+        prefix (:obj:`str`, optional): prefix of the metric names.
+
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix='openload'):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forgets every value collected so far."""
+        with self._lock:
+            self.started_at = time.time()
+            self._latency = {}
+            self._counters = collections.defaultdict(lambda: collections.defaultdict(int))
+            self._seconds = collections.defaultdict(lambda: collections.defaultdict(float))
+            self._in_flight = collections.defaultdict(int)
+
+    def request_start(self, endpoint):
+        with self._lock:
+            self._in_flight[endpoint] += 1
+
+    def request_end(self, endpoint, elapsed, exception=None, sent=0, received=0, response_time=None,
+                    decode_time=None):
+        with self._lock:
+            histogram = self._latency.get(endpoint)
+            if histogram is None:
+                histogram = self._latency[endpoint] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[bisect.bisect_left(self.buckets, elapsed)] += 1
+            histogram.count += 1
+            histogram.sum += elapsed
+
+            self._in_flight[endpoint] -= 1
+            if exception is not None:
+                self._counters['errors'][(endpoint, type(exception).__name__)] += 1
+            self._counters['sent_bytes'][(endpoint,)] += sent
+            self._counters['received_bytes'][(endpoint,)] += received
+            if response_time is not None:
+                self._seconds['response_wait'][(endpoint,)] += response_time
+            if decode_time is not None:
+                self._seconds['response_decode'][(endpoint,)] += decode_time
+
+    def retry(self, endpoint, attempt, delay, exception):
+        with self._lock:
+            self._counters['retries'][(endpoint,)] += 1
+
+    def throttle(self, endpoint, delay):
+        with self._lock:
+            self._counters['throttles'][(endpoint, 'limiter' if delay else 'api')] += 1
+            self._seconds['throttled'][(endpoint,)] += delay
+
+    def cache_hit(self, endpoint):
+        with self._lock:
+            self._counters['cache_hits'][(endpoint,)] += 1
+
+    def _metrics(self):
+        """Returns (name, kind, unit, help, label names, points) of every metric, points being (labels, value)."""
+        with self._lock:
+            latency = sorted(((endpoint,), (list(h.counts), h.count, h.sum)) for endpoint, h in self._latency.items())
+            counters = dict((name, sorted(values.items())) for name, values in self._counters.items())
+            seconds = dict((name, sorted(values.items())) for name, values in self._seconds.items())
+            in_flight = sorted(((endpoint,), count) for endpoint, count in self._in_flight.items())
+
+        endpoint = ('endpoint',)
+        return [
+            ('request_duration_seconds', 'histogram', 's', 'Duration of api requests and uploads.', endpoint,
+             latency),
+            ('request_errors_total', 'counter', '1', 'Failed requests by exception class.', ('endpoint', 'exception'),
+             counters.get('errors', [])),
+            ('retries_total', 'counter', '1', 'Requests retried by the retry policy.', endpoint,
+             counters.get('retries', [])),
+            ('throttles_total', 'counter', '1', 'Requests delayed by the rate limiter or answered 429.',
+             ('endpoint', 'source'), counters.get('throttles', [])),
+            ('throttled_seconds_total', 'counter', 's', 'Seconds requests waited for the rate limiter.', endpoint,
+             seconds.get('throttled', [])),
+            ('cache_hits_total', 'counter', '1', 'Results taken from the cache.', endpoint,
+             counters.get('cache_hits', [])),
+            ('sent_bytes_total', 'counter', 'By', 'Bytes of uploaded files.', endpoint,
+             counters.get('sent_bytes', [])),
+            ('received_bytes_total', 'counter', 'By', 'Bytes of response bodies.', endpoint,
+             counters.get('received_bytes', [])),
+            ('response_wait_seconds_total', 'counter', 's',
+             'Seconds from requests sent to response headers received (connection setup and server time).',
+             endpoint, seconds.get('response_wait', [])),
+            ('response_decode_seconds_total', 'counter', 's', 'Seconds spent decoding json responses.', endpoint,
+             seconds.get('response_decode', [])),
+            ('requests_in_flight', 'gauge', '1', 'Requests started and not finished yet.', endpoint, in_flight),
+        ]
+
+    def _cumulative(self, counts):
+        total = 0
+        buckets = []
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def stats(self):
+        """Returns the collected values by metric name, then by label values. ::
+
+            {
+                "request_duration_seconds": {("file/info",): {"count": 10, "sum": 0.5, "buckets": [...]}},
+                "request_errors_total": {("file/info", "ServerErrorException"): 2},
+                ...
+            }
+
+        ``buckets`` are (upper bound, cumulative count) pairs, the last bound being ``inf``.
+        """
+        result = {}
+        for name, kind, _, _, _, points in self._metrics():
+            if kind == 'histogram':
+                points = [(labels, {'count': count, 'sum': total, 'buckets': self._cumulative(counts)})
+                          for labels, (counts, count, total) in points]
+            result[name] = dict(points)
+        return result
+
+    def prometheus(self):
+        """Returns the metrics in the Prometheus text exposition format (version 0.0.4).
+
+        Returns:
+            str: text to be served on a ``/metrics`` endpoint or written for the node exporter textfile collector.
+
+        """
+        lines = []
+        for name, kind, _, description, label_names, points in self._metrics():
+            name = '{0}_{1}'.format(self.prefix, name)
+            lines.append('# HELP {0} {1}'.format(name, description))
+            lines.append('# TYPE {0} {1}'.format(name, kind))
+
+            for label_values, value in points:
+                labels = _prometheus_labels(zip(label_names, label_values))
+                if kind != 'histogram':
+                    lines.append('{0}{{{1}}} {2}'.format(name, labels, _prometheus_number(value)))
+                    continue
+
+                counts, count, total = value
+                for bound, cumulated in self._cumulative(counts):
+                    le = '+Inf' if bound == float('inf') else _prometheus_number(bound)
+                    lines.append('{0}_bucket{{{1},le="{2}"}} {3}'.format(name, labels, le, cumulated))
+                lines.append('{0}_sum{{{1}}} {2}'.format(name, labels, _prometheus_number(total)))
+                lines.append('{0}_count{{{1}}} {2}'.format(name, labels, count))
+
+        return '\n'.join(lines) + '\n'
+
+    def otlp(self, resource=None):
+        """Returns the metrics as an OpenTelemetry (OTLP/JSON) ``ExportMetricsServiceRequest``.
+
+        The result can be json encoded and posted to the ``/v1/metrics`` endpoint of an OpenTelemetry collector.
+        Sums and histograms are cumulative since the metrics were created (or reset).
+
+        Args:
+            resource (:obj:`dict`, optional): attributes of the resource (``service.name``, ...).
+
+        Returns:
+            dict: metrics in the OTLP/JSON encoding.
+
+        """
+        start = str(int(self.started_at * 1e9))
+        now = str(int(time.time() * 1e9))
+        metrics = []
+
+        for name, kind, unit, description, label_names, points in self._metrics():
+            data_points = []
+            for label_values, value in points:
+                point = {'attributes': _otlp_attributes(zip(label_names, label_values)),
+                         'startTimeUnixNano': start, 'timeUnixNano': now}
+                if kind == 'histogram':
+                    counts, count, total = value
+                    point.update(count=str(count), sum=total, bucketCounts=[str(c) for c in counts],
+                                 explicitBounds=list(self.buckets))
+                elif isinstance(value, float):
+                    point['asDouble'] = value
+                else:
+                    point['asInt'] = str(value)
+                data_points.append(point)
+
+            metric = {'name': '{0}.{1}'.format(self.prefix, name), 'unit': unit, 'description': description}
+            if kind == 'histogram':
+                metric['histogram'] = {'dataPoints': data_points, 'aggregationTemporality': 2}
+            elif kind == 'counter':
+                metric['sum'] = {'dataPoints': data_points, 'aggregationTemporality': 2, 'isMonotonic': True}
+            else:
+                metric['gauge'] = {'dataPoints': data_points}
+            metrics.append(metric)
+
+        return {'resourceMetrics': [{
+            'resource': {'attributes': _otlp_attributes(sorted((resource or {}).items()))},
+            'scopeMetrics': [{'scope': {'name': 'openload'}, 'metrics': metrics}],
+        }]}
+
+
+def _prometheus_labels(labels):
+    return ','.join('{0}="{1}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+                    for name, value in labels)
+
+
+def _prometheus_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': {'stringValue': str(value)}} for key, value in attributes]
@@ -0,0 +1,354 @@
+"""Compact record types for api results, returned instead of dicts by :class:`OpenLoad` created with ``models=True``.
+
+Records keep the raw values of the api in ``__slots__`` (no per instance dict), and convert a field the first time
+it is read: numbers sent as strings (``"size": "5114011"``) become ints, dates (``"2015-02-21 09:20:26"`` or unix
+timestamps) become naive UTC datetimes, ``false`` placeholders become None. The converted value replaces the raw one,
+so a field is parsed once at most. Short strings repeated in every record (folder ids, content types, statuses)
+are interned, every record shares the same string object.
+
+Keys a record type doesn't know are kept in :attr:`Model.extra`.
+"""
+from __future__ import absolute_import
+
+import datetime
+import functools
+import sys
+
+from .streaming import string_types
+
+intern = getattr(sys, 'intern', None) or intern  # noqa: F821 (builtin on Python 2)
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def to_int(value):
+    if isinstance(value, string_types):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return value if value is not False else None
+
+
+def to_float(value):
+    if isinstance(value, string_types):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return value if value is not False else None
+
+
+def to_datetime(value):
+    """Converts an api date, either ``2015-02-21 09:20:26`` (UTC) or a unix timestamp, to a naive UTC datetime."""
+    if isinstance(value, datetime.datetime) or value is None:
+        return value
+    if isinstance(value, string_types) and not value.isdigit():
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return None
+    try:
+        return EPOCH + datetime.timedelta(seconds=int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def to_optional(value):
+    """Placeholders sent as ``false`` until a value exists (extid, url, captcha_url) become None."""
+    return None if value is False else value
+
+
+class _Field(object):
+    """Public attribute of a field, converts the raw value kept in the slot ``_<name>`` on first read."""
+
+    __slots__ = ('slot', 'convert', 'bit')
+
+    def __init__(self, slot, convert, bit):
+        self.slot = slot
+        self.convert = convert
+        self.bit = bit
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = self.slot.__get__(instance, owner)
+        if self.convert is not None and not instance._parsed & self.bit:
+            # Converters are idempotent, threads racing here store the same value.
+            value = self.convert(value)
+            self.slot.__set__(instance, value)
+            instance._parsed |= self.bit
+        return value
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+        instance._parsed |= self.bit
+
+
+def model(cls):
+    """Class decorator installing the public attributes of the fields of a :class:`Model` subclass."""
+    cls._slots = []
+    for bit, (name, convert) in enumerate(cls.fields):
+        slot = getattr(cls, '_' + name)
+        cls._slots.append((name, slot))
+        setattr(cls, name, _Field(slot, convert, 1 << bit))
+    cls._names = frozenset(name for name, _ in cls.fields)
+    return cls
+
+
+def slots(fields):
+    return tuple('_' + name for name, _ in fields)
+
+
+class Model(object):
+    """Base of the record types.
+
+    Subclasses list their ``fields`` as (name, converter) pairs, the converter being None for values used as
+    they are. Fields missing from the api result are None.
+
+    Attributes:
+        extra (dict): keys of the api result unknown to the record type, None if there are none.
+
+    """
+
+    __slots__ = ('_parsed', 'extra')
+    fields = ()
+    shared = ()
+    _slots = ()
+    _names = frozenset()
+
+    def __init__(self, raw):
+        self._parsed = 0
+        found = 0
+        for name, slot in self._slots:
+            value = raw.get(name)
+            if value is not None:
+                found += 1
+            slot.__set__(self, value)
+        for name in self.shared:
+            value = raw.get(name)
+            if isinstance(value, str):
+                getattr(type(self), name).slot.__set__(self, intern(value))
+        self.extra = None
+        if found < len(raw):
+            self.extra = dict((key, value) for key, value in raw.items() if key not in self._names) or None
+
+    @classmethod
+    def from_dict(cls, raw):
+        """Builds a record from an api result, None and records are returned as they are."""
+        if raw is None or isinstance(raw, Model):
+            return raw
+        return cls(raw)
+
+    def to_dict(self):
+        """Returns the fields (converted ones converted, the others raw) and the extra keys as a dict."""
+        result = dict((name, slot.__get__(self, type(self))) for name, slot in self._slots)
+        result.update(self.extra or {})
+        return result
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def __repr__(self):
+        key = self.fields[0][0]
+        return '<{name} {key}={value!r}>'.format(name=type(self).__name__, key=key, value=getattr(self, key))
+
+
+@model
+class File(Model):
+    """File of :meth:`OpenLoad.list_folder` and :meth:`OpenLoad.file_info`.
+
+    Attributes:
+        linkextid (str): id of the file (``id`` of file_info results).
+        size (int), upload_at (datetime), download_count (int): converted on first read.
+
+    """
+
+    fields = (('linkextid', None), ('name', None), ('folderid', None), ('size', to_int), ('sha1', None),
+              ('content_type', None), ('upload_at', to_datetime), ('status', None), ('download_count', to_int),
+              ('cstatus', None), ('link', None))
+    shared = ('folderid', 'content_type', 'status', 'cstatus')
+    __slots__ = slots(fields)
+
+    @classmethod
+    def from_dict(cls, raw):
+        if isinstance(raw, dict) and 'linkextid' not in raw and 'id' in raw:
+            raw = dict(raw, linkextid=raw['id'])
+            del raw['id']
+        return super(File, cls).from_dict(raw)
+
+    @property
+    def id(self):
+        return self.linkextid
+
+
+@model
+class Folder(Model):
+    """Subfolder of :meth:`OpenLoad.list_folder`."""
+
+    fields = (('id', None), ('name', None))
+    __slots__ = slots(fields)
+
+
+@model
+class RemoteUpload(Model):
+    """Remote upload of :meth:`OpenLoad.remote_upload` and :meth:`OpenLoad.remote_upload_status`.
+
+    Attributes:
+        bytes_loaded (int), bytes_total (int), added (datetime), last_update (datetime): converted on first read.
+        extid (str), url (str): None until the upload finished.
+
+    """
+
+    fields = (('id', None), ('remoteurl', None), ('status', None), ('folderid', None), ('added', to_datetime),
+              ('last_update', to_datetime), ('extid', to_optional), ('url', to_optional),
+              ('bytes_loaded', to_int), ('bytes_total', to_int))
+    shared = ('status', 'folderid')
+    __slots__ = slots(fields)
+
+    @property
+    def progress(self):
+        """float: fraction downloaded by the server, None if unknown."""
+        return float(self.bytes_loaded or 0) / self.bytes_total if self.bytes_total else None
+
+
+@model
+class Conversion(Model):
+    """Running conversion of :meth:`OpenLoad.running_conversions`.
+
+    Attributes:
+        progress (float), retries (int), last_update (datetime): converted on first read.
+
+    """
+
+    fields = (('linkextid', None), ('id', None), ('name', None), ('status', None), ('last_update', to_datetime),
+              ('progress', to_float), ('retries', to_int), ('link', None))
+    shared = ('status',)
+    __slots__ = slots(fields)
+
+
+@model
+class AccountInfo(Model):
+    """Result of :meth:`OpenLoad.account_info`, ``traffic`` is flattened to traffic_left and traffic_used_24h.
+
+    Attributes:
+        storage_left (int), traffic_left (int): -1 when unlimited.
+
+    """
+
+    fields = (('extid', None), ('email', None), ('signup_at', to_datetime), ('storage_left', to_int),
+              ('storage_used', to_int), ('traffic_left', to_int), ('traffic_used_24h', to_int), ('balance', to_float))
+    __slots__ = slots(fields)
+
+    @classmethod
+    def from_dict(cls, raw):
+        if isinstance(raw, dict) and isinstance(raw.get('traffic'), dict):
+            raw = dict(raw, traffic_left=raw['traffic'].get('left'), traffic_used_24h=raw['traffic'].get('used_24h'))
+            del raw['traffic']
+        return super(AccountInfo, cls).from_dict(raw)
+
+
+@model
+class DownloadTicket(Model):
+    """Result of :meth:`OpenLoad.prepare_download`.
+
+    Attributes:
+        wait_time (int), valid_until (datetime): converted on first read.
+        captcha_url (str): None if no captcha has to be solved.
+
+    """
+
+    fields = (('ticket', None), ('captcha_url', to_optional), ('captcha_w', to_int), ('captcha_h', to_int),
+              ('wait_time', to_int), ('valid_until', to_datetime))
+    __slots__ = slots(fields)
+
+
+@model
+class DownloadLink(Model):
+    """Result of :meth:`OpenLoad.get_download_link`.
+
+    Attributes:
+        size (int), upload_at (datetime): converted on first read.
+
+    """
+
+    fields = (('url', None), ('name', None), ('size', to_int), ('sha1', None), ('content_type', None),
+              ('upload_at', to_datetime), ('token', None))
+    __slots__ = slots(fields)
+
+
+def listing(result):
+    """Converts a ``list_folder`` result, its folders and files become :class:`Folder` and :class:`File`."""
+    if not isinstance(result, dict):
+        return result
+    return dict(result, folders=[Folder.from_dict(folder) for folder in result.get('folders') or []],
+                files=[File.from_dict(f) for f in result.get('files') or []])
+
+
+def mapping_of(cls):
+    """Returns a converter of the results made of one record by id (file_info, remote_upload_status)."""
+    def convert(result):
+        if not isinstance(result, dict):
+            return result
+        return dict((key, cls.from_dict(value)) for key, value in result.items())
+    return convert
+
+
+def list_of(cls):
+    def convert(result):
+        return [cls.from_dict(value) for value in result] if isinstance(result, list) else result
+    return convert
+
+
+def typed(convert):
+    """Decorates an :class:`OpenLoad` method, its result is converted by convert when the instance has models set.
+
+    The undecorated method is kept as ``untyped``, see :func:`untyped`.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            return convert(result) if self.models else result
+        wrapper.untyped = method
+        return wrapper
+    return decorator
+
+
+def untyped(ol):
+    """Returns ol, or a view of it whose methods return raw results when ol returns records.
+
+    The helpers of the package (walk, index, tickets, ...) work on dicts, they call the api through this view.
+    """
+    return _Untyped(ol) if getattr(ol, 'models', False) else ol
+
+
+class _Untyped(object):
+    __slots__ = ('_ol',)
+
+    def __init__(self, ol):
+        self._ol = ol
+
+    def __getattr__(self, name):
+        method = getattr(getattr(type(self._ol), name, None), 'untyped', None)
+        if method is not None:
+            return functools.partial(method, self._ol)
+        return getattr(self._ol, name)
+
+
+def file_infos(result):
+    """Converts a ``file_info_many`` result, (infos, errors)."""
+    infos, errors = result
+    return mapping_of(File)(infos), errors
@@ -1,33 +1,208 @@
 from __future__ import absolute_import
 
+import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 import requests_toolbelt
-
-from .api_exceptions import (BadRequestException, BandwidthUsageExceeded, FileNotFoundException,
-                             PermissionDeniedException, TooManyRequestsException, ServerErrorException,
-                             UnavailableForLegalReasonsException)
+from requests.adapters import HTTPAdapter
+
+from .api_exceptions import (BadRequestException, BandwidthUsageExceeded, ChecksumMismatchException,
+                             FileNotFoundException, PermissionDeniedException, TooManyRequestsException,
+                             ServerErrorException, UnavailableForLegalReasonsException)
+from .batching import FileInfoBatcher
+from .bulk import upload_many
+from .cache import ACCOUNT_TAG, MISSING, folder_tag
+from .conversions import convert_files
+from .download import RANGE_SIZE, download
+from .index import AccountIndex
+from .ingest import ingest
+from .jsonstream import iter_result, loads
+from .models import (AccountInfo, Conversion, DownloadLink, DownloadTicket, File, Folder, RemoteUpload,
+                     file_infos, list_of, listing, mapping_of, typed)
+from .ratelimit import clock
+from .remote import remote_upload_many
+from .streaming import ByteCounter, HashingReader, iter_file, multipart_stream, source_length, string_types
+from .sync import sync
+from .tickets import TicketScheduler
+from .upload_pool import UploadLinkPool
+from .walk import walk
+
+try:
+    from urllib.parse import urlencode
+except ImportError:  # Python 2
+    from urllib import urlencode
 
 
 class OpenLoad(object):
     api_base_url = 'https://api.openload.co/{api_version}/'
     api_version = '1'
-
-    def __init__(self, api_login, api_key):
+    file_info_max_ids = 50
+    # Decoder of api responses (orjson when installed), may be replaced by any loads(bytes) function.
+    json_loads = staticmethod(loads)
+    stream_chunk_size = 64 * 1024
+    # threading.local holding the session of each thread when created with session_per_thread.
+    _thread_sessions = None
+
+    def __init__(self, api_login, api_key, session=None, timeout=None,
+                 pool_connections=10, pool_maxsize=10, pool_block=False, file_info_batch_window=None,
+                 rate_limiter=None, retry_policy=None, circuit_breaker=None, cache=None, upload_link_pool_size=None,
+                 models=False, hooks=None, session_per_thread=False):
         """Initializes OpenLoad instance with given parameters and formats api base url.
 
+        Note:
+            All requests (api calls and file uploads) go through a single keep-alive session,
+            so consecutive calls reuse already opened connections instead of doing a new
+            TCP/TLS handshake each time. Call :meth:`close` (or use the instance as a context manager)
+            to release the pooled connections.
+
+            An instance is safe to share between threads: arguments passed to its methods are never modified,
+            the credentials are encoded once here, the session's connection pool hands each connection to one
+            request at a time, and the rate limiter, retry policy, circuit breaker, cache, upload link pool and
+            hooks lock their own state. With a shared session, ``pool_maxsize`` connections per host are kept
+            alive for all threads (``pool_block`` makes extra threads wait for one instead of opening
+            connections that are not kept), with ``session_per_thread`` every thread uses a session and pool
+            of its own. Results are new objects for every call, the cache included: it hands out copies of
+            the results it keeps, so a caller can modify its result without affecting the other threads.
+
         Args:
             api_login (str): API Login found in openload.co
             api_key (str): API Key found in openload.co
+            session (:obj:`requests.Session`, optional): session to be used instead of creating a new one,
+                                                         pool options are ignored and it is not closed by :meth:`close`.
+            timeout (:obj:`float` or :obj:`tuple`, optional): timeout of every request in seconds,
+                                                              either a single value or a (connect, read) tuple.
+            pool_connections (:obj:`int`, optional): number of per-host connection pools to keep.
+            pool_maxsize (:obj:`int`, optional): maximum number of connections kept alive per host.
+            pool_block (:obj:`bool`, optional): If this is set to true, block when all connections to a host
+                                                are in use instead of opening extra (not pooled) ones.
+            file_info_batch_window (:obj:`float`, optional): If this is set, single id :meth:`file_info` calls
+                                                             made from different threads within this many seconds
+                                                             are sent as one ``file/info`` request.
+            rate_limiter (:obj:`openload.ratelimit.RateLimiter`, optional): limits the rate of api calls,
+                                                                          it may be shared by many instances.
+            retry_policy (:obj:`openload.retry.RetryPolicy`, optional): retries calls failing with transient errors.
+            circuit_breaker (:obj:`openload.retry.CircuitBreaker`, optional): fails api calls fast while
+                                                                            the api keeps failing.
+            cache (:obj:`openload.cache.ResponseCache`, optional): caches results of read only calls
+                                                                  (account_info, file_info, list_folder, splash_image).
+            upload_link_pool_size (:obj:`int`, optional): If this is set, keep this many upload links ready
+                                                          for each folder uploaded to, see
+                                                          :class:`openload.upload_pool.UploadLinkPool`.
+            models (:obj:`bool`, optional): If this is set to true, results are :mod:`openload.models` records
+                                            (``__slots__`` objects with typed fields) instead of dicts.
+            hooks (:obj:`openload.metrics.Hooks`, optional): called on the events of every api request, upload
+                                                             and download (timings, bytes, retries, ...),
+                                                             see :class:`openload.metrics.Metrics`.
+            session_per_thread (:obj:`bool`, optional): If this is set to true, each thread making requests gets
+                                                        a session (and connection pool) of its own instead of
+                                                        sharing one, it can't be used with ``session``.
 
         Returns:
             None
 
         """
+        if session is not None and session_per_thread:
+            raise ValueError('session_per_thread creates the sessions, it cannot be used with session')
+
         self.login = api_login
         self.key = api_key
+        # Query string of the credentials, appended to the url of every api call.
+        self._credentials = urlencode([('login', api_login), ('key', api_key)])
         self.api_url = self.api_base_url.format(api_version=self.api_version)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.cache = cache
+        self.models = models
+        self.hooks = hooks
+
+        self._owns_session = session is None
+        self._pool_options = {'pool_connections': pool_connections, 'pool_maxsize': pool_maxsize,
+                              'pool_block': pool_block}
+        self._thread_sessions = None
+        if session_per_thread:
+            self._session = None
+            self._thread_sessions = threading.local()
+            self._sessions = []
+            self._sessions_lock = threading.Lock()
+        else:
+            self._session = session if session is not None else self._create_session(**self._pool_options)
+
+        self.upload_link_pool = None
+        if upload_link_pool_size:
+            self.upload_link_pool = UploadLinkPool(self._fetch_upload_link, size=upload_link_pool_size)
+
+        self._file_info_batcher = None
+        if file_info_batch_window is not None:
+            self._file_info_batcher = FileInfoBatcher(self._fetch_file_info, window=file_info_batch_window,
+                                                      max_ids=self.file_info_max_ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def _create_session(cls, pool_connections, pool_maxsize, pool_block):
+        """Creates a keep-alive session with a connection pool mounted for both http and https.
+
+        Args:
+            pool_connections (int): number of per-host connection pools to keep.
+            pool_maxsize (int): maximum number of connections kept alive per host.
+            pool_block (bool): block when all connections to a host are in use.
+
+        Returns:
+            requests.Session: session used by every request made by the instance.
+
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @property
+    def session(self):
+        """requests.Session: session of the requests made by the calling thread."""
+        if self._thread_sessions is None:
+            return self._session
+
+        session = getattr(self._thread_sessions, 'session', None)
+        if session is None:
+            session = self._thread_sessions.session = self._create_session(**self._pool_options)
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def close(self):
+        """Closes the underlying session (every thread's one with ``session_per_thread``) and its pooled connections.
+
+        Note:
+            A session passed to the constructor is left open, its owner is responsible for closing it.
+
+        Returns:
+            None
+
+        """
+        if self.upload_link_pool is not None:
+            self.upload_link_pool.close()
+
+        if self._thread_sessions is not None:
+            with self._sessions_lock:
+                sessions, self._sessions = self._sessions, []
+            for session in sessions:
+                session.close()
+        elif self._owns_session:
+            self._session.close()
 
     @classmethod
     def _check_status(cls, response_json):
@@ -78,7 +253,8 @@ class OpenLoad(object):
 
         Args:
             url (str): relative path of a specific service (account_info, ...).
-            params (:obj:`dict`, optional): contains parameters to be sent in the GET request.
+            params (:obj:`dict`, optional): contains parameters to be sent in the GET request,
+                                            it is not modified (the credentials are added to the url).
 
         Returns:
             dict: results of the response of the GET request.
@@ -87,12 +263,185 @@ class OpenLoad(object):
         if not params:
             params = {}
 
-        params.update({'login': self.login, 'key': self.key})
+        if self.cache is not None:
+            # Cached results are kept per account.
+            cache_params = dict(params, login=self.login)
+            result = self.cache.get(url, cache_params)
+            if result is not MISSING:
+                if self.hooks is not None:
+                    self.hooks.cache_hit(url)
+                return result
+
+        if self.retry_policy is not None:
+            result = self.retry_policy.run(url, self._get_once, (url, params), on_retry=self._on_retry())
+        else:
+            result = self._get_once(url, params)
+
+        if self.cache is not None:
+            self.cache.store(url, cache_params, result)
+
+        return result
+
+    def _get_once(self, url, params):
+        """Makes a single GET request, going through the rate limiter and the circuit breaker if any.
+
+        Args:
+            url (str): relative path of a specific service (account_info, ...).
+            params (dict): parameters to be sent in the GET request, credentials excluded.
+
+        Returns:
+            dict: results of the response of the GET request.
+
+        """
+        hooks = self.hooks
+        self._before_request(url)
+
+        if hooks is not None:
+            hooks.request_start(url)
+            started = clock()
+        response = error = decode_time = None
+        received = 0
+
+        try:
+            response = self.session.get(self._api_call_url(url), params=params, timeout=self.timeout)
+            if hooks is not None:
+                received = len(response.content)
+                decoding = clock()
+            response_json = self.json_loads(response.content)
+            if hooks is not None:
+                decode_time = clock() - decoding
+            result = self._process_response(response_json)
+        except Exception as e:
+            error = e
+            self._record_failure(url, e)
+            raise
+        finally:
+            if hooks is not None:
+                self._request_end(url, started, error, response, received=received, decode_time=decode_time)
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record()
+
+        return result
+
+    def _iter_get(self, url, params=None):
+        """Streamed :meth:`_get`, yields the entries of the result as the response body is parsed.
+
+        Note:
+            The call goes through the rate limiter and the circuit breaker, it is neither retried nor cached.
+            See :func:`openload.jsonstream.iter_result` for the entries yielded.
+
+        Args:
+            url (str): relative path of a specific service (file/listfolder, ...).
+            params (:obj:`dict`, optional): contains parameters to be sent in the GET request.
+
+        Returns:
+            generator: (key, value) entries of the result of the response.
+
+        """
+        hooks = self.hooks
+        self._before_request(url)
+
+        if hooks is not None:
+            hooks.request_start(url)
+            started = clock()
+        response = error = None
+
+        try:
+            response = self.session.get(self._api_call_url(url), params=params, timeout=self.timeout, stream=True)
+            try:
+                for entry in iter_result(response.iter_content(self.stream_chunk_size), self._check_status):
+                    yield entry
+            finally:
+                response.close()
+        except Exception as e:
+            error = e
+            self._record_failure(url, e)
+            raise
+        finally:
+            # Also reached when the generator is closed before the end of the result (GeneratorExit), which
+            # counts as a success: the api answered, and a half-open circuit breaker must not wait on the trial.
+            if error is None and self.circuit_breaker is not None:
+                self.circuit_breaker.record()
+            if hooks is not None:
+                received = response.raw.tell() if response is not None else 0
+                self._request_end(url, started, error, response, received=received)
+
+    def _api_call_url(self, url):
+        """Url of an api call with the credentials in its query, requests appends the other params to it.
 
-        response_json = requests.get(self.api_url + url, params).json()
+        Args:
+            url (str): relative path of a specific service (account_info, ...).
+
+        Returns:
+            str: absolute url of the api call.
+
+        """
+        return self.api_url + url + '?' + self._credentials
+
+    def _before_request(self, url):
+        """Goes through the circuit breaker and the rate limiter before a request to the given api path.
+
+        Args:
+            url (str): relative path of a specific service (account_info, ...).
+
+        Returns:
+            None
 
-        return self._process_response(response_json)
+        """
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_call()
+
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.acquire(url)
+            if delay and self.hooks is not None:
+                self.hooks.throttle(url, delay)
+
+    def _on_retry(self):
+        """Returns the retry callback given to the retry policy, None without hooks."""
+        return self.hooks.retry if self.hooks is not None else None
+
+    def _request_end(self, url, started, exception, response=None, sent=0, received=0, decode_time=None):
+        """Calls the request_end hook of a request.
+
+        Args:
+            url (str): relative api path, ``upload`` for uploads.
+            started (float): clock value (:func:`openload.ratelimit.clock`) when the request started.
+            exception (Exception): exception raised by the request, None if it succeeded.
+            response (:obj:`requests.Response`, optional): response of the request, if one was received.
+            sent (:obj:`int`, optional): bytes of the request body.
+            received (:obj:`int`, optional): bytes of the response body.
+            decode_time (:obj:`float`, optional): seconds spent decoding the json body.
+
+        Returns:
+            None
+
+        """
+        response_time = response.elapsed.total_seconds() if response is not None else None
+        self.hooks.request_end(url, clock() - started, exception=exception, sent=sent, received=received,
+                               response_time=response_time, decode_time=decode_time)
+
+    def _record_failure(self, url, exception):
+        """Lets the rate limiter and the circuit breaker know about a failed api call.
+
+        Args:
+            url (str): relative path of a specific service (account_info, ...).
+            exception (Exception): exception raised by the call.
+
+        Returns:
+            None
 
+        """
+        if isinstance(exception, TooManyRequestsException):
+            if self.rate_limiter is not None:
+                self.rate_limiter.throttled(url)
+            if self.hooks is not None:
+                self.hooks.throttle(url, 0)
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(exception)
+
+    @typed(AccountInfo.from_dict)
     def account_info(self):
         """Requests everything account related (total used storage, reward, ...).
 
@@ -115,6 +464,7 @@ class OpenLoad(object):
         """
         return self._get('account/info')
 
+    @typed(DownloadTicket.from_dict)
     def prepare_download(self, file_id):
         """Makes a request to prepare for file download,
         this download preparation will be used before get_download_link method.
@@ -137,6 +487,7 @@ class OpenLoad(object):
         """
         return self._get('file/dlticket', params={'file': file_id})
 
+    @typed(DownloadLink.from_dict)
     def get_download_link(self, file_id, ticket, captcha_response=None):
         """Requests direct download link for requested file,
         this method makes use of the response of prepare_download, prepare_download must be called first.
@@ -171,6 +522,69 @@ class OpenLoad(object):
 
         return self._get('file/dl', params)
 
+    def download(self, file_id, dest, captcha_solver=None, verify_sha1=True, callback=None, connections=1,
+                 range_size=None, link=None):
+        """Downloads a file to disk: prepares the download, waits its wait_time, gets the download link
+        and streams the file in chunks with constant memory use.
+
+        Note:
+            The file is written to ``<path>.part`` first. Calling download again after a failure resumes
+            the ``.part`` file, so does every attempt made by the retry policy (endpoint ``download``).
+
+        Args:
+            file_id (str): id of the file to be downloaded.
+            dest (str): path of the downloaded file, or directory to download the file to (under its own name).
+            captcha_solver (:obj:`callable`, optional): called with the prepare_download result when it has
+                                                        a captcha_url, must return the captcha solution.
+            verify_sha1 (:obj:`bool`, optional): If this is set to true (default), check the sha1 of the
+                                                 downloaded file against the one of get_download_link.
+            callback (:obj:`callable`, optional): called with the number of bytes of each chunk written
+                                                  (from several threads if connections > 1).
+            connections (:obj:`int`, optional): If this is more than 1, the file is preallocated and its ranges
+                                                are downloaded over that many connections at once, written in place.
+                                                Only the ranges missing are fetched by the next call after a failure,
+                                                expired links are requested again.
+            range_size (:obj:`int`, optional): size of the ranges in bytes (16 MiB by default).
+            link (:obj:`dict`, optional): get_download_link result of the file (from :meth:`download_links`, ...),
+                                          the download starts without requesting a ticket.
+
+        Returns:
+            str: path of the downloaded file.
+
+        Raises:
+            ChecksumMismatchException: size or sha1 of the downloaded file is not the expected one.
+            CaptchaRequiredException: a captcha must be solved and no captcha_solver was given.
+
+        """
+        return download(self, file_id, dest, captcha_solver=captcha_solver, verify_sha1=verify_sha1,
+                        callback=callback, connections=connections, range_size=range_size or RANGE_SIZE,
+                        link=link)
+
+    def download_links(self, file_ids, captcha_solver=None, captcha_workers=1):
+        """Gets the download links of many files, overlapping the wait_time of their tickets.
+
+        Note:
+            Tickets of all files are requested up front, each download link is requested as soon as
+            the wait_time of its ticket is over (see :class:`openload.tickets.TicketScheduler`).
+
+        Args:
+            file_ids (iterable): ids of the files to be downloaded.
+            captcha_solver (:obj:`callable`, optional): called with the prepare_download result of tickets
+                                                        having a captcha_url, must return the captcha solution.
+            captcha_workers (:obj:`int`, optional): number of captchas solved at the same time.
+
+        Returns:
+            generator: :class:`openload.tickets.LinkResult` of every file, in the order their links are ready. ::
+
+                for result in ol.download_links(file_ids):
+                    if result.ok:
+                        print(result.file_id, result.link['url'])
+
+        """
+        scheduler = TicketScheduler(self, captcha_solver=captcha_solver, captcha_workers=captcha_workers)
+        return scheduler.links(file_ids)
+
+    @typed(mapping_of(File))
     def file_info(self, file_id):
         """Used to request info for a specific file, info like size, name, .....
 
@@ -201,8 +615,108 @@ class OpenLoad(object):
                    }
 
         """
+        if self._file_info_batcher is not None and ',' not in file_id:
+            return self._file_info_batcher.file_info(file_id)
+
         return self._get('file/info', params={'file': file_id})
 
+    def _fetch_file_info(self, file_ids):
+        """Requests info of a list of at most ``file_info_max_ids`` files in a single call.
+
+        Args:
+            file_ids (list): ids of the files.
+
+        Returns:
+            dict: same as :meth:`file_info`.
+
+        """
+        return self._get('file/info', params={'file': ','.join(file_ids)})
+
+    @classmethod
+    def _chunk_file_ids(cls, file_ids):
+        """Removes duplicated ids (keeping their first position) and splits them into api sized chunks.
+
+        Args:
+            file_ids (iterable): ids of the files.
+
+        Returns:
+            list: lists of at most ``file_info_max_ids`` unique ids.
+
+        """
+        seen = set()
+        unique_ids = [file_id for file_id in file_ids if not (file_id in seen or seen.add(file_id))]
+        size = cls.file_info_max_ids
+        return [unique_ids[i:i + size] for i in range(0, len(unique_ids), size)]
+
+    @classmethod
+    def _merge_file_infos(cls, chunk_results):
+        """Merges ``file/info`` results, separating files which have a non 200 status.
+
+        Args:
+            chunk_results (iterable): ``file/info`` results (dicts keyed by file id).
+
+        Returns:
+            tuple: (files, errors) see :meth:`file_info_many`.
+
+        """
+        files = {}
+        errors = {}
+
+        for chunk_result in chunk_results:
+            for file_id, info in (chunk_result or {}).items():
+                status = int(info['status'])
+                msg = 'file {file_id}: status {status}'.format(file_id=file_id, status=status)
+
+                try:
+                    cls._check_status({'status': status, 'msg': msg})
+                except Exception as e:
+                    errors[file_id] = e
+                else:
+                    files[file_id] = info
+
+        return files, errors
+
+    @typed(file_infos)
+    def file_info_many(self, file_ids, max_workers=4):
+        """Requests info of any number of files, ids are sent in chunks of 50 (api limit) concurrently.
+
+        Note:
+            Duplicated ids are requested once. A file with non 200 status doesn't fail the whole call,
+            it is reported in errors with the exception :meth:`_check_status` maps its status to.
+
+        Args:
+            file_ids (iterable): ids of the files.
+            max_workers (:obj:`int`, optional): maximum number of chunks requested at the same time.
+
+        Returns:
+            tuple: (files, errors), two dictionaries keyed by file id. ::
+
+                  files: {
+                     "72fA-_Lq8Ak3": {
+                        "id": "72fA-_Lq8Ak3",
+                        "status": 200,
+                        "name": "The quick brown fox.txt",
+                        "size": 123456789012,
+                        "sha1": "2fd4e1c67a2d28fced849ee1bb76e7391b93eb12",
+                        "content_type": "plain/text",
+                     },
+                     ...
+                  }
+
+                  errors: {
+                     "72fA-_Lq8Ak4": FileNotFoundException('file 72fA-_Lq8Ak4: status 404'),
+                     ...
+                  }
+
+        """
+        chunks = self._chunk_file_ids(file_ids)
+
+        if len(chunks) <= 1 or max_workers <= 1:
+            return self._merge_file_infos(self._fetch_file_info(chunk) for chunk in chunks)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            return self._merge_file_infos(executor.map(self._fetch_file_info, chunks))
+
     def upload_link(self, folder_id=None, sha1=None, httponly=False):
         """Makes a request to prepare for file upload.
 
@@ -228,18 +742,43 @@ class OpenLoad(object):
         params = {key: value for key, value in kwargs.items() if value}
         return self._get('file/ul', params=params)
 
-    def upload_file(self, file_path, folder_id=None, sha1=None, httponly=False):
+    def _fetch_upload_link(self, folder_id, httponly):
+        """Requests an upload link, used to fill the upload link pool.
+
+        Args:
+            folder_id (str): folder-ID to upload to, None for ``Home`` folder.
+            httponly (bool): use only http upload links.
+
+        Returns:
+            dict: same as :meth:`upload_link`.
+
+        """
+        return self.upload_link(folder_id=folder_id, httponly=httponly)
+
+    def upload_file(self, file_path, folder_id=None, sha1=None, httponly=False, file_name=None, verify_sha1=False,
+                    callback=None):
         """Calls upload_link request to get valid url, then it makes a post request with given file to be uploaded.
         No need to call upload_link explicitly since upload_file calls it.
 
         Note:
             If folder_id is not provided, the file will be uploaded to ``Home`` folder.
 
+        Note:
+            The file is streamed, it is read once and never held in memory. With verify_sha1, its sha1 is computed
+            while it is being sent and compared to the sha1 openload.co computed, no extra read is needed
+            (unlike computing sha1 beforehand, which reads the whole file before the upload starts).
+
         Args:
-            file_path (str): full path of the file to be uploaded.
+            file_path (str): full path of the file to be uploaded, or a file-like object opened in binary mode,
+                             or an iterable (generator, ...) of bytes.
             folder_id (:obj:`str`, optional): folder-ID to upload to.
             sha1 (:obj:`str`, optional): expected sha1 If sha1 of uploaded file doesn't match this value, upload fails.
             httponly (:obj:`bool`, optional): If this is set to true, use only http upload links.
+            file_name (:obj:`str`, optional): name of the uploaded file, defaults to the base name of file_path
+                                              (or of the ``name`` of the file-like object).
+            verify_sha1 (:obj:`bool`, optional): If this is set to true, raise ChecksumMismatchException when
+                                                 the sha1 of the sent bytes differs from the uploaded file sha1.
+            callback (:obj:`callable`, optional): called with the number of bytes sent, each time a chunk is sent.
 
         Returns:
             dict: dictionary containing uploaded file info. ::
@@ -255,22 +794,241 @@ class OpenLoad(object):
 
         """
 
-        upload_url_response_json = self.upload_link(folder_id=folder_id, sha1=sha1, httponly=httponly)
-        upload_url = upload_url_response_json['url']
+        if self.upload_link_pool is not None and not sha1:
+            upload_url = self.upload_link_pool.get(folder_id=folder_id, httponly=httponly)
+        else:
+            upload_url_response_json = self.upload_link(folder_id=folder_id, sha1=sha1, httponly=httponly)
+            upload_url = upload_url_response_json['url']
+
+        return self._upload_to(upload_url, file_path, folder_id=folder_id, file_name=file_name,
+                               verify_sha1=verify_sha1, callback=callback)
+
+    def _upload_to(self, upload_url, source, folder_id=None, file_name=None, verify_sha1=False, callback=None):
+        """Uploads a file to an already generated upload url, retrying as allowed by the retry policy.
+
+        Args:
+            upload_url (str): url returned by :meth:`upload_link`.
+            source (object): full path of the file, file-like object or iterable of bytes.
+            folder_id (:obj:`str`, optional): folder-ID the upload url was generated for.
+            file_name (:obj:`str`, optional): name of the uploaded file.
+            verify_sha1 (:obj:`bool`, optional): compare the sha1 of the sent bytes with the uploaded file sha1.
+            callback (:obj:`callable`, optional): called with the number of bytes sent, each time a chunk is sent.
+
+        Returns:
+            dict: dictionary containing uploaded file info, see :meth:`upload_file`.
+
+        """
+        file_name = file_name or self._source_name(source)
+        rewind_to = self._rewind_position(source)
+        retryable = isinstance(source, string_types) or rewind_to is not None
+
+        if self.retry_policy is not None and retryable:
+            result = self.retry_policy.run('upload', self._post_file, (upload_url, source, file_name, verify_sha1,
+                                                                       rewind_to, callback), on_retry=self._on_retry())
+        else:
+            result = self._post_file(upload_url, source, file_name, verify_sha1, rewind_to, callback)
+
+        if self.cache is not None:
+            self.cache.invalidate([folder_tag(folder_id), ACCOUNT_TAG])
+
+        return result
+
+    @classmethod
+    def _rewind_position(cls, source):
+        """Returns the position a file-like upload source is moved back to before each attempt.
+
+        Args:
+            source (object): path, file-like object or iterable of bytes.
+
+        Returns:
+            int: current position of a seekable file-like object, None for paths, pipes and iterables
+                 (iterables can be sent only once).
+
+        """
+        if isinstance(source, string_types) or not hasattr(source, 'seek'):
+            return None
+
+        try:
+            return source.tell()
+        except (OSError, IOError, ValueError):
+            return None
+
+    @classmethod
+    def _source_name(cls, source):
+        """Returns the file name of an upload source (path, file-like object or iterable of bytes).
+
+        Args:
+            source (object): path, file-like object or iterable of bytes.
+
+        Returns:
+            str: base name of the path or of the file-like object name, ``file`` if it has none.
+
+        """
+        if isinstance(source, string_types):
+            return os.path.basename(source)
+
+        name = getattr(source, 'name', None)
+        if isinstance(name, string_types):
+            return os.path.basename(name)
 
-        _, file_name = os.path.split(file_path)
+        return 'file'
+
+    def _post_file(self, upload_url, source, file_name, verify_sha1=False, rewind_to=None, callback=None):
+        """Uploads a file to an upload url generated by :meth:`upload_link`, going through the circuit breaker if any.
+
+        Args:
+            upload_url (str): url returned by :meth:`upload_link`.
+            source (object): full path of the file, file-like object or iterable of bytes.
+            file_name (str): name of the uploaded file.
+            verify_sha1 (:obj:`bool`, optional): compare the sha1 of the sent bytes with the uploaded file sha1.
+            rewind_to (:obj:`int`, optional): position a file-like source is moved to before being sent.
+            callback (:obj:`callable`, optional): called with the number of bytes sent, each time a chunk is sent.
+
+        Returns:
+            dict: dictionary containing uploaded file info, see :meth:`upload_file`.
 
-        with open(file_path, 'rb') as f:
+        """
+        hasher = hashlib.sha1() if verify_sha1 else None
+        hooks = self.hooks
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_call()
+        if hooks is not None:
+            hooks.request_start('upload')
+            started = clock()
+            callback = counter = ByteCounter(callback)
+        error = None
+
+        try:
+            if isinstance(source, string_types):
+                with open(source, 'rb') as f:
+                    response_json = self._post_stream(upload_url, f, file_name, hasher, callback)
+            else:
+                if rewind_to is not None:
+                    source.seek(rewind_to)
+                response_json = self._post_stream(upload_url, source, file_name, hasher, callback)
+
+            self._check_status(response_json)
+        except Exception as e:
+            error = e
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(e)
+            raise
+        finally:
+            if hooks is not None:
+                self._request_end('upload', started, error, sent=counter.count)
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record()
+
+        result = response_json['result']
+
+        if hasher is not None and result.get('sha1') != hasher.hexdigest():
+            raise ChecksumMismatchException('sent {sent}, uploaded file sha1 is {uploaded}'.format(
+                sent=hasher.hexdigest(), uploaded=result.get('sha1')))
+
+        return result
+
+    def _post_stream(self, upload_url, source, file_name, hasher=None, callback=None):
+        """Sends a multipart POST request streaming the source.
+
+        Note:
+            Sources of known length (files, seekable file-like objects) are sent with Content-Length,
+            others (pipes, generators) with chunked transfer encoding.
+
+        Args:
+            upload_url (str): url returned by :meth:`upload_link`.
+            source (object): file-like object or iterable of bytes.
+            file_name (str): name of the uploaded file.
+            hasher (:obj:`object`, optional): hashlib object fed with the sent bytes.
+            callback (:obj:`callable`, optional): called with the number of bytes sent, each time a chunk is sent.
+
+        Returns:
+            dict: json of the response.
+
+        """
+        length = source_length(source) if hasattr(source, 'read') else None
+
+        if length is not None:
             data = requests_toolbelt.MultipartEncoder({
-                "files": (file_name, f, "application/octet-stream"),
+                "files": (file_name, HashingReader(source, length, hasher, callback), "application/octet-stream"),
             })
+            content_type = data.content_type
+        else:
+            chunks = iter_file(source) if hasattr(source, 'read') else source
+            content_type, data = multipart_stream("files", file_name, chunks, hasher, callback)
 
-            headers = {"Content-Type": data.content_type}
-            response_json = requests.post(upload_url, data=data, headers=headers).json()
+        headers = {"Content-Type": content_type}
+        return self.session.post(upload_url, data=data, headers=headers, timeout=self.timeout).json()
 
-        self._check_status(response_json)
-        return response_json['result']
+    def upload_many(self, file_paths, folder_id=None, workers=4, httponly=False, verify_sha1=False, prefetch=None,
+                    on_progress=None, on_file_progress=None, dedup_index=None):
+        """Uploads many files concurrently, yielding their results as soon as each upload finishes.
+
+        Note:
+            Upload links are requested ahead of the uploads, a failed upload doesn't stop the rest of the batch.
+            Set pool_maxsize (constructor) to at least workers, so every worker keeps its connection alive.
+
+        Args:
+            file_paths (iterable): full paths of the files to be uploaded.
+            folder_id (:obj:`str`, optional): folder-ID to upload to.
+            workers (:obj:`int`, optional): number of files uploaded at the same time.
+            httponly (:obj:`bool`, optional): If this is set to true, use only http upload links.
+            verify_sha1 (:obj:`bool`, optional): verify the sha1 of each uploaded file (see :meth:`upload_file`).
+            prefetch (:obj:`int`, optional): number of upload links kept ready, defaults to workers.
+            on_progress (:obj:`callable`, optional): called with the :class:`openload.bulk.UploadProgress`
+                                                     of the batch (bytes/s, eta, ...) as the upload goes.
+            on_file_progress (:obj:`callable`, optional): called with (path, bytes sent, file size)
+                                                          each time a chunk of a file is sent.
+            dedup_index (:obj:`openload.index.AccountIndex`, optional): If this is set, files whose content (sha1)
+                                                                       is already in the account are not uploaded,
+                                                                       their result has ``duplicate`` True.
+
+        Returns:
+            generator: :class:`openload.bulk.UploadResult` of every file (path, result or error), ::
+
+                for upload in ol.upload_many(paths, workers=8):
+                    if upload.ok:
+                        print(upload.path, upload.result['url'])
+                    else:
+                        print(upload.path, 'failed', upload.error)
+
+        """
+        return upload_many(self, file_paths, folder_id=folder_id, workers=workers, httponly=httponly,
+                           verify_sha1=verify_sha1, prefetch=prefetch, on_progress=on_progress,
+                           on_file_progress=on_file_progress, dedup_index=dedup_index)
+
+    def ingest(self, file_paths, folder_id=None, hash_workers=None, upload_workers=4, max_pending=None,
+               httponly=False, executor=None):
+        """Uploads many files with their sha1, computed by a process pool while the files hashed before are sent.
 
+        Note:
+            Hashing is CPU bound, a single Python thread hashing big files is slower than the network.
+            The files are hashed by hash_workers processes (one per core by default) and each file is uploaded
+            as soon as its sha1 is known, at most max_pending files are being hashed or uploaded at a time.
+            See :func:`openload.ingest.ingest`.
+
+        Args:
+            file_paths (iterable): full paths of the files to be uploaded, consumed as the upload goes.
+            folder_id (:obj:`str`, optional): folder-ID to upload to.
+            hash_workers (:obj:`int`, optional): number of hashing processes, defaults to the number of cores.
+            upload_workers (:obj:`int`, optional): number of files uploaded at the same time.
+            max_pending (:obj:`int`, optional): maximum number of files hashed or uploaded at the same time,
+                                                defaults to hash_workers + 2 * upload_workers.
+            httponly (:obj:`bool`, optional): If this is set to true, use only http upload links.
+            executor (:obj:`concurrent.futures.Executor`, optional): executor hashing the files instead of
+                                                                     a new process pool.
+
+        Returns:
+            generator: :class:`openload.bulk.UploadResult` of every file (path, result or error), ::
+
+                for upload in ol.ingest(paths, upload_workers=8):
+                    print(upload.path, upload.result['sha1'] if upload.ok else upload.error)
+
+        """
+        return ingest(self, file_paths, folder_id=folder_id, hash_workers=hash_workers,
+                      upload_workers=upload_workers, max_pending=max_pending, httponly=httponly, executor=executor)
+
+    @typed(RemoteUpload.from_dict)
     def remote_upload(self, remote_url, folder_id=None, headers=None):
         """Used to make a remote file upload to openload.co
 
@@ -298,6 +1056,7 @@ class OpenLoad(object):
 
         return self._get('remotedl/add', params=params)
 
+    @typed(mapping_of(RemoteUpload))
     def remote_upload_status(self, limit=None, remote_upload_id=None):
         """Checks a remote file upload to status.
 
@@ -341,6 +1100,55 @@ class OpenLoad(object):
 
         return self._get('remotedl/status', params=params)
 
+    def iter_remote_upload_status(self, limit=None, remote_upload_id=None):
+        """Streamed :meth:`remote_upload_status`, yields remote uploads as the response is parsed.
+
+        Args:
+            limit (:obj:`int`, optional): Maximum number of results (Default: 5, Maximum: 100).
+            remote_upload_id (:obj:`str`, optional): Remote Upload ID.
+
+        Returns:
+            generator: status of every remote upload (:class:`openload.models.RemoteUpload` with models).
+
+        """
+        kwargs = {'limit': limit, 'id': remote_upload_id}
+        params = {key: value for key, value in kwargs.items() if value}
+
+        for _, status in self._iter_get('remotedl/status', params=params):
+            yield RemoteUpload.from_dict(status) if self.models else status
+
+    def remote_upload_many(self, remote_urls, folder_id=None, headers=None, workers=4, max_active=None,
+                           min_interval=1.0, max_interval=60.0):
+        """Makes many remote file uploads and waits for them, yielding each one as soon as it finished.
+
+        Note:
+            Uploads are tracked by a :class:`openload.remote.RemoteUploadManager`: their status is polled in
+            batches (one ``remotedl/status`` call for up to 100 uploads), each upload at an interval adapted to
+            its progress. Use the manager directly for callbacks or to add uploads over time.
+
+        Args:
+            remote_urls (iterable): direct links of files to be remotely downloaded.
+            folder_id (:obj:`str`, optional): folder-ID to upload to.
+            headers (:obj:`dict`, optional): additional HTTP headers (e.g. Cookies or HTTP Basic-Auth)
+            workers (:obj:`int`, optional): number of ``remotedl/add`` calls made at the same time.
+            max_active (:obj:`int`, optional): maximum number of unfinished remote uploads at the same time.
+            min_interval (:obj:`float`, optional): minimum seconds between two status polls of an upload.
+            max_interval (:obj:`float`, optional): maximum seconds between two status polls of an upload.
+
+        Returns:
+            generator: :class:`openload.remote.RemoteUpload` of every url, in the order they finish. ::
+
+                for upload in ol.remote_upload_many(urls, folder_id='4248', max_active=10):
+                    try:
+                        print(upload.remote_url, upload.result()['url'])
+                    except Exception as e:
+                        print(upload.remote_url, 'failed', e)
+
+        """
+        return remote_upload_many(self, remote_urls, folder_id=folder_id, headers=headers, workers=workers,
+                                  max_active=max_active, min_interval=min_interval, max_interval=max_interval)
+
+    @typed(listing)
     def list_folder(self, folder_id=None):
         """Request a list of files and folders in specified folder.
 
@@ -389,6 +1197,91 @@ class OpenLoad(object):
 
         return self._get('file/listfolder', params=params)
 
+    def iter_list_folder(self, folder_id=None):
+        """Streamed :meth:`list_folder`, yields folders and files as the response is parsed.
+
+        Note:
+            Memory use doesn't grow with the size of the folder, only the entry being decoded is kept.
+            The call is neither retried nor cached.
+
+        Args:
+            folder_id (:obj:`str`, optional): id of the folder to be listed, ``Home`` folder if not provided.
+
+        Returns:
+            generator: (``'folders'`` or ``'files'``, entry) of every subfolder and file of the folder,
+            entries are :class:`openload.models.Folder` and :class:`openload.models.File` with models. ::
+
+                for kind, entry in ol.iter_list_folder('4258'):
+                    if kind == 'files':
+                        print(entry['name'])
+
+        """
+        params = {'folder': folder_id} if folder_id else {}
+        convert = {'folders': Folder.from_dict, 'files': File.from_dict} if self.models else {}
+
+        for kind, entry in self._iter_get('file/listfolder', params=params):
+            yield kind, convert[kind](entry) if kind in convert else entry
+
+    def walk(self, folder_id=None, max_depth=None, folder_filter=None, file_filter=None, workers=4, onerror=None):
+        """Walks a folder tree like :func:`os.walk`, listing several folders at the same time.
+
+        Note:
+            Folders are yielded as soon as their listing arrives and listed only as the generator is consumed,
+            the whole tree is never held in memory. See :func:`openload.walk.walk`.
+
+        Args:
+            folder_id (:obj:`str`, optional): id of the folder to walk, ``Home`` folder if not provided.
+            max_depth (:obj:`int`, optional): depth of the last folders listed, 0 lists only the walked folder.
+            folder_filter (:obj:`callable` or :obj:`str`, optional): callable taking a folder dict or fnmatch
+                                                                     pattern(s) of folder names, folders not
+                                                                     matching are skipped with their subtrees.
+            file_filter (:obj:`callable` or :obj:`str`, optional): same as folder_filter, for files.
+            workers (:obj:`int`, optional): maximum number of folders listed at the same time.
+            onerror (:obj:`callable`, optional): called with (folder, exception) when a listing fails,
+                                                 errors are raised if not provided.
+
+        Returns:
+            generator: (folder, subfolders, files) of every folder walked. ::
+
+                for folder, subfolders, files in ol.walk(file_filter='*.mp4'):
+                    for f in files:
+                        print(folder['path'], f['name'])
+
+        """
+        return walk(self, folder_id=folder_id, max_depth=max_depth, folder_filter=folder_filter,
+                    file_filter=file_filter, workers=workers, onerror=onerror)
+
+    def sync(self, local_dir, folder_id=None, state_path=None, delete=False, dry_run=False, max_age=3600, workers=4):
+        """Makes a remote folder tree mirror a local directory tree, uploading, renaming and deleting files.
+
+        Note:
+            The state of both trees (remote listings, sha1 of local files) is kept in an
+            :class:`openload.index.AccountIndex` at state_path, a run with nothing changed makes no api call
+            (remote folders are listed again after max_age seconds) and hashes no file.
+            Folders can't be created through the api, local directories without remote folder are reported.
+            See :func:`openload.sync.sync`.
+
+        Args:
+            local_dir (str): path of the local directory.
+            folder_id (:obj:`str`, optional): id of the remote folder, ``Home`` folder if not provided.
+            state_path (:obj:`str`, optional): path of the sqlite state file, state is not kept between runs
+                                               if not provided.
+            delete (:obj:`bool`, optional): If this is set to true, delete remote files missing locally.
+            dry_run (:obj:`bool`, optional): If this is set to true, only compute the actions.
+            max_age (:obj:`float`, optional): seconds after which remote folders are listed again.
+            workers (:obj:`int`, optional): number of uploads, renames and deletes made at the same time.
+
+        Returns:
+            list: :class:`openload.sync.SyncAction` computed (and carried out unless dry_run). ::
+
+                for action in ol.sync('/media/videos', '4258', state_path='videos.sqlite', dry_run=True):
+                    print(action.kind, action.path or action.name)
+
+        """
+        with AccountIndex(self, state_path or ':memory:') as index:
+            return sync(index, local_dir, folder_id=folder_id, delete=delete, dry_run=dry_run, max_age=max_age,
+                        workers=workers)
+
     def rename_folder(self, folder_id, name):
         """Sets a new name for a folders
 
@@ -442,6 +1335,33 @@ class OpenLoad(object):
         """
         return self._get('file/convert', params={'file': file_id})
 
+    def convert_files(self, file_ids, folder_id=None, interval=5.0):
+        """Converts many files of a folder, yielding each conversion as soon as it finished.
+
+        Note:
+            Conversions are watched by a :class:`openload.conversions.ConversionTracker`, which lists the running
+            conversions of the folder once per interval whatever the number of files. A file no longer listed
+            has finished converting. Use the tracker directly for progress events or files of many folders.
+
+        Args:
+            file_ids (iterable): ids of the files to be converted.
+            folder_id (:obj:`str`, optional): id of the folder of the files, ``Home`` folder if not provided.
+            interval (:obj:`float`, optional): seconds between two listings of the running conversions.
+
+        Returns:
+            generator: :class:`openload.conversions.Conversion` of every file, in the order they finish. ::
+
+                for conversion in ol.convert_files(file_ids, folder_id='4258'):
+                    try:
+                        conversion.result()
+                        print(conversion.file_id, 'converted')
+                    except Exception as e:
+                        print(conversion.file_id, 'failed', e)
+
+        """
+        return convert_files(self, file_ids, folder_id=folder_id, interval=interval)
+
+    @typed(list_of(Conversion))
     def running_conversions(self, folder_id=None):
         """Shows running file converts by folder
 
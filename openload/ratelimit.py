@@ -0,0 +1,170 @@
+from __future__ import absolute_import
+
+import threading
+import time
+
+clock = getattr(time, 'monotonic', time.time)
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket whose rate adapts to the api throttling (429 responses).
+
+    Every call takes one token, tokens are refilled at the current rate up to ``burst`` tokens.
+    When the api answers 429 the current rate is multiplied by ``decrease_factor`` (down to ``min_rate``),
+    then it grows back linearly, reaching ``rate`` again after ``recovery_time`` seconds without 429.
+
+    Args:
+        rate (float): maximum number of calls per second.
+        burst (:obj:`float`, optional): maximum number of calls made at once after idling, defaults to ``rate``.
+        min_rate (:obj:`float`, optional): lowest rate reached when throttled, defaults to 1% of ``rate``.
+        decrease_factor (:obj:`float`, optional): factor the current rate is multiplied by on each 429.
+        recovery_time (:obj:`float`, optional): seconds needed to climb from ``min_rate`` back to ``rate``.
+
+    """
+
+    def __init__(self, rate, burst=None, min_rate=None, decrease_factor=0.5, recovery_time=60.0):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self.min_rate = float(min_rate if min_rate is not None else rate / 100.0)
+        self.decrease_factor = decrease_factor
+        self.recovery_time = recovery_time
+
+        self.current_rate = self.rate
+        self._tokens = self.burst
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated_at
+        self._updated_at = now
+
+        if self.current_rate < self.rate:
+            recovered = (self.rate - self.min_rate) * elapsed / self.recovery_time if self.recovery_time else self.rate
+            self.current_rate = min(self.rate, self.current_rate + recovered)
+
+        self._tokens = min(self.burst, self._tokens + elapsed * self.current_rate)
+
+    def reserve(self):
+        """Takes a token, the caller must wait the returned delay before making its call.
+
+        Returns:
+            float: seconds to wait, 0 if a token was available.
+
+        """
+        with self._lock:
+            self._refill(clock())
+            self._tokens -= 1
+            return -self._tokens / self.current_rate if self._tokens < 0 else 0.0
+
+    def acquire(self):
+        """Takes a token, sleeps until the call it is taken for is allowed.
+
+        Returns:
+            float: seconds slept.
+
+        """
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def throttled(self):
+        """Lowers the current rate, called when the api answered 429 (Too Many Requests).
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self._refill(clock())
+            self.current_rate = max(self.min_rate, self.current_rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class RateLimiter(object):
+    """Rate limits api calls per endpoint group, one :class:`TokenBucket` for each group.
+
+    Groups are the first part of api paths: ``account`` (account_info), ``file`` (file_info, list_folder, uploads,
+    downloads, ...) and ``remotedl`` (remote_upload, remote_upload_status). A limiter may be shared by many
+    :class:`OpenLoad` instances (and threads) using the same account. ::
+
+        limiter = RateLimiter({'file': 20, 'remotedl': 2}, default=5)
+        ol = OpenLoad('login', 'key', rate_limiter=limiter)
+
+    Args:
+        rates (:obj:`dict`, optional): group name to calls per second or to a :class:`TokenBucket`.
+        default (:obj:`float`, optional): calls per second of groups missing in rates, not limited if None.
+
+    """
+
+    def __init__(self, rates=None, default=None):
+        self.default = default
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+        for group, rate in (rates or {}).items():
+            self.buckets[group] = rate if isinstance(rate, TokenBucket) else TokenBucket(rate)
+
+    @staticmethod
+    def group(url):
+        """Returns the endpoint group of a relative api path (``file/info`` -> ``file``)."""
+        return url.split('/', 1)[0]
+
+    def bucket(self, url):
+        """Returns the bucket limiting calls to the given api path, None if they are not limited.
+
+        Args:
+            url (str): relative api path (file/info, ...).
+
+        Returns:
+            TokenBucket: bucket of the path group.
+
+        """
+        group = self.group(url)
+        bucket = self.buckets.get(group)
+
+        if bucket is None and self.default is not None:
+            with self._lock:
+                bucket = self.buckets.setdefault(group, TokenBucket(self.default))
+
+        return bucket
+
+    def reserve(self, url):
+        """Takes a token for a call to the given api path.
+
+        Args:
+            url (str): relative api path (file/info, ...).
+
+        Returns:
+            float: seconds to wait before making the call.
+
+        """
+        bucket = self.bucket(url)
+        return bucket.reserve() if bucket is not None else 0.0
+
+    def acquire(self, url):
+        """Blocks until a call to the given api path is allowed.
+
+        Args:
+            url (str): relative api path (file/info, ...).
+
+        Returns:
+            float: seconds slept.
+
+        """
+        bucket = self.bucket(url)
+        return bucket.acquire() if bucket is not None else 0.0
+
+    def throttled(self, url):
+        """Lowers the rate of the given api path group, called when the api answered 429.
+
+        Args:
+            url (str): relative api path (file/info, ...).
+
+        Returns:
+            None
+
+        """
+        bucket = self.bucket(url)
+        if bucket is not None:
+            bucket.throttled()
@@ -0,0 +1,337 @@
+from __future__ import absolute_import
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from .api_exceptions import RemoteUploadFailedException
+from .models import untyped
+from .ratelimit import clock
+
+FINISHED_STATUSES = ('finished',)
+FAILED_STATUSES = ('error', 'failed', 'deleted')
+
+
+class RemoteUpload(object):
+    """Remote upload tracked by :class:`RemoteUploadManager`.
+
+    Attributes:
+        remote_url (str): direct link of the remotely downloaded file.
+        folder_id (str): folder-ID uploaded to, None for ``Home`` folder.
+        id (str): remote upload id, None until ``remotedl/add`` answered.
+        status (dict): latest :meth:`OpenLoad.remote_upload_status` entry of the upload, None until polled.
+        future (:obj:`concurrent.futures.Future`): resolves to the final status (``extid``, ``url``, ...),
+                                                   or to the exception of a failed upload.
+
+    """
+
+    __slots__ = ('remote_url', 'folder_id', 'headers', 'id', 'status', 'future',
+                 '_interval', '_due', '_progress', '_errors')
+
+    def __init__(self, remote_url, folder_id=None, headers=None):
+        self.remote_url = remote_url
+        self.folder_id = folder_id
+        self.headers = headers
+        self.id = None
+        self.status = None
+        self.future = Future()
+        self._interval = None
+        self._due = None
+        self._progress = None
+        self._errors = 0
+
+    @property
+    def progress(self):
+        """float: fraction of the file downloaded by the server (``bytes_loaded / bytes_total``), None if unknown."""
+        loaded, total = _bytes(self.status)
+        return float(loaded) / total if total else None
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """Waits for the upload to finish and returns its final status, raises the exception of a failed upload."""
+        return self.future.result(timeout)
+
+    def __repr__(self):
+        state = (self.status or {}).get('status', 'pending')
+        return '<RemoteUpload {id!r} {url!r} {state}>'.format(id=self.id, url=self.remote_url, state=state)
+
+
+def _bytes(status):
+    try:
+        return int((status or {}).get('bytes_loaded') or 0), int((status or {}).get('bytes_total') or 0)
+    except (TypeError, ValueError):
+        return 0, 0
+
+
+class RemoteUploadManager(object):
+    """Adds many remote uploads and tracks them until they finish, polling their status in batches.
+
+    Every poll is a single ``remotedl/status`` call returning the latest batch_size uploads of the account, uploads
+    tracked but missing from it (older ones) are polled by id. Each upload has its own polling interval:
+    the time left estimated from its ``bytes_loaded`` progress halved (so uploads about to finish are checked
+    often and long ones rarely), doubled while it makes no progress, within [min_interval, max_interval].
+    A poll is made when the first upload is due and updates every tracked upload.
+
+    Uploads are added by workers threads, at most max_active uploads are unfinished at the same time.
+
+    Args:
+        ol (OpenLoad): client used for the api calls.
+        workers (:obj:`int`, optional): number of ``remotedl/add`` calls made at the same time.
+        max_active (:obj:`int`, optional): maximum number of uploads added and not finished, unbounded if not set.
+        batch_size (:obj:`int`, optional): limit of the batched ``remotedl/status`` calls (api maximum: 100).
+        min_interval (:obj:`float`, optional): minimum seconds between two polls of an upload.
+        max_interval (:obj:`float`, optional): maximum seconds between two polls of an upload.
+        max_poll_errors (:obj:`int`, optional): consecutive failed polls after which an upload fails.
+        on_progress (:obj:`callable`, optional): called with the :class:`RemoteUpload` after each status update.
+
+    """
+
+    def __init__(self, ol, workers=4, max_active=None, batch_size=100, min_interval=1.0, max_interval=60.0,
+                 max_poll_errors=5, on_progress=None):
+        self.ol = ol
+        self.max_active = max_active
+        self.batch_size = batch_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_poll_errors = max_poll_errors
+        self.on_progress = on_progress
+
+        self._tracked = {}
+        self._active = 0
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._poller = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(wait=exc_type is None)
+
+    def submit(self, remote_url, folder_id=None, headers=None, callback=None):
+        """Adds a remote upload (in the background) and tracks it.
+
+        Args:
+            remote_url (str): direct link of file to be remotely downloaded.
+            folder_id (:obj:`str`, optional): folder-ID to upload to.
+            headers (:obj:`dict`, optional): additional HTTP headers (e.g. Cookies or HTTP Basic-Auth)
+            callback (:obj:`callable`, optional): called with the :class:`RemoteUpload` once it finished or failed.
+
+        Returns:
+            RemoteUpload: the upload, its future resolves to its final status.
+
+        """
+        upload = self._watch(RemoteUpload(remote_url, folder_id, headers), callback)
+        self._executor.submit(self._add, upload)
+        return upload
+
+    def track(self, remote_upload_id, callback=None):
+        """Tracks a remote upload already added (by :meth:`OpenLoad.remote_upload`).
+
+        Args:
+            remote_upload_id (str): Remote Upload ID.
+            callback (:obj:`callable`, optional): called with the :class:`RemoteUpload` once it finished or failed.
+
+        Returns:
+            RemoteUpload: the upload, its future resolves to its final status.
+
+        """
+        upload = self._watch(RemoteUpload(None), callback)
+        upload.id = str(remote_upload_id)
+        if upload.future.set_running_or_notify_cancel():
+            with self._condition:
+                self._active += 1
+            self._track(upload)
+        return upload
+
+    def close(self, wait=True):
+        """Stops adding and polling uploads.
+
+        Args:
+            wait (:obj:`bool`, optional): If this is set to true, wait for every upload to finish first,
+                                          unfinished uploads fail with RemoteUploadFailedException otherwise.
+
+        """
+        if wait:
+            self._executor.shutdown(wait=True)
+
+        with self._condition:
+            while wait and (self._tracked or self._active):
+                self._condition.wait()
+            self._closed = True
+            self._condition.notify_all()
+            unfinished = list(self._tracked.values())
+            self._tracked.clear()
+
+        for upload in unfinished:
+            upload.future.set_exception(RemoteUploadFailedException('remote upload {0} stopped being tracked'
+                                                                    .format(upload.id)))
+        self._executor.shutdown(wait=wait)
+        if self._poller is not None:
+            self._poller.join()
+
+    def _watch(self, upload, callback):
+        if callback is not None:
+            upload.future.add_done_callback(lambda future: callback(upload))
+        return upload
+
+    def _add(self, upload):
+        if not upload.future.set_running_or_notify_cancel():
+            return
+
+        with self._condition:
+            while self.max_active is not None and self._active >= self.max_active and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                upload.future.set_exception(RemoteUploadFailedException('manager closed'))
+                return
+            self._active += 1
+
+        try:
+            result = untyped(self.ol).remote_upload(upload.remote_url, folder_id=upload.folder_id,
+                                                    headers=upload.headers)
+            upload.id = str(result['id'])
+        except Exception as e:
+            self._fail_untracked(upload, e)
+            return
+
+        self._track(upload)
+
+    def _track(self, upload):
+        """Starts polling an upload counted as active, fails it if the manager was closed in the meantime."""
+        with self._condition:
+            if not self._closed:
+                self._start_tracking(upload)
+                return
+
+        self._fail_untracked(upload, RemoteUploadFailedException('remote upload {0} stopped being tracked'
+                                                                 .format(upload.id)))
+
+    def _fail_untracked(self, upload, error):
+        """Fails an upload counted as active which is not tracked (close doesn't know about it)."""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+        upload.future.set_exception(error)
+
+    def _start_tracking(self, upload):
+        upload._interval = self.min_interval
+        upload._due = clock() + self.min_interval
+        self._tracked[upload.id] = upload
+        if self._poller is None:
+            self._poller = threading.Thread(target=self._poll_forever)
+            self._poller.daemon = True
+            self._poller.start()
+        self._condition.notify_all()
+
+    def _finish(self, upload, status=None, error=None):
+        with self._condition:
+            # Already failed by close if it is no longer tracked.
+            if self._tracked.pop(upload.id, None) is None:
+                return
+            self._active -= 1
+            self._condition.notify_all()
+
+        if error is not None:
+            upload.future.set_exception(error)
+        else:
+            upload.future.set_result(status)
+
+    def _poll_forever(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    delay = min(upload._due for upload in self._tracked.values()) - clock() if self._tracked else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._closed:
+                    return
+                tracked = dict(self._tracked)
+
+            self._poll(tracked)
+
+    def _poll(self, tracked):
+        now = clock()
+        try:
+            statuses = untyped(self.ol).remote_upload_status(limit=self.batch_size) or {}
+        except Exception as e:
+            statuses = {}
+            batch_error = e
+        else:
+            batch_error = None
+
+        for upload_id, upload in tracked.items():
+            status = statuses.get(upload_id)
+            error = batch_error
+            if status is None and error is None and upload._due <= now:
+                # Older than the latest batch_size uploads of the account.
+                try:
+                    status = (untyped(self.ol).remote_upload_status(remote_upload_id=upload_id) or {}).get(upload_id)
+                except Exception as e:
+                    error = e
+
+            if status is not None:
+                self._update(upload, status, clock())
+            elif upload._due <= now:
+                upload._errors += 1
+                if upload._errors >= self.max_poll_errors:
+                    self._finish(upload, error=error or RemoteUploadFailedException(
+                        'remote upload {0} not found'.format(upload_id)))
+                else:
+                    self._reschedule(upload, upload._interval * 2, clock())
+
+    def _update(self, upload, status, now):
+        upload.status = status
+        upload._errors = 0
+        if self.on_progress is not None:
+            self.on_progress(upload)
+
+        state = status.get('status')
+        if state in FINISHED_STATUSES:
+            self._finish(upload, status=status)
+            return
+        if state in FAILED_STATUSES:
+            self._finish(upload, error=RemoteUploadFailedException(
+                'remote upload {0} of {1} ended with status {2}'.format(upload.id, status.get('remoteurl'), state)))
+            return
+
+        loaded, total = _bytes(status)
+        interval = upload._interval
+        if upload._progress is not None:
+            previous_at, previous_loaded = upload._progress
+            if loaded > previous_loaded and now > previous_at:
+                rate = (loaded - previous_loaded) / (now - previous_at)
+                interval = (total - loaded) / rate / 2
+            else:
+                interval *= 2
+        upload._progress = (now, loaded)
+        self._reschedule(upload, interval, now)
+
+    def _reschedule(self, upload, interval, now):
+        upload._interval = min(max(interval, self.min_interval), self.max_interval)
+        upload._due = now + upload._interval
+
+
+def remote_upload_many(ol, remote_urls, folder_id=None, headers=None, workers=4, max_active=None,
+                       min_interval=1.0, max_interval=60.0):
+    """Adds many remote uploads and yields each one as soon as it finished or failed.
+
+    See :class:`RemoteUploadManager`, uploads still unfinished when the generator is closed stop being tracked.
+
+    Returns:
+        generator: every :class:`RemoteUpload`, in the order they finish.
+
+    """
+    manager = RemoteUploadManager(ol, workers=workers, max_active=max_active, min_interval=min_interval,
+                                  max_interval=max_interval)
+    try:
+        uploads = dict((upload.future, upload) for upload in
+                       (manager.submit(url, folder_id=folder_id, headers=headers) for url in remote_urls))
+        for future in as_completed(uploads):
+            yield uploads[future]
+    finally:
+        manager.close(wait=False)
@@ -0,0 +1,244 @@
+from __future__ import absolute_import
+
+import random
+import threading
+import time
+
+import requests
+
+from .api_exceptions import (BandwidthUsageExceeded, CircuitOpenException, ServerErrorException,
+                             TooManyRequestsException)
+from .ratelimit import clock
+
+try:
+    import asyncio
+    from aiohttp import ClientError as AsyncClientError
+except ImportError:  # aiohttp is optional, AsyncOpenLoad is the only one raising its exceptions
+    TRANSPORT_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+else:
+    TRANSPORT_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                            AsyncClientError, asyncio.TimeoutError)
+
+# Failures of the api or of the network, worth another attempt.
+# ValueError is raised when the response body is not json (error pages of proxies or overloaded servers).
+TRANSIENT_EXCEPTIONS = (ServerErrorException, ValueError) + TRANSPORT_EXCEPTIONS
+
+# Calls which can be repeated without side effects (reading or setting a value).
+IDEMPOTENT_ENDPOINTS = frozenset([
+    'account/info',
+    'download',
+    'file/dlticket',
+    'file/info',
+    'file/ul',
+    'file/listfolder',
+    'file/rename',
+    'file/renamefolder',
+    'file/runningconverts',
+    'file/getsplash',
+    'remotedl/status',
+])
+
+
+class RetryPolicy(object):
+    """Retries failed calls with exponential backoff and full jitter.
+
+    Transient failures (:class:`ServerErrorException`, connection errors, timeouts and non json responses)
+    are retried only for idempotent endpoints (file_info, list_folder, ...), calls with side effects
+    (remote_upload, delete_file, upload of the file itself, ...) are retried only if listed in ``unsafe_endpoints``.
+    :class:`TooManyRequestsException` is retried for every endpoint, the api rejected the call without running it,
+    unless ``retry_throttled`` is false.
+
+    Args:
+        max_attempts (:obj:`int`, optional): maximum number of attempts (first call included).
+        backoff (:obj:`float`, optional): base delay in seconds, the n-th retry waits up to ``backoff * 2 ** n``.
+        max_backoff (:obj:`float`, optional): maximum delay in seconds between two attempts.
+        max_elapsed (:obj:`float`, optional): seconds after which no retry is made, None for no limit.
+        jitter (:obj:`bool`, optional): If this is set to true, delays are random between 0 and the backoff.
+        unsafe_endpoints (:obj:`iterable` or :obj:`bool`, optional): non idempotent endpoints (``remotedl/add``,
+                                                                     ``file/delete``, ``upload``, ...) to retry anyway,
+                                                                     True for all of them.
+        retry_exceptions (:obj:`tuple`, optional): exceptions considered transient.
+        retry_throttled (:obj:`bool`, optional): If this is set to false, calls failing with
+                                                 :class:`TooManyRequestsException` (429) or
+                                                 :class:`BandwidthUsageExceeded` (509) are never retried.
+
+    """
+
+    def __init__(self, max_attempts=4, backoff=0.5, max_backoff=30.0, max_elapsed=60.0, jitter=True,
+                 unsafe_endpoints=(), retry_exceptions=TRANSIENT_EXCEPTIONS, retry_throttled=True):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+        self.unsafe_endpoints = unsafe_endpoints if unsafe_endpoints is True else frozenset(unsafe_endpoints)
+        self.retry_exceptions = retry_exceptions
+        self.retry_throttled = retry_throttled
+
+    def is_retryable(self, endpoint, exception):
+        """Checks whether a call to the endpoint failing with the given exception may be made again.
+
+        Args:
+            endpoint (str): relative api path (file/info, ...), ``upload`` or ``download`` for the transfer of a file.
+            exception (Exception): exception raised by the call.
+
+        Returns:
+            bool: True if the call may be retried.
+
+        """
+        if isinstance(exception, (TooManyRequestsException, BandwidthUsageExceeded)) and not self.retry_throttled:
+            return False
+
+        if isinstance(exception, TooManyRequestsException):
+            return True
+
+        if not isinstance(exception, self.retry_exceptions):
+            return False
+
+        return (endpoint in IDEMPOTENT_ENDPOINTS or self.unsafe_endpoints is True or
+                endpoint in self.unsafe_endpoints)
+
+    def backoff_delay(self, attempt):
+        """Returns delay in seconds before the given retry (1 for the first one)."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def next_delay(self, endpoint, exception, attempt, started_at):
+        """Decides whether a failed call is retried.
+
+        Args:
+            endpoint (str): relative api path (file/info, ...), ``upload`` or ``download`` for the transfer of a file.
+            exception (Exception): exception raised by the call.
+            attempt (int): number of attempts made so far.
+            started_at (float): clock value (:func:`openload.ratelimit.clock`) when the first attempt started.
+
+        Returns:
+            float: seconds to wait before the next attempt, None if the exception should be raised.
+
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(endpoint, exception):
+            return None
+
+        delay = self.backoff_delay(attempt)
+
+        if self.max_elapsed is not None and clock() + delay - started_at > self.max_elapsed:
+            return None
+
+        return delay
+
+    def call(self, endpoint, func, *args, **kwargs):
+        """Calls func with the given arguments, retrying it while its failures are retryable.
+
+        Args:
+            endpoint (str): relative api path (file/info, ...), ``upload`` or ``download`` for the transfer of a file.
+            func (callable): the call to make.
+
+        Returns:
+            object: whatever func returns.
+
+        """
+        return self.run(endpoint, func, args, kwargs)
+
+    def run(self, endpoint, func, args=(), kwargs=None, on_retry=None):
+        """Same as :meth:`call`, with a callback told about each retry.
+
+        Args:
+            endpoint (str): relative api path (file/info, ...), ``upload`` or ``download`` for the transfer of a file.
+            func (callable): the call to make.
+            args (:obj:`tuple`, optional): positional arguments of func.
+            kwargs (:obj:`dict`, optional): keyword arguments of func.
+            on_retry (:obj:`callable`, optional): called with (endpoint, attempt, delay, exception)
+                                                  before waiting for the next attempt (:meth:`Hooks.retry`).
+
+        Returns:
+            object: whatever func returns.
+
+        """
+        started_at = clock()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                return func(*args, **(kwargs or {}))
+            except Exception as e:
+                delay = self.next_delay(endpoint, e, attempt, started_at)
+                if delay is None:
+                    raise
+                if on_retry is not None:
+                    on_retry(endpoint, attempt, delay, e)
+
+            time.sleep(delay)
+
+
+class CircuitBreaker(object):
+    """Fails fast while the api is down instead of letting every caller wait for its own timeout.
+
+    After ``failure_threshold`` consecutive transient failures the circuit opens: calls raise
+    :class:`CircuitOpenException` without reaching the api. After ``reset_timeout`` seconds a single trial
+    call is let through, the circuit closes if it succeeds and opens again otherwise.
+
+    Api calls and the uploads of files (POST to the upload url) go through the breaker, with
+    :class:`OpenLoad` and :class:`AsyncOpenLoad` alike. Downloads of files don't.
+
+    Args:
+        failure_threshold (:obj:`int`, optional): consecutive failures opening the circuit.
+        reset_timeout (:obj:`float`, optional): seconds the circuit stays open before a trial call.
+        failure_exceptions (:obj:`tuple`, optional): exceptions counted as failures of the api.
+
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, failure_exceptions=TRANSIENT_EXCEPTIONS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_exceptions = failure_exceptions
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raises :class:`CircuitOpenException` if the call is not allowed.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            if self.state == self.OPEN and clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return
+
+        raise CircuitOpenException('api is unavailable, calls are suspended after {failures} failures'.format(
+            failures=self.failures))
+
+    def record(self, exception=None):
+        """Records the outcome of an allowed call.
+
+        Args:
+            exception (:obj:`Exception`, optional): exception raised by the call, None if it succeeded.
+
+        Returns:
+            None
+
+        """
+        failed = exception is not None and isinstance(exception, self.failure_exceptions)
+
+        with self._lock:
+            if not failed:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = clock()
@@ -0,0 +1,175 @@
+from __future__ import absolute_import
+
+import hashlib
+import io
+import mmap
+import os
+import uuid
+
+try:
+    string_types = (str, unicode)
+except NameError:  # Python 3
+    string_types = (str,)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingReader(object):
+    """Read-only file wrapper feeding every byte read to a hash object.
+
+    Note:
+        ``len`` (bytes left to read) is what :class:`requests_toolbelt.MultipartEncoder` uses to compute
+        Content-Length, so the wrapped file is streamed without being read beforehand.
+
+    Args:
+        fileobj (file): file-like object opened in binary mode.
+        length (int): number of bytes to read from the current position of fileobj.
+        hasher (:obj:`object`, optional): hashlib object, bytes are not hashed if None.
+        callback (:obj:`callable`, optional): called with the number of bytes of each read.
+
+    """
+
+    def __init__(self, fileobj, length, hasher=None, callback=None):
+        self.fileobj = fileobj
+        self.hasher = hasher
+        self.callback = callback
+        self._remaining = length
+
+    @property
+    def len(self):
+        return self._remaining
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+
+        data = self.fileobj.read(size)
+        self._remaining -= len(data)
+
+        if self.hasher is not None:
+            self.hasher.update(data)
+
+        if self.callback is not None and data:
+            self.callback(len(data))
+
+        return data
+
+
+class ByteCounter(object):
+    """Progress callback adding up the bytes it is called with, and passing them on to callback if any.
+
+    Args:
+        callback (:obj:`callable`, optional): called with the number of bytes of each chunk.
+
+    """
+
+    __slots__ = ('count', 'callback')
+
+    def __init__(self, callback=None):
+        self.count = 0
+        self.callback = callback
+
+    def __call__(self, size):
+        self.count += size
+        if self.callback is not None:
+            self.callback(size)
+
+
+def source_length(fileobj):
+    """Returns number of bytes left to read in a file-like object, None if it can't be known (pipes, sockets, ...).
+
+    Args:
+        fileobj (file): file-like object.
+
+    Returns:
+        int: bytes between the current position and the end of the file.
+
+    """
+    try:
+        position = fileobj.tell()
+        size = os.fstat(fileobj.fileno()).st_size
+    except (AttributeError, OSError, IOError, io.UnsupportedOperation):
+        pass
+    else:
+        return size - position
+
+    try:
+        position = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        end = fileobj.tell()
+        fileobj.seek(position)
+    except (AttributeError, OSError, IOError, io.UnsupportedOperation):
+        return None
+
+    return end - position
+
+
+def iter_file(fileobj, chunk_size=CHUNK_SIZE):
+    """Yields the content of a file-like object in chunks of at most chunk_size bytes."""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def sha1_of(path, chunk_size=CHUNK_SIZE, use_mmap=False):
+    """Returns the sha1 hash object of the content of a file, read in chunks.
+
+    With use_mmap the file is mapped and hashed in one call instead, its pages are read by the kernel and never
+    copied to Python objects (files which can't be mapped, empty ones, pipes, ... are read in chunks).
+    """
+    hasher = hashlib.sha1()
+    with open(path, 'rb') as f:
+        if use_mmap:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, EnvironmentError):
+                mapped = None
+            if mapped is not None:
+                try:
+                    hasher.update(mapped)
+                finally:
+                    mapped.close()
+                return hasher
+
+        for chunk in iter_file(f, chunk_size):
+            hasher.update(chunk)
+    return hasher
+
+
+def multipart_stream(field_name, file_name, chunks, hasher=None, callback=None):
+    """Builds a multipart/form-data body from an iterable of bytes, without knowing its length in advance.
+
+    Args:
+        field_name (str): name of the form field.
+        file_name (str): name of the uploaded file.
+        chunks (iterable): bytes of the file.
+        hasher (:obj:`object`, optional): hashlib object fed with the file bytes as they are sent.
+        callback (:obj:`callable`, optional): called with the number of file bytes of each sent chunk.
+
+    Returns:
+        tuple: (content type header, generator of body chunks), to be sent with chunked transfer encoding.
+
+    """
+    boundary = uuid.uuid4().hex
+    file_name = file_name.replace('\\', '\\\\').replace('"', '\\"')
+    head = ('--{boundary}\r\n'
+            'Content-Disposition: form-data; name="{field}"; filename="{name}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n').format(boundary=boundary, field=field_name,
+                                                                     name=file_name).encode('utf-8')
+    tail = '\r\n--{boundary}--\r\n'.format(boundary=boundary).encode('utf-8')
+
+    def body():
+        yield head
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if hasher is not None:
+                hasher.update(chunk)
+            yield chunk
+            if callback is not None:
+                callback(len(chunk))
+        yield tail
+
+    return 'multipart/form-data; boundary={boundary}'.format(boundary=boundary), body()
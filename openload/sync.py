@@ -0,0 +1,181 @@
+from __future__ import absolute_import
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .index import HOME
+
+
+class SyncAction(object):
+    """Change made (or to be made) by :func:`sync` to the remote tree.
+
+    Kinds:
+        ``upload``: upload the local file at path to folder_id.
+        ``replace``: upload the local file at path, then delete the outdated remote file_id of the same name.
+        ``rename``: rename the remote file_id (same content as the local file) to name.
+        ``delete``: delete the remote file_id, which has no local counterpart.
+        ``missing_folder``: the local directory at path has no remote folder, the api can't create folders.
+
+    Attributes:
+        kind (str): one of the kinds above.
+        path (str): local file (or directory) path.
+        folder_id (str): id of the remote folder (``home`` for ``Home`` folder).
+        file_id (str): id of the remote file renamed, deleted or replaced.
+        name (str): name of the file.
+        result (object): result of the api call, None in dry run or if it failed.
+        error (Exception): exception raised by the api call.
+
+    """
+
+    __slots__ = ('kind', 'path', 'folder_id', 'file_id', 'name', 'result', 'error')
+
+    def __init__(self, kind, path=None, folder_id=None, file_id=None, name=None):
+        self.kind = kind
+        self.path = path
+        self.folder_id = folder_id
+        self.file_id = file_id
+        self.name = name
+        self.result = None
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return '<SyncAction {kind} {path!r} {file_id!r}>'.format(kind=self.kind, path=self.path, file_id=self.file_id)
+
+
+def sync(index, local_dir, folder_id=None, delete=False, dry_run=False, max_age=3600, workers=4):
+    """Makes a remote folder tree mirror a local directory tree.
+
+    The remote tree is read from the index, refreshed first (folders refreshed less than max_age seconds ago
+    are not listed again). Local files are compared with the remote files of the same name by size, then sha1;
+    local sha1s are remembered by the index until the size or modification time of a file change.
+    So a run with nothing changed stats every local file but makes no api call and hashes nothing.
+
+    Remote files with the content of a local file missing remotely are renamed instead of uploading the file again.
+    Changed files are uploaded, then their outdated remote version is deleted. Other remote files without local
+    counterpart are deleted only if delete is set. Actions are carried out by workers threads, the index is
+    updated with their results.
+
+    Args:
+        index (:obj:`openload.index.AccountIndex`): index of the account, keeps the state between runs.
+        local_dir (str): path of the local directory.
+        folder_id (:obj:`str`, optional): id of the remote folder, ``Home`` folder if not provided.
+        delete (:obj:`bool`, optional): If this is set to true, delete remote files missing locally.
+        dry_run (:obj:`bool`, optional): If this is set to true, only compute the actions.
+        max_age (:obj:`float`, optional): see :meth:`AccountIndex.refresh`, 0 lists the whole remote tree.
+        workers (:obj:`int`, optional): number of actions carried out at the same time.
+
+    Returns:
+        list: :class:`SyncAction` computed (and carried out unless dry_run).
+
+    """
+    folder_key = folder_id or HOME
+    index.refresh(folder_id, max_age=max_age, workers=workers)
+    actions = list(diff(index, local_dir, folder_key, delete=delete))
+
+    if dry_run:
+        return actions
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for action, future in [(action, executor.submit(_apply, index, action)) for action in actions]:
+            try:
+                action.result = future.result()
+            except Exception as e:
+                action.error = e
+    finally:
+        executor.shutdown(wait=True)
+
+    return actions
+
+
+def diff(index, local_dir, folder_id=HOME, delete=False):
+    """Yields the :class:`SyncAction` making the indexed folder_id tree mirror local_dir (see :func:`sync`)."""
+    folders = index.subfolders(folder_id)
+    # The state of the sync (sqlite file and its journals) may live in the synced directory.
+    state_prefix = os.path.abspath(index.path) if index.path != ':memory:' else None
+
+    for directory, subdirectories, file_names in os.walk(local_dir):
+        relative = os.path.relpath(directory, local_dir).replace(os.sep, '/')
+        relative = '' if relative == '.' else relative
+
+        remote_folder = folders.get(relative)
+        if remote_folder is None:
+            yield SyncAction('missing_folder', path=directory)
+            del subdirectories[:]
+            continue
+
+        if state_prefix is not None:
+            file_names = [name for name in file_names
+                          if not os.path.abspath(os.path.join(directory, name)).startswith(state_prefix)]
+
+        for action in _diff_folder(index, directory, sorted(file_names), remote_folder, delete):
+            yield action
+
+
+def _diff_folder(index, directory, file_names, folder_id, delete):
+    remote_files = index.find(folder_id=folder_id)
+    remote_by_name = dict((f.get('name'), f) for f in remote_files)
+    unmatched = dict((f['linkextid'], f) for f in remote_files)
+    changed = []
+
+    for name in file_names:
+        path = os.path.join(directory, name)
+        remote = remote_by_name.get(name)
+        if (remote is not None and int(remote.get('size') or 0) == os.path.getsize(path) and
+                remote.get('sha1') == index.local_sha1(path)):
+            unmatched.pop(remote['linkextid'], None)
+        else:
+            changed.append((name, path, remote))
+
+    local_names = set(file_names)
+    for name, path, remote in changed:
+        if remote is not None:
+            yield SyncAction('replace', path=path, folder_id=folder_id, file_id=remote['linkextid'], name=name)
+            unmatched.pop(remote['linkextid'], None)
+            continue
+
+        # Only files of the same size may have the same content, new files are not hashed otherwise.
+        size = os.path.getsize(path)
+        candidates = [f for f in unmatched.values()
+                      if f.get('name') not in local_names and int(f.get('size') or 0) == size]
+        sha1 = index.local_sha1(path) if candidates else None
+        moved = [f for f in candidates if f.get('sha1') == sha1]
+        if moved:
+            yield SyncAction('rename', path=path, folder_id=folder_id, file_id=moved[0]['linkextid'], name=name)
+            unmatched.pop(moved[0]['linkextid'])
+        else:
+            yield SyncAction('upload', path=path, folder_id=folder_id, name=name)
+
+    if delete:
+        for f in unmatched.values():
+            if f.get('name') not in local_names:
+                yield SyncAction('delete', folder_id=folder_id, file_id=f['linkextid'], name=f.get('name'))
+
+
+def _apply(index, action):
+    ol = index.ol
+    folder_id = None if action.folder_id == HOME else action.folder_id
+
+    if action.kind in ('upload', 'replace'):
+        result = ol.upload_file(action.path, folder_id=folder_id)
+        index._add_upload(action.folder_id, result)
+        if action.kind == 'replace':
+            ol.delete_file(action.file_id)
+            index.remove_file(action.file_id)
+        return result
+
+    if action.kind == 'rename':
+        result = ol.rename_file(action.file_id, action.name)
+        index.add_file(action.folder_id, dict(index.get(action.file_id), name=action.name))
+        return result
+
+    if action.kind == 'delete':
+        result = ol.delete_file(action.file_id)
+        index.remove_file(action.file_id)
+        return result
+
+    return None
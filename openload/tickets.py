@@ -0,0 +1,179 @@
+from __future__ import absolute_import
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .api_exceptions import CaptchaRequiredException
+from .models import untyped
+from .ratelimit import clock
+from .upload_pool import parse_api_time
+
+
+class LinkResult(object):
+    """Download link of one file requested by :class:`TicketScheduler`.
+
+    Attributes:
+        file_id (str): id of the file.
+        link (dict): :meth:`OpenLoad.get_download_link` result, None if it failed.
+        error (Exception): exception raised by prepare_download, the captcha solver or get_download_link.
+
+    """
+
+    __slots__ = ('file_id', 'link', 'error')
+
+    def __init__(self, file_id, link=None, error=None):
+        self.file_id = file_id
+        self.link = link
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = 'ok' if self.ok else repr(self.error)
+        return '<LinkResult {file_id!r} {status}>'.format(file_id=self.file_id, status=status)
+
+
+class _Ticket(object):
+    __slots__ = ('file_id', 'attempt', 'ticket', 'captcha_response', 'error', 'expires_at')
+
+    def __init__(self, file_id, attempt):
+        self.file_id = file_id
+        self.attempt = attempt
+        self.ticket = None
+        self.captcha_response = None
+        self.error = None
+        self.expires_at = None
+
+
+class TicketScheduler(object):
+    """Requests the download tickets of many files up front and gets each download link as soon as
+    the wait_time of its ticket is over, so the waits of all files overlap.
+
+    Tickets are kept in a priority queue ordered by the time they are ready. Tickets with a captcha are
+    solved by a pool of captcha_workers threads first, their wait_time passes meanwhile.
+    A ticket found past its valid_until is requested again (up to max_ticket_attempts tickets per file).
+
+    Args:
+        ol (OpenLoad): client used for the api calls.
+        captcha_solver (:obj:`callable`, optional): called with the prepare_download result of tickets
+                                                    having a captcha_url, returns the captcha solution.
+        captcha_workers (:obj:`int`, optional): number of captchas solved at the same time.
+        ticket_workers (:obj:`int`, optional): number of prepare_download calls made at the same time.
+        max_ticket_attempts (:obj:`int`, optional): maximum number of tickets requested per file.
+
+    """
+
+    def __init__(self, ol, captcha_solver=None, captcha_workers=1, ticket_workers=4, max_ticket_attempts=2):
+        self.ol = ol
+        self.captcha_solver = captcha_solver
+        self.captcha_workers = captcha_workers
+        self.ticket_workers = ticket_workers
+        self.max_ticket_attempts = max_ticket_attempts
+
+    def links(self, file_ids):
+        """Gets the download links of many files, yielding them in the order they are ready.
+
+        Args:
+            file_ids (iterable): ids of the files to be downloaded.
+
+        Returns:
+            generator: :class:`LinkResult` of every file.
+
+        """
+        file_ids = list(file_ids)
+        if not file_ids:
+            return
+
+        run = _Run(self)
+        try:
+            for file_id in file_ids:
+                run.request_ticket(_Ticket(file_id, attempt=1))
+
+            for _ in file_ids:
+                yield run.next_result()
+        finally:
+            run.close()
+
+
+class _Run(object):
+    """State of one :meth:`TicketScheduler.links` call."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.ol = scheduler.ol
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._tickets = ThreadPoolExecutor(max_workers=scheduler.ticket_workers)
+        self._captchas = ThreadPoolExecutor(max_workers=scheduler.captcha_workers)
+
+    def close(self):
+        for executor in (self._tickets, self._captchas):
+            executor.shutdown(wait=False)
+
+    def request_ticket(self, entry):
+        self._tickets.submit(self._prepare, entry)
+
+    def _push(self, ready_at, entry):
+        with self._condition:
+            heapq.heappush(self._queue, (ready_at, next(self._counter), entry))
+            self._condition.notify()
+
+    def _prepare(self, entry):
+        try:
+            ticket = untyped(self.ol).prepare_download(entry.file_id)
+        except Exception as e:
+            entry.error = e
+            self._push(0, entry)
+            return
+
+        entry.ticket = ticket
+        entry.expires_at = parse_api_time(ticket.get('valid_until'))
+        ready_at = clock() + (ticket.get('wait_time') or 0)
+
+        if not ticket.get('captcha_url'):
+            self._push(ready_at, entry)
+        elif self.scheduler.captcha_solver is None:
+            entry.error = CaptchaRequiredException('download of {0} requires a captcha_solver'.format(entry.file_id))
+            self._push(0, entry)
+        else:
+            self._captchas.submit(self._solve, entry, ready_at)
+
+    def _solve(self, entry, ready_at):
+        try:
+            entry.captcha_response = self.scheduler.captcha_solver(entry.ticket)
+        except Exception as e:
+            entry.error = e
+            ready_at = 0
+        self._push(ready_at, entry)
+
+    def _pop_ready(self):
+        with self._condition:
+            while True:
+                now = clock()
+                if self._queue and self._queue[0][0] <= now:
+                    return heapq.heappop(self._queue)[2]
+                self._condition.wait(self._queue[0][0] - now if self._queue else None)
+
+    def next_result(self):
+        while True:
+            entry = self._pop_ready()
+            if entry.error is not None:
+                return LinkResult(entry.file_id, error=entry.error)
+
+            expired = entry.expires_at is not None and entry.expires_at <= time.time()
+            if expired and entry.attempt < self.scheduler.max_ticket_attempts:
+                self.request_ticket(_Ticket(entry.file_id, entry.attempt + 1))
+                continue
+
+            try:
+                link = untyped(self.ol).get_download_link(entry.file_id, entry.ticket['ticket'],
+                                                          entry.captcha_response)
+            except Exception as e:
+                return LinkResult(entry.file_id, error=e)
+            return LinkResult(entry.file_id, link=link)
@@ -0,0 +1,166 @@
+from __future__ import absolute_import
+
+import calendar
+import collections
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_api_time(value):
+    """Converts a date returned by the api (``2017-08-19 19:06:46``, UTC) to a timestamp.
+
+    Args:
+        value (str): api date.
+
+    Returns:
+        float: seconds since epoch, None if value is not a date.
+
+    """
+    try:
+        return float(calendar.timegm(time.strptime(value, '%Y-%m-%d %H:%M:%S')))
+    except (TypeError, ValueError):
+        return None
+
+
+class UploadLinkPool(object):
+    """Keeps upload links ready for each (folder_id, httponly), so uploads don't wait for ``file/ul`` round trips.
+
+    Taking a link triggers a background refill of its (folder_id, httponly) pool up to ``size`` links.
+    Links are thrown away ``margin`` seconds before their ``valid_until`` (and after ``max_age`` seconds if set).
+    When no link is ready, the caller waits for a refill in flight or fetches one itself.
+
+    Note:
+        Links are single use, a link is never handed out twice. Links generated with an expected sha1
+        are bound to a single file and are not pooled.
+
+    Args:
+        fetch (callable): takes (folder_id, httponly), returns an ``upload_link`` result (url, valid_until).
+        size (:obj:`int`, optional): number of links kept ready per (folder_id, httponly).
+        margin (:obj:`float`, optional): seconds before valid_until a link is considered expired.
+        max_age (:obj:`float`, optional): seconds after which a link is considered expired, whatever its valid_until.
+        workers (:obj:`int`, optional): maximum number of links fetched at the same time.
+
+    """
+
+    def __init__(self, fetch, size=4, margin=60.0, max_age=None, workers=2):
+        self.fetch = fetch
+        self.size = size
+        self.margin = margin
+        self.max_age = max_age
+
+        self._links = collections.defaultdict(collections.deque)
+        self._pending = collections.defaultdict(int)
+        self._failures = collections.defaultdict(int)
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def ready(self, folder_id=None, httponly=False):
+        """Returns the number of unexpired links ready for (folder_id, httponly)."""
+        key = (folder_id, bool(httponly))
+        with self._condition:
+            self._discard_expired(key)
+            return len(self._links[key])
+
+    def get(self, folder_id=None, httponly=False):
+        """Takes a fresh upload link.
+
+        Args:
+            folder_id (:obj:`str`, optional): folder-ID to upload to.
+            httponly (:obj:`bool`, optional): If this is set to true, use only http upload links.
+
+        Returns:
+            str: upload url.
+
+        """
+        key = (folder_id, bool(httponly))
+
+        with self._condition:
+            failures = self._failures[key]
+
+            while True:
+                if self._closed:
+                    raise RuntimeError('upload link pool is closed')
+
+                self._discard_expired(key)
+                links = self._links[key]
+
+                if links:
+                    url, _ = links.popleft()
+                    self._refill(key)
+                    return url
+
+                if self._failures[key] != failures:
+                    break
+
+                self._refill(key)
+                if not self._pending[key]:
+                    break
+
+                self._condition.wait()
+
+        # No refill in flight (or one failed), fetching the link here raises any error to the caller.
+        url, _ = self._fetch(key)
+        return url
+
+    def close(self):
+        """Stops refilling, links ready are dropped.
+
+        Returns:
+            None
+
+        """
+        with self._condition:
+            self._closed = True
+            self._links.clear()
+            self._condition.notify_all()
+
+        self._executor.shutdown(wait=False)
+
+    def _fetch(self, key):
+        folder_id, httponly = key
+        fetched_at = time.time()
+        link = self.fetch(folder_id, httponly)
+
+        expires_at = parse_api_time(link.get('valid_until'))
+        expires_at = expires_at - self.margin if expires_at is not None else float('inf')
+        if self.max_age is not None:
+            expires_at = min(expires_at, fetched_at + self.max_age)
+
+        return link['url'], expires_at
+
+    def _discard_expired(self, key):
+        links = self._links[key]
+        now = time.time()
+        while links and links[0][1] <= now:
+            links.popleft()
+
+    def _refill(self, key):
+        missing = self.size - len(self._links[key]) - self._pending[key]
+        for _ in range(max(0, missing)):
+            self._pending[key] += 1
+            self._executor.submit(self._fill, key)
+
+    def _fill(self, key):
+        try:
+            link = self._fetch(key)
+        except Exception:
+            link = None
+
+        with self._condition:
+            self._pending[key] -= 1
+            # A link already expired when it arrives (clock skew, margin too large) counts as a failure,
+            # so that waiting callers fetch their own link instead of refilling forever.
+            if link is None or link[1] <= time.time():
+                self._failures[key] += 1
+            elif not self._closed:
+                self._links[key].append(link)
+            self._condition.notify_all()
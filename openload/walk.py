@@ -0,0 +1,91 @@
+from __future__ import absolute_import
+
+import fnmatch
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .models import untyped
+from .streaming import string_types
+
+
+def name_filter(pattern):
+    """Returns a filter of folders/files (dicts) by name, pattern is either a callable or an fnmatch pattern."""
+    if pattern is None or callable(pattern):
+        return pattern
+
+    if isinstance(pattern, string_types):
+        pattern = [pattern]
+    patterns = list(pattern)
+    return lambda item: any(fnmatch.fnmatch(item.get('name') or '', p) for p in patterns)
+
+
+def walk(ol, folder_id=None, max_depth=None, folder_filter=None, file_filter=None, workers=4, onerror=None,
+         list_folder=None):
+    """Walks a folder tree like :func:`os.walk`, listing up to ``workers`` folders at the same time.
+
+    Each folder is yielded as soon as its listing arrives, with its subfolders and files.
+    Folders are walked depth first and listed only as the generator is consumed,
+    so memory use depends on the depth of the tree, not on its size.
+
+    Folders yielded are dicts with ``id``, ``name``, ``path`` (names from the walked folder, joined by ``/``)
+    and ``depth`` (0 for the walked folder). Subfolders are the same dicts, files are the dicts of list_folder.
+
+    Args:
+        ol (OpenLoad): client used for the list_folder calls.
+        folder_id (:obj:`str`, optional): id of the folder to walk, ``Home`` folder if not provided.
+        max_depth (:obj:`int`, optional): depth of the last folders listed, 0 lists only the walked folder.
+        folder_filter (:obj:`callable` or :obj:`str`, optional): folders (and their subtrees) are skipped unless
+                                                                 it returns True for them, fnmatch pattern(s)
+                                                                 of folder names are accepted too.
+        file_filter (:obj:`callable` or :obj:`str`, optional): same as folder_filter, for files.
+        workers (:obj:`int`, optional): maximum number of folders listed at the same time.
+        onerror (:obj:`callable`, optional): called with (folder, exception) when listing a folder fails,
+                                             the walk goes on. Errors are raised if not provided.
+        list_folder (:obj:`callable`, optional): called with a folder id instead of ``ol.list_folder``.
+
+    Returns:
+        generator: (folder, subfolders, files) of every folder walked.
+
+    """
+    list_folder = list_folder or untyped(ol).list_folder
+    folder_filter = name_filter(folder_filter)
+    file_filter = name_filter(file_filter)
+
+    stack = [{'id': folder_id, 'name': None, 'path': '', 'depth': 0}]
+    in_flight = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        while stack or in_flight:
+            while stack and len(in_flight) < workers:
+                folder = stack.pop()
+                in_flight[executor.submit(list_folder, folder['id'])] = folder
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if onerror is None:
+                        raise
+                    onerror(folder, e)
+                    continue
+
+                subfolders = [dict(subfolder, depth=folder['depth'] + 1,
+                                   path='/'.join(filter(None, [folder['path'], subfolder.get('name')])))
+                              for subfolder in result.get('folders') or []]
+                if folder_filter is not None:
+                    subfolders = [subfolder for subfolder in subfolders if folder_filter(subfolder)]
+
+                files = result.get('files') or []
+                if file_filter is not None:
+                    files = [f for f in files if file_filter(f)]
+
+                if max_depth is None or folder['depth'] < max_depth:
+                    stack.extend(reversed(subfolders))
+
+                yield folder, subfolders, files
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
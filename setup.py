@@ -32,6 +32,10 @@ setup(
         'Programming Language :: Python :: 3.7',
     ],
     keywords=['openload', 'wrapper', 'api', 'api client'],
-    packages=find_packages(exclude=['docs', 'tests*']),
-    install_requires=['requests>=2.20.0', 'requests-toolbelt==0.9.1'],
+    packages=find_packages(exclude=['docs', 'tests*', 'benchmarks*']),
+    install_requires=['requests>=2.20.0', 'requests-toolbelt==0.9.1', 'futures>=3.0; python_version < "3"'],
+    extras_require={
+        'async': ['aiohttp>=3.3; python_version >= "3.5"'],
+        'speedups': ['orjson; python_version >= "3.6"'],
+    },
 )
@@ -0,0 +1,6 @@
+import sys
+
+# AsyncOpenLoad (async def) needs Python 3.5+, its tests can't even be imported before.
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_async_openload.py')
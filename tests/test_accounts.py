@@ -0,0 +1,135 @@
+import collections
+import os
+import shutil
+import tempfile
+import unittest
+
+from openload import OpenLoadPool
+from openload.api_exceptions import BandwidthUsageExceeded, NoAccountAvailableException
+from openload.ratelimit import clock
+from openload.retry import RetryPolicy
+from benchmarks.stub_server import DEFAULT_RESULTS, StubServer
+
+
+class TestOpenLoadPool(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+        self.quotas = {}
+        self.server.set_result('account/info', self.account_info)
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def account_info(self, params):
+        traffic_left, storage_left = self.quotas.get(params['login'], (-1, -1))
+        return dict(DEFAULT_RESULTS['account/info'], storage_left=storage_left,
+                    traffic={'left': traffic_left, 'used_24h': 0})
+
+    def pool(self, logins, **options):
+        pool = OpenLoadPool([(login, 'key') for login in logins], **options)
+        for account in pool.accounts:
+            account.client.api_url = self.server.api_url
+        self.addCleanup(pool.close)
+        return pool
+
+    def logins(self, endpoint):
+        return [params['login'] for _, requested, params in self.server.requests if requested == endpoint]
+
+    def write(self, name, size):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        return path
+
+    def test_routes_by_quota_left(self):
+        self.quotas = {'a': (1000, 10 ** 9), 'b': (10 ** 9, 1000)}
+        pool = self.pool(['a', 'b'])
+
+        pool.file_info('f1')
+        login, result = pool.upload_file(self.write('file.bin', 100))
+
+        self.assertEqual(self.logins('file/info'), ['b'])
+        self.assertEqual((login, result['name']), ('a', 'file.bin'))
+        self.assertEqual(pool.accounts[0].storage_left, 10 ** 9 - 100)
+        self.assertEqual(sorted(self.logins('account/info')), ['a', 'b'])
+
+    def test_spreads_calls_of_equal_accounts(self):
+        pool = self.pool(['a', 'b', 'c'])
+
+        for file_id in range(6):
+            pool.file_info(str(file_id))
+
+        self.assertEqual(collections.Counter(self.logins('file/info')), {'a': 2, 'b': 2, 'c': 2})
+        self.assertEqual(self.server.count('account/info'), 3)
+
+    def test_throttled_account_is_benched(self):
+        pool = self.pool(['a', 'b'], cooldown=60.0)
+        self.server.fail('file/info', times=1, status=429, msg='Too Many Requests')
+
+        self.assertEqual(list(pool.file_info('f1')), ['f1'])
+        pool.file_info('f2')
+        pool.file_info('f3')
+
+        self.assertEqual(self.logins('file/info'), ['a', 'b', 'b', 'b'])
+        self.assertGreater(pool.accounts[0].benched_until, pool.accounts[1].benched_until)
+
+    def test_throttled_call_is_not_retried_by_the_account(self):
+        policy = RetryPolicy(backoff=0.5, jitter=False)
+        pool = self.pool(['a', 'b'], retry_policy=policy)
+        self.server.fail('file/info', times=1, status=429, msg='Too Many Requests')
+        started = clock()
+
+        pool.file_info('f1')
+
+        self.assertEqual(self.logins('file/info'), ['a', 'b'])
+        self.assertLess(clock() - started, 0.5)
+        self.assertTrue(policy.retry_throttled)
+        self.assertFalse(pool.accounts[0].client.retry_policy.retry_throttled)
+
+    def test_all_accounts_out_of_bandwidth(self):
+        pool = self.pool(['a', 'b'])
+        self.server.fail('file/info', times=2, status=509, msg='Bandwidth usage exceeded')
+
+        self.assertRaises(BandwidthUsageExceeded, pool.file_info, 'f1')
+        self.assertRaises(NoAccountAvailableException, pool.file_info, 'f1')
+        self.assertEqual(self.server.count('file/info'), 2)
+
+    def test_upload_many_uses_every_account(self):
+        self.server.latency = 0.01
+        pool = self.pool(['a', 'b', 'c'])
+        paths = [self.write('file{0}.bin'.format(i), 1000) for i in range(12)]
+
+        results = list(pool.upload_many(paths, workers_per_account=2))
+
+        self.assertTrue(all(upload.ok for upload in results))
+        self.assertEqual(sorted(upload.path for upload in results), sorted(paths))
+        self.assertEqual(set(upload.account for upload in results), {'a', 'b', 'c'})
+        self.assertEqual(sorted(set(self.logins('file/ul'))), ['a', 'b', 'c'])
+
+    def test_upload_many_missing_file(self):
+        pool = self.pool(['a', 'b'])
+        paths = [self.write('file{0}.bin'.format(i), 1000) for i in range(4)]
+        missing = os.path.join(self.directory, 'missing.bin')
+
+        results = list(pool.upload_many(paths + [missing]))
+        failures = [upload for upload in results if not upload.ok]
+
+        self.assertEqual(len(results), len(paths) + 1)
+        self.assertEqual([upload.path for upload in failures], [missing])
+        self.assertIsInstance(failures[0].error, OSError)
+        self.assertEqual(len(self.server.uploads), len(paths))
+
+    def test_client(self):
+        pool = self.pool(['a', 'b'])
+
+        self.assertEqual(pool.client('b').login, 'b')
+        self.assertRaises(KeyError, pool.client, 'c')
+        self.assertRaises(ValueError, OpenLoadPool, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
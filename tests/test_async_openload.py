@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import io
+import os
+import unittest
+
+import openload
+from openload.api_exceptions import FileNotFoundException
+from openload.async_openload import aiohttp
+from openload.metrics import Metrics
+from openload.retry import CircuitBreaker, RetryPolicy
+from benchmarks.stub_server import StubServer
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestAsyncOpenLoad(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.loop = asyncio.new_event_loop()
+
+        self.file_path = os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), 'file.txt')
+
+    def tearDown(self):
+        self.loop.close()
+        self.server.stop()
+
+    def run_with_client(self, coroutine_function, **kwargs):
+        async def run():
+            async with openload.AsyncOpenLoad('login', 'key', **kwargs) as ol:
+                ol.api_url = self.server.api_url
+                return await coroutine_function(ol)
+
+        return self.loop.run_until_complete(run())
+
+    def test_account_info(self):
+        account_info = self.run_with_client(lambda ol: ol.account_info())
+
+        self.assertIsInstance(account_info, dict)
+        self.assertIn('traffic', account_info)
+        self.assertEqual(self.server.requests[0][2]['login'], 'login')
+
+    def test_concurrent_calls_share_connections(self):
+        async def fan_out(ol):
+            return await asyncio.gather(*(ol.file_info(str(i)) for i in range(50)))
+
+        self.server.latency = 0.01
+        infos = self.run_with_client(fan_out, limit=10)
+
+        self.assertEqual([list(info) for info in infos], [[str(i)] for i in range(50)])
+        self.assertLessEqual(self.server.connections, 10)
+
+    def test_max_concurrency(self):
+        async def fan_out(ol):
+            return await asyncio.gather(*(ol.remote_upload_status(remote_upload_id=str(i)) for i in range(20)))
+
+        self.server.latency = 0.02
+        self.run_with_client(fan_out, max_concurrency=4)
+
+        self.assertEqual(self.server.max_in_flight, 4)
+
+    def test_file_info_many(self):
+        file_ids = [str(i) for i in range(75)] * 2
+        files, errors = self.run_with_client(lambda ol: ol.file_info_many(file_ids))
+
+        self.assertEqual(len(files), 75)
+        self.assertEqual(errors, {})
+        self.assertEqual(self.server.count('file/info'), 2)
+
+    def test_file_info_many_max_workers(self):
+        self.server.latency = 0.02
+        files, errors = self.run_with_client(lambda ol: ol.file_info_many([str(i) for i in range(250)],
+                                                                          max_workers=2))
+
+        self.assertEqual(len(files), 250)
+        self.assertEqual(self.server.count('file/info'), 5)
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    def test_check_status(self):
+        self.server.set_result('file/getsplash', None, status=404, msg='File not found')
+
+        with self.assertRaises(FileNotFoundException):
+            self.run_with_client(lambda ol: ol.splash_image('missing'))
+
+    def test_upload_file(self):
+        file_info = self.run_with_client(lambda ol: ol.upload_file(self.file_path, httponly=True))
+
+        with open(self.file_path, 'rb') as f:
+            self.assertEqual(self.server.uploads, [('file.txt', f.read())])
+
+        self.assertEqual(file_info.get('name'), 'file.txt')
+        self.assertEqual(self.server.requests[0][2]['httponly'], 'True')
+
+    def test_upload_file_options(self):
+        sent = []
+        data = b'x' * 200000
+        file_info = self.run_with_client(lambda ol: ol.upload_file(io.BytesIO(data), file_name='data.bin',
+                                                                   verify_sha1=True, callback=sent.append))
+
+        self.assertEqual(self.server.uploads, [('data.bin', data)])
+        self.assertEqual(file_info['sha1'], hashlib.sha1(data).hexdigest())
+        self.assertEqual(sum(sent), len(data))
+
+    def test_upload_file_from_iterable(self):
+        self.run_with_client(lambda ol: ol.upload_file(iter([b'ab', b'', b'cd']), file_name='chunks.bin'))
+
+        self.assertEqual(self.server.uploads, [('chunks.bin', b'abcd')])
+
+    def test_upload_file_retries_and_hooks(self):
+        metrics = Metrics()
+        self.server.fail('upload')
+
+        file_info = self.run_with_client(lambda ol: ol.upload_file(self.file_path), hooks=metrics,
+                                         retry_policy=RetryPolicy(backoff=0.001, unsafe_endpoints=['upload']),
+                                         circuit_breaker=CircuitBreaker(failure_threshold=5))
+
+        self.assertEqual(file_info.get('name'), 'file.txt')
+        self.assertEqual(self.server.count('upload'), 2)
+        stats = metrics.stats()
+        self.assertEqual(stats['retries_total'], {('upload',): 1})
+        self.assertEqual(stats['sent_bytes_total'][('upload',)], 2 * os.path.getsize(self.file_path))
+
+    def test_sync_helpers_are_rejected(self):
+        ol = openload.AsyncOpenLoad('login', 'key')
+
+        for call in (lambda: ol.walk(), lambda: ol.iter_list_folder(), lambda: ol.download('id', 'dest'),
+                     lambda: ol.upload_many([self.file_path]), lambda: ol.sync('.')):
+            with self.assertRaisesRegex(TypeError, 'use it on an OpenLoad instance'):
+                call()
+
+    def test_sync_context_manager_is_rejected(self):
+        ol = openload.AsyncOpenLoad('login', 'key')
+
+        with self.assertRaises(TypeError):
+            with ol:
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
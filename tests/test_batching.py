@@ -0,0 +1,115 @@
+import threading
+import unittest
+
+import openload
+from openload.api_exceptions import FileNotFoundException, ServerErrorException
+from openload.batching import FileInfoBatcher
+from benchmarks.stub_server import StubServer, file_info_result
+
+
+def file_info_with_errors(params):
+    result = file_info_result(params)
+    for file_id, info in result.items():
+        if file_id.startswith('missing'):
+            info['status'] = 404
+        elif file_id.startswith('broken'):
+            info['status'] = 500
+    return result
+
+
+class TestFileInfoMany(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def requested_ids(self):
+        return [params['file'].split(',') for _, endpoint, params in self.server.requests if endpoint == 'file/info']
+
+    def test_chunks_and_merges(self):
+        file_ids = ['id{0}'.format(i) for i in range(120)]
+        files, errors = self.ol.file_info_many(file_ids)
+
+        self.assertEqual(sorted(files), sorted(file_ids))
+        self.assertEqual(errors, {})
+        self.assertEqual(sorted(len(chunk) for chunk in self.requested_ids()), [20, 50, 50])
+
+    def test_duplicates_are_requested_once(self):
+        files, _ = self.ol.file_info_many(['a', 'b', 'a', 'c', 'b'])
+
+        self.assertEqual(sorted(files), ['a', 'b', 'c'])
+        self.assertEqual(self.requested_ids(), [['a', 'b', 'c']])
+
+    def test_file_errors_do_not_fail_batch(self):
+        self.server.set_result('file/info', file_info_with_errors)
+        files, errors = self.ol.file_info_many(['ok', 'missing', 'broken'])
+
+        self.assertEqual(list(files), ['ok'])
+        self.assertIsInstance(errors['missing'], FileNotFoundException)
+        self.assertIsInstance(errors['broken'], ServerErrorException)
+
+    def test_empty(self):
+        self.assertEqual(self.ol.file_info_many([]), ({}, {}))
+        self.assertEqual(self.server.requests, [])
+
+
+class TestFileInfoBatcher(unittest.TestCase):
+    def test_concurrent_calls_are_coalesced(self):
+        calls = []
+
+        def fetch(file_ids):
+            calls.append(sorted(file_ids))
+            return dict((file_id, {'id': file_id}) for file_id in file_ids)
+
+        batcher = FileInfoBatcher(fetch, window=0.2)
+        results = {}
+
+        def lookup(file_id):
+            results[file_id] = batcher.file_info(file_id)
+
+        threads = [threading.Thread(target=lookup, args=(str(i),)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [sorted(str(i) for i in range(10))])
+        self.assertEqual(results['3'], {'3': {'id': '3'}})
+
+    def test_full_batch_is_sent_without_waiting(self):
+        calls = []
+        batcher = FileInfoBatcher(lambda file_ids: calls.append(file_ids) or {}, window=60, max_ids=1)
+
+        self.assertEqual(batcher.file_info('a'), {})
+        self.assertEqual(calls, [['a']])
+
+    def test_errors_reach_every_caller(self):
+        def fetch(file_ids):
+            raise ServerErrorException('down')
+
+        batcher = FileInfoBatcher(fetch, window=0)
+        self.assertRaises(ServerErrorException, batcher.file_info, 'a')
+
+    def test_transparent_mode(self):
+        with StubServer() as server:
+            with openload.OpenLoad('login', 'key', file_info_batch_window=0.2) as ol:
+                ol.api_url = server.api_url
+
+                threads = [threading.Thread(target=ol.file_info, args=(str(i),)) for i in range(5)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+                self.assertIn('x', ol.file_info('x'))
+                self.assertEqual(server.count('file/info'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
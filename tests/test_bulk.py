@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import openload
+from openload.api_exceptions import ServerErrorException
+from benchmarks.stub_server import StubServer
+
+
+class TestUploadMany(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(latency=0.01)
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key', pool_maxsize=8)
+        self.ol.api_url = self.server.api_url
+
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(12):
+            path = os.path.join(self.directory, 'file{0}.bin'.format(i))
+            with open(path, 'wb') as f:
+                f.write(os.urandom(1000 + i))
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def test_uploads_every_file(self):
+        results = list(self.ol.upload_many(self.paths, folder_id='4258', workers=4, verify_sha1=True))
+
+        self.assertEqual(sorted(result.path for result in results), sorted(self.paths))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(sorted(name for name, _ in self.server.uploads),
+                         sorted(os.path.basename(path) for path in self.paths))
+        # Each link taken triggers a refill, a few links may be left unused at the end of the batch.
+        self.assertGreaterEqual(self.server.count('file/ul'), len(self.paths))
+        self.assertLessEqual(self.server.count('file/ul'), len(self.paths) + 4)
+        self.assertTrue(all(params['folder'] == '4258' for _, endpoint, params in self.server.requests
+                            if endpoint == 'file/ul'))
+
+    def test_uploads_are_concurrent(self):
+        self.server.latency = 0.05
+        list(self.ol.upload_many(self.paths, workers=6))
+
+        self.assertGreaterEqual(self.server.max_in_flight, 6)
+
+    def test_failures_do_not_stop_batch(self):
+        self.server.fail('upload', times=2)
+        results = list(self.ol.upload_many(self.paths, workers=1))
+        failures = [result for result in results if not result.ok]
+
+        self.assertEqual(len(results), len(self.paths))
+        self.assertEqual(len(failures), 2)
+        self.assertIsInstance(failures[0].error, ServerErrorException)
+        self.assertEqual(len(self.server.uploads), len(self.paths) - 2)
+
+    def test_missing_file_does_not_stop_batch(self):
+        missing = os.path.join(self.directory, 'missing.bin')
+        results = list(self.ol.upload_many(self.paths + [missing], workers=2))
+        failures = [result for result in results if not result.ok]
+
+        self.assertEqual(len(results), len(self.paths) + 1)
+        self.assertEqual([result.path for result in failures], [missing])
+        self.assertIsInstance(failures[0].error, OSError)
+        self.assertEqual(len(self.server.uploads), len(self.paths))
+
+    def test_progress(self):
+        snapshots = []
+        file_progress = {}
+
+        def on_file_progress(path, sent, size):
+            file_progress[path] = (sent, size)
+
+        results = list(self.ol.upload_many(self.paths, workers=3, on_progress=snapshots.append,
+                                           on_file_progress=on_file_progress))
+        progress = snapshots[-1]
+        total = sum(result.size for result in results)
+
+        self.assertEqual(progress.total_bytes, total)
+        self.assertEqual(progress.sent_bytes, total)
+        self.assertEqual(progress.done_files, len(self.paths))
+        self.assertEqual(progress.failures, [])
+        self.assertGreater(progress.rate, 0)
+        self.assertEqual(progress.eta, 0)
+        self.assertTrue(all(sent == size for sent, size in file_progress.values()))
+
+    def test_stop_early(self):
+        uploads = self.ol.upload_many(self.paths, workers=2)
+        next(uploads)
+        uploads.close()
+
+        self.assertLess(len(self.server.uploads), len(self.paths))
+
+    def test_empty(self):
+        self.assertEqual(list(self.ol.upload_many([])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import openload
+from openload.cache import MISSING, MemoryCache, ResponseCache, SQLiteCache
+from benchmarks.stub_server import StubServer
+
+
+class BackendTests(object):
+    def make_backend(self, maxsize):
+        raise NotImplementedError
+
+    def test_get_set(self):
+        backend = self.make_backend(10)
+        backend.set('a', {'x': [1, 2]}, ttl=60)
+
+        self.assertEqual(backend.get('a'), {'x': [1, 2]})
+        self.assertIs(backend.get('b'), MISSING)
+
+    def test_stored_values_are_copies(self):
+        backend = self.make_backend(10)
+        value = {'x': 1}
+        backend.set('a', value, ttl=60)
+        value['x'] = 2
+        backend.get('a')['x'] = 3
+
+        self.assertEqual(backend.get('a'), {'x': 1})
+
+    def test_expiry(self):
+        backend = self.make_backend(10)
+        backend.set('a', 1, ttl=0.05)
+        time.sleep(0.06)
+
+        self.assertIs(backend.get('a'), MISSING)
+        self.assertEqual(len(backend), 0)
+
+    def test_lru_eviction(self):
+        backend = self.make_backend(2)
+        backend.set('a', 1, ttl=60)
+        time.sleep(0.001)
+        backend.set('b', 2, ttl=60)
+        time.sleep(0.001)
+        backend.get('a')
+        time.sleep(0.001)
+        backend.set('c', 3, ttl=60)
+
+        self.assertEqual(backend.get('a'), 1)
+        self.assertIs(backend.get('b'), MISSING)
+        self.assertEqual(backend.get('c'), 3)
+
+    def test_invalidate(self):
+        backend = self.make_backend(10)
+        backend.set('a', 1, ttl=60, tags=['file:1', 'folder:2'])
+        backend.set('b', 2, ttl=60, tags=['folder:2'])
+        backend.set('c', 3, ttl=60, tags=['file:3'])
+        backend.invalidate(['file:1'])
+
+        self.assertIs(backend.get('a'), MISSING)
+        self.assertEqual(backend.get('b'), 2)
+
+        backend.invalidate(['folder:2'])
+        self.assertIs(backend.get('b'), MISSING)
+        self.assertEqual(backend.get('c'), 3)
+
+
+class TestMemoryCache(BackendTests, unittest.TestCase):
+    def make_backend(self, maxsize):
+        return MemoryCache(maxsize)
+
+
+class TestSQLiteCache(BackendTests, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_backend(self, maxsize):
+        return SQLiteCache(self.path, maxsize)
+
+    def test_survives_restart(self):
+        backend = self.make_backend(10)
+        backend.set('a', [1], ttl=60, tags=['file:1'])
+        backend.close()
+
+        backend = self.make_backend(10)
+        self.assertEqual(backend.get('a'), [1])
+
+        backend.invalidate(['file:1'])
+        self.assertIs(backend.get('a'), MISSING)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.cache = ResponseCache()
+        self.ol = openload.OpenLoad('login', 'key', cache=self.cache)
+        self.ol.api_url = self.server.api_url
+
+        self.file_path = os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), 'file.txt')
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_reads_are_cached(self):
+        for _ in range(3):
+            self.ol.file_info('a')
+            self.ol.list_folder('4258')
+            self.ol.account_info()
+            self.ol.splash_image('a')
+
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(self.cache.stats()['hits'], 8)
+        self.assertEqual(self.cache.stats()['misses'], 4)
+        self.assertEqual(self.cache.stats()['endpoints']['file/info'], {'hits': 2, 'misses': 1})
+
+    def test_mutations_are_not_cached(self):
+        self.ol.rename_file('a', 'b')
+        self.ol.rename_file('a', 'b')
+
+        self.assertEqual(self.server.count('file/rename'), 2)
+
+    def test_api_key_is_not_part_of_keys(self):
+        self.assertEqual(ResponseCache.key('file/info', {'file': 'a', 'login': 'l', 'key': 'secret'}),
+                         'file/info?file=a&login=l')
+
+    def test_rename_file_invalidates_info_and_listing(self):
+        self.ol.file_info('UPPjeAk--30')
+        self.ol.list_folder('4258')
+        self.ol.list_folder('other')
+        self.ol.rename_file('UPPjeAk--30', 'new name')
+
+        self.ol.file_info('UPPjeAk--30')
+        self.ol.list_folder('4258')
+        self.ol.list_folder('other')
+
+        self.assertEqual(self.server.count('file/info'), 2)
+        self.assertEqual(self.server.count('file/listfolder'), 4)
+
+    def test_rename_folder_invalidates_parent_listing(self):
+        self.ol.list_folder()
+        self.ol.rename_folder('5144', 'thumbs')
+        self.ol.list_folder()
+
+        self.assertEqual(self.server.count('file/listfolder'), 2)
+
+    def test_upload_invalidates_folder(self):
+        self.ol.list_folder('4258')
+        self.ol.account_info()
+        self.ol.upload_file(self.file_path, folder_id='4258')
+        self.ol.list_folder('4258')
+        self.ol.account_info()
+
+        self.assertEqual(self.server.count('file/listfolder'), 2)
+        self.assertEqual(self.server.count('account/info'), 2)
+
+    def test_delete_invalidates_file(self):
+        self.ol.file_info('a')
+        self.ol.delete_file('a')
+        self.ol.file_info('a')
+
+        self.assertEqual(self.server.count('file/info'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import sys
+import threading
+import unittest
+
+import openload
+from openload.api_exceptions import ConversionFailedException, FileNotFoundException, ServerErrorException
+from openload.conversions import ConversionTracker
+from benchmarks.stub_server import StubServer
+
+
+class TestConversionTracker(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+        self.server.simulate_conversions(duration=0.2, folder_of=lambda file_id: file_id.split('-')[0])
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_one_poll_per_folder(self):
+        file_ids = ['{0}-{1}'.format(folder, i) for folder in ('1', '2') for i in range(200)]
+
+        with ConversionTracker(self.ol, interval=0.05) as tracker:
+            conversions = [tracker.convert(file_id, folder_id=file_id.split('-')[0]) for file_id in file_ids]
+
+        self.assertEqual(len(tracker), 0)
+        self.assertTrue(all(conversion.status == 'finished' for conversion in conversions))
+        self.assertEqual(conversions[0].progress, 1.0)
+        self.assertEqual(conversions[0].result()['linkextid'], '1-0')
+        polls = self.server.count('file/runningconverts')
+        # About one poll per folder and interval, whatever the number of files.
+        self.assertLess(polls, len(file_ids) / 5)
+        self.assertEqual(set(params['folder'] for _, endpoint, params in self.server.requests
+                             if endpoint == 'file/runningconverts'), {'1', '2'})
+
+    def test_events(self):
+        events = []
+        lock = threading.Lock()
+
+        def on_event(conversion, event):
+            with lock:
+                events.append((conversion.file_id, event))
+
+        with ConversionTracker(self.ol, interval=0.02, on_event=on_event) as tracker:
+            tracker.convert('1-a', folder_id='1')
+
+        self.assertEqual(events[0], ('1-a', 'progress'))
+        self.assertGreater(events.count(('1-a', 'progress')), 1)
+        self.assertEqual(events[-1], ('1-a', 'finished'))
+
+    def test_failed_conversion(self):
+        self.server.simulate_conversions(duration=0.1, folder_of=lambda file_id: '1', failing=['bad'])
+        done = []
+
+        with ConversionTracker(self.ol, interval=0.02) as tracker:
+            good = tracker.convert('good', folder_id='1', callback=done.append)
+            bad = tracker.convert('bad', folder_id='1', callback=done.append)
+
+        self.assertEqual(good.status, 'finished')
+        self.assertRaises(ConversionFailedException, bad.result, 0)
+        self.assertEqual(sorted(conversion.file_id for conversion in done), ['bad', 'good'])
+
+    def test_never_listed(self):
+        # Conversion over before the first poll.
+        with ConversionTracker(self.ol, interval=0.02) as tracker:
+            conversion = tracker.watch('1-x', folder_id='1')
+
+        self.assertIsNone(conversion.result(timeout=0))
+
+    def test_poll_errors(self):
+        self.server.fail('file/runningconverts', times=3)
+
+        with ConversionTracker(self.ol, interval=0.02, max_poll_errors=3) as tracker:
+            conversion = tracker.convert('1-a', folder_id='1')
+
+        self.assertRaises(ServerErrorException, conversion.result, 0)
+
+    def test_convert_files(self):
+        conversions = list(self.ol.convert_files(['h-1', 'h-2', 'h-3'], folder_id='h', interval=0.02))
+
+        self.assertEqual(sorted(conversion.file_id for conversion in conversions), ['h-1', 'h-2', 'h-3'])
+        self.assertTrue(all(conversion.status == 'finished' for conversion in conversions))
+
+    def test_convert_files_with_bad_file(self):
+        self.server.fail('file/convert', status=404, msg='File not found')
+
+        conversions = list(self.ol.convert_files(['h-bad', 'h-1', 'h-2'], folder_id='h', interval=0.02))
+        results = dict((conversion.file_id, conversion) for conversion in conversions)
+
+        self.assertEqual(sorted(results), ['h-1', 'h-2', 'h-bad'])
+        self.assertRaises(FileNotFoundException, results['h-bad'].result, 0)
+        self.assertEqual(results['h-1'].status, 'finished')
+        self.assertEqual(results['h-2'].status, 'finished')
+
+    def test_watch_after_close(self):
+        tracker = ConversionTracker(self.ol, interval=0.02)
+        tracker.close()
+        done = []
+
+        conversion = tracker.convert('1-a', folder_id='1', callback=done.append)
+
+        self.assertRaises(ConversionFailedException, conversion.result, 0)
+        self.assertEqual(done, [conversion])
+        self.assertEqual(self.server.count('file/convert'), 0)
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'awaitable objects need Python 3.5+')
+    def test_await(self):
+        import asyncio
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        with ConversionTracker(self.ol, interval=0.02) as tracker:
+            # run_until_complete awaits the conversion (Conversion.__await__).
+            info = loop.run_until_complete(tracker.convert('1-a', folder_id='1'))
+
+        self.assertEqual(info['linkextid'], '1-a')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import openload
+import requests
+from openload.api_exceptions import CaptchaRequiredException, ChecksumMismatchException
+from openload.retry import RetryPolicy
+from benchmarks.stub_server import StubServer
+
+
+class TestDownload(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+        self.content = os.urandom(200 * 1024 + 7)
+        self.server.add_file('f1', self.content, name='video.mp4')
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'video.mp4')
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def read(self, path=None):
+        with open(path or self.path, 'rb') as f:
+            return f.read()
+
+    def test_download_to_directory(self):
+        written = []
+        path = self.ol.download('f1', self.directory, callback=written.append)
+
+        self.assertEqual(path, self.path)
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(sum(written), len(self.content))
+        self.assertFalse(os.path.exists(self.path + '.part'))
+        self.assertEqual([endpoint for _, endpoint, _ in self.server.requests],
+                         ['file/dlticket', 'file/dl', 'download'])
+
+    def test_resume_partial_file(self):
+        with open(self.path + '.part', 'wb') as f:
+            f.write(self.content[:1000])
+
+        self.ol.download('f1', self.path)
+
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(self.server.requests[-1][2], {'range': 'bytes=1000-'})
+
+    def test_interrupted_download(self):
+        self.server.cut(after=5000)
+
+        self.assertRaises(requests.exceptions.ChunkedEncodingError, self.ol.download, 'f1', self.path)
+        self.assertEqual(os.path.getsize(self.path + '.part'), 5000)
+
+        self.ol.download('f1', self.path)
+        self.assertEqual(self.read(), self.content)
+
+    def test_retry_resumes(self):
+        self.ol.retry_policy = RetryPolicy(backoff=0.001)
+        self.server.cut(times=2, after=70000)
+
+        self.ol.download('f1', self.path)
+
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual([params['range'] for _, endpoint, params in self.server.requests if endpoint == 'download'],
+                         [None, 'bytes=70000-', 'bytes=140000-'])
+
+    def test_unknown_size(self):
+        link = self.ol.get_download_link('f1', self.server.results['file/dlticket']['ticket'])
+        link['size'] = False
+        with open(self.path + '.part', 'wb') as f:
+            f.write(self.content[:1000])
+
+        self.ol.download('f1', self.path, connections=4, range_size=64 * 1024, link=link)
+
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual([params['range'] for _, endpoint, params in self.server.requests if endpoint == 'download'],
+                         [None])
+
+    def test_checksum_mismatch(self):
+        with open(self.path + '.part', 'wb') as f:
+            f.write(b'corrupted')
+
+        self.assertRaises(ChecksumMismatchException, self.ol.download, 'f1', self.path)
+        self.assertFalse(os.path.exists(self.path + '.part'))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_wait_time_overlaps_captcha(self):
+        ticket = dict(self.server.results['file/dlticket'], captcha_url='https://openload.co/dlcaptcha/b9.png',
+                      wait_time=0.2)
+        self.server.set_result('file/dlticket', ticket)
+
+        started_at = time.time()
+        self.ol.download('f1', self.path, captcha_solver=lambda ticket: time.sleep(0.15) or 'solution')
+        elapsed = time.time() - started_at
+
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 0.33)
+
+    def test_captcha(self):
+        ticket = dict(self.server.results['file/dlticket'], captcha_url='https://openload.co/dlcaptcha/b9.png')
+        self.server.set_result('file/dlticket', ticket)
+
+        self.assertRaises(CaptchaRequiredException, self.ol.download, 'f1', self.path)
+
+        self.ol.download('f1', self.path, captcha_solver=lambda ticket: 'solution')
+        self.assertEqual(self.server.requests[-2][2]['captcha_response'], 'solution')
+
+
+class TestParallelDownload(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+        self.content = os.urandom(1000 * 1000)
+        self.server.add_file('f1', self.content, name='video.mp4')
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'video.mp4')
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def download(self, **kwargs):
+        return self.ol.download('f1', self.path, connections=4, range_size=100 * 1000, **kwargs)
+
+    def ranges(self):
+        return sorted(params['range'] for _, endpoint, params in self.server.requests if endpoint == 'download')
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def test_ranges_are_concurrent(self):
+        self.server.latency = 0.02
+        self.download()
+
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(len(self.ranges()), 10)
+        self.assertIn('bytes=900000-999999', self.ranges())
+        self.assertGreaterEqual(self.server.max_in_flight, 4)
+        self.assertEqual(os.listdir(self.directory), ['video.mp4'])
+
+    def test_failed_ranges_only_are_fetched_again(self):
+        self.server.fail('download', times=2, body=b'Bad Gateway')
+
+        self.assertRaises(requests.HTTPError, self.download)
+        self.assertTrue(os.path.exists(self.path + '.part.ranges'))
+
+        del self.server.requests[:]
+        self.download()
+
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(len(self.ranges()), 2)
+
+    def test_retry_policy_resumes_ranges(self):
+        self.ol.retry_policy = RetryPolicy(backoff=0.001)
+        self.server.cut(times=3, after=30000)
+
+        self.download()
+
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(len(self.ranges()), 13)
+
+    def test_expired_link_is_requested_again(self):
+        expired = []
+
+        def callback(count):
+            if not expired:
+                expired.append(count)
+                self.server.expire_links()
+
+        self.download(callback=callback)
+
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(self.server.count('file/dlticket'), 2)
+        self.assertEqual(self.server.count('file/dl'), 2)
+
+    def test_ranges_not_supported(self):
+        self.server.accept_ranges = False
+        self.download()
+
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(os.listdir(self.directory), ['video.mp4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+import openload
+from openload.index import AccountIndex
+from benchmarks.stub_server import StubServer
+
+
+def video(linkextid, folder_id, size, sha1=None, name=None):
+    return {'linkextid': linkextid, 'folderid': folder_id, 'name': name or linkextid + '.mp4', 'size': str(size),
+            'sha1': sha1 or linkextid * 4, 'content_type': 'video/mp4', 'status': 'active'}
+
+
+class TestAccountIndex(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.tree = {
+            'home': {'folders': [{'id': '1', 'name': 'movies'}, {'id': '2', 'name': 'series'}],
+                     'files': [video('a', '100', 10), dict(video('n', '100', 5), name='notes.txt',
+                                                            content_type='text/plain')]},
+            '1': {'folders': [{'id': '3', 'name': 'old'}], 'files': [video('b', '1', 100), video('c', '1', 200)]},
+            '2': {'folders': [], 'files': [video('d', '2', 1000, sha1='ffff')]},
+            '3': {'folders': [], 'files': [video('e', '3', 10000, sha1='ffff')]},
+        }
+        self.server.set_result('file/listfolder', lambda params: self.tree[params.get('folder', 'home')])
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+        self.index = AccountIndex(self.ol, ':memory:')
+
+    def tearDown(self):
+        self.index.close()
+        self.ol.close()
+        self.server.stop()
+
+    def names(self, files):
+        return sorted(f['name'] for f in files)
+
+    def test_refresh_and_queries(self):
+        stats = self.index.refresh()
+
+        self.assertEqual(stats, {'listed': 4, 'changed': 4, 'skipped': 0})
+        self.assertEqual(len(self.index), 6)
+        self.assertEqual(self.index.get('b')['size'], '100')
+        self.assertIsNone(self.index.get('z'))
+        self.assertEqual(self.names(self.index.find(sha1='ffff')), ['d.mp4', 'e.mp4'])
+        self.assertEqual(self.names(self.index.find(name='*.txt')), ['notes.txt'])
+        self.assertEqual(len(self.index.find(content_type='video/*')), 5)
+        self.assertEqual(self.names(self.index.find(folder_id='1')), ['b.mp4', 'c.mp4'])
+        self.assertEqual(self.names(self.index.find(folder_id='1', recursive=True)), ['b.mp4', 'c.mp4', 'e.mp4'])
+        self.assertEqual(self.index.folder_size('1'), 10300)
+        self.assertEqual(self.index.folder_size('1', recursive=False), 300)
+        self.assertEqual(self.index.folder_size(), 11315)
+        self.assertEqual(self.index.folder('3')['path'], 'movies/old')
+
+    def test_unchanged_folders_are_not_rewritten(self):
+        self.index.refresh()
+        self.tree['2'] = {'folders': [], 'files': [video('f', '2', 1)]}
+
+        stats = self.index.refresh()
+
+        self.assertEqual(stats, {'listed': 4, 'changed': 1, 'skipped': 0})
+        self.assertEqual(self.names(self.index.find(folder_id='2')), ['f.mp4'])
+        self.assertIsNone(self.index.get('d'))
+
+    def test_max_age_skips_fresh_folders(self):
+        self.index.refresh()
+        del self.server.requests[:]
+
+        stats = self.index.refresh(max_age=3600)
+
+        self.assertEqual(stats, {'listed': 0, 'changed': 0, 'skipped': 4})
+        self.assertEqual(self.server.count('file/listfolder'), 0)
+        self.assertEqual(len(self.index), 6)
+
+    def test_removed_folder(self):
+        self.index.refresh()
+        self.tree['home']['folders'] = [{'id': '2', 'name': 'series'}]
+
+        self.index.refresh()
+
+        self.assertIsNone(self.index.folder('1'))
+        self.assertIsNone(self.index.folder('3'))
+        self.assertEqual(self.names(self.index.find(content_type='video/*')), ['a.mp4', 'd.mp4'])
+
+    def test_refresh_subfolder(self):
+        self.index.refresh()
+        self.tree['3']['files'].append(video('g', '3', 7))
+
+        stats = self.index.refresh('1')
+
+        self.assertEqual(stats['listed'], 2)
+        self.assertEqual(self.index.folder('3')['path'], 'movies/old')
+        self.assertEqual(self.index.folder_size('3'), 10007)
+
+    def test_update_file_info(self):
+        self.index.refresh()
+        self.server.set_result('file/info', lambda params: {
+            'b': {'id': 'b', 'status': 200, 'name': 'b2.mp4', 'size': 101, 'sha1': 'cccc', 'content_type': 'video/mp4'},
+            'c': {'id': 'c', 'status': 404},
+        })
+
+        self.assertEqual(self.index.update_file_info(['b', 'c']), (1, 1))
+        self.assertEqual(self.index.find(sha1='cccc')[0]['name'], 'b2.mp4')
+        self.assertEqual(self.index.folder_size('1', recursive=False), 101)
+
+
+class TestDedupUpload(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.existing = b'already uploaded'
+        self.server.set_result('file/listfolder', lambda params: {'folders': [], 'files': [
+            video('x', '4258', len(self.existing), sha1=hashlib.sha1(self.existing).hexdigest(), name='old.bin')]})
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+        self.index = AccountIndex(self.ol, ':memory:')
+        self.index.refresh()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.index.close()
+        self.ol.close()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_duplicate_is_not_uploaded(self):
+        result = self.index.upload_file(self.write('new.bin', self.existing))
+
+        self.assertTrue(result['duplicate'])
+        self.assertEqual(result['id'], 'x')
+        self.assertEqual(self.server.uploads, [])
+        self.assertEqual(self.server.count('file/ul'), 0)
+
+    def test_new_content_is_uploaded_once(self):
+        first = self.index.upload_file(self.write('a.bin', b'new content'), folder_id='4258')
+        second = self.index.upload_file(self.write('b.bin', b'new content'))
+
+        self.assertFalse(first['duplicate'])
+        self.assertTrue(second['duplicate'])
+        self.assertEqual(second['id'], first['id'])
+        self.assertEqual(len(self.server.uploads), 1)
+        self.assertEqual([params['sha1'] for _, endpoint, params in self.server.requests if endpoint == 'file/ul'],
+                         [hashlib.sha1(b'new content').hexdigest()])
+        self.assertEqual(self.index.folder_of(first['id']), '4258')
+
+    def test_rename(self):
+        result = self.index.upload_file(self.write('renamed.bin', self.existing), rename=True)
+
+        self.assertEqual(result['name'], 'renamed.bin')
+        _, endpoint, params = self.server.requests[-1]
+        self.assertEqual((endpoint, params['file'], params['name']), ('file/rename', 'x', 'renamed.bin'))
+        self.assertEqual(self.index.get('x')['name'], 'renamed.bin')
+
+    def test_same_folder(self):
+        result = self.index.upload_file(self.write('new.bin', self.existing), folder_id='1', same_folder=True)
+
+        self.assertFalse(result['duplicate'])
+        self.assertEqual(len(self.server.uploads), 1)
+
+    def test_local_sha1_is_remembered(self):
+        path = self.write('a.bin', b'abc')
+        self.assertEqual(self.index.local_sha1(path), hashlib.sha1(b'abc').hexdigest())
+
+        with open(path, 'ab') as f:
+            f.write(b'def')
+        self.assertEqual(self.index.local_sha1(path), hashlib.sha1(b'abcdef').hexdigest())
+
+    def test_upload_many(self):
+        paths = [self.write('{0}.bin'.format(i), content)
+                 for i, content in enumerate([b'one', b'two', b'one', self.existing, b'two', b'one'])]
+
+        results = list(self.ol.upload_many(paths, workers=4, dedup_index=self.index))
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(sorted(content for _, content in self.server.uploads), [b'one', b'two'])
+        self.assertEqual(sum(result.result['duplicate'] for result in results), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import openload
+from openload.ingest import file_sha1
+from benchmarks.stub_server import StubServer
+
+
+class TestFileSha1(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_mapped_and_buffered(self):
+        content = os.urandom(300000)
+        path = os.path.join(self.directory, 'file.bin')
+        with open(path, 'wb') as f:
+            f.write(content)
+
+        expected = hashlib.sha1(content).hexdigest()
+        self.assertEqual(file_sha1(path), expected)
+        self.assertEqual(file_sha1(path, buffer_size=4096, use_mmap=False), expected)
+
+    def test_empty_file(self):
+        path = os.path.join(self.directory, 'empty.bin')
+        open(path, 'wb').close()
+
+        self.assertEqual(file_sha1(path), hashlib.sha1(b'').hexdigest())
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+        self.directory = tempfile.mkdtemp()
+        self.contents = {}
+        for i in range(10):
+            path = os.path.join(self.directory, 'file{0}.bin'.format(i))
+            self.contents[path] = os.urandom(1000 + i)
+            with open(path, 'wb') as f:
+                f.write(self.contents[path])
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def test_uploads_with_sha1(self):
+        results = list(self.ol.ingest(sorted(self.contents), hash_workers=2, upload_workers=3))
+
+        self.assertTrue(all(upload.ok for upload in results))
+        self.assertEqual(sorted(upload.path for upload in results), sorted(self.contents))
+        sent = sorted(params['sha1'] for _, endpoint, params in self.server.requests if endpoint == 'file/ul')
+        self.assertEqual(sent, sorted(hashlib.sha1(content).hexdigest() for content in self.contents.values()))
+        for upload in results:
+            self.assertEqual(upload.result['sha1'], hashlib.sha1(self.contents[upload.path]).hexdigest())
+
+    def test_missing_file(self):
+        missing = os.path.join(self.directory, 'missing.bin')
+
+        results = list(self.ol.ingest([missing], executor=ThreadPoolExecutor(1)))
+
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0].error, EnvironmentError)
+        self.assertEqual(self.server.count('upload'), 0)
+
+    def test_file_removed_after_hashing(self):
+        removed = sorted(self.contents)[0]
+
+        def hash_and_remove(path):
+            sha1 = file_sha1(path)
+            if path == removed:
+                os.remove(path)
+            return sha1
+
+        executor = ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        # Replaces file_sha1 by hash_and_remove in the jobs submitted by ingest.
+        submit = executor.submit
+        executor.submit = lambda fn, path: submit(hash_and_remove, path)
+
+        results = list(self.ol.ingest(sorted(self.contents), executor=executor))
+        failures = [upload for upload in results if not upload.ok]
+
+        self.assertEqual(len(results), len(self.contents))
+        self.assertEqual([upload.path for upload in failures], [removed])
+        self.assertIsInstance(failures[0].error, EnvironmentError)
+        self.assertEqual(self.server.count('upload'), len(self.contents) - 1)
+
+    def test_backpressure(self):
+        taken = []
+
+        def paths():
+            for path in sorted(self.contents):
+                taken.append(path)
+                yield path
+
+        executor = ThreadPoolExecutor(2)
+        self.addCleanup(executor.shutdown)
+        results = self.ol.ingest(paths(), upload_workers=1, max_pending=3, executor=executor)
+
+        next(results)
+        self.assertEqual(len(taken), 3)
+        self.assertEqual(len(list(results)), 9)
+        self.assertEqual(len(taken), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import unittest
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+import openload
+from openload.api_exceptions import FileNotFoundException
+from openload.jsonstream import iter_result
+from openload.models import File
+from openload.retry import CircuitBreaker
+from benchmarks.stub_server import StubServer
+
+
+def split(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def check_status(head):
+    openload.OpenLoad._check_status(head)
+
+
+class TestIterResult(unittest.TestCase):
+    def test_chunk_boundaries(self):
+        result = {'folders': [{'id': '1', 'name': u'été'}], 'files': [{'size': '12345', 'n': i} for i in range(4)],
+                  'count': 123456}
+        body = json.dumps({'status': 200, 'msg': 'OK', 'result': result}, ensure_ascii=False).encode('utf-8')
+        expected = [('folders', result['folders'][0])] + [('files', f) for f in result['files']] + [('count', 123456)]
+
+        for size in (1, 2, 3, 5, 64, len(body)):
+            self.assertEqual(list(iter_result(split(body, size), check_status)), expected)
+
+    def test_list_and_empty_results(self):
+        self.assertEqual(list(iter_result([b'{"status": 200, "msg": "OK", "result": [1, 22]}'], check_status)),
+                         [(0, 1), (1, 22)])
+        self.assertEqual(list(iter_result([b'{"status": 200, "msg": "OK", "result": {}}'], check_status)), [])
+        self.assertEqual(list(iter_result([b'{"status": 200, "msg": "OK", "result": []}'], check_status)), [])
+
+    def test_error_status_is_raised_before_the_result(self):
+        entries = iter_result(split(b'{"status": 404, "msg": "File not found", "result": [1, 2]}', 4), check_status)
+
+        self.assertRaises(FileNotFoundException, next, entries)
+
+    def test_status_after_result(self):
+        body = b'{"result": {"24": {"id": "24"}}, "status": 200, "msg": "OK"}'
+
+        self.assertEqual(list(iter_result(split(body, 3), check_status)), [('24', {'id': '24'})])
+        self.assertRaises(FileNotFoundException, list,
+                          iter_result([b'{"result": null, "status": 404, "msg": "Not Found"}'], check_status))
+
+    def test_not_json(self):
+        self.assertRaises(ValueError, list, iter_result([b'<html>Bad Gateway</html>'], check_status))
+        self.assertRaises(ValueError, list, iter_result([b'{"status": 200, "msg": "OK", "result": [1, '], check_status))
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+    def test_memory_is_flat(self):
+        entry = json.dumps({'name': 'big_buck_bunny.mp4', 'sha1': 'c6531f5ce9669d6547023d92aea4805b7c45d133',
+                            'size': '5114011', 'linkextid': 'UPPjeAk--30'}).encode('ascii')
+        count = 50000
+
+        def chunks():
+            yield b'{"status": 200, "msg": "OK", "result": {"folders": [], "files": ['
+            for i in range(count):
+                yield entry + (b',' if i < count - 1 else b']}}')
+
+        tracemalloc.start()
+        seen = sum(1 for _ in iter_result(chunks(), check_status))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.assertEqual(seen, count)
+        self.assertLess(peak, len(entry) * count / 20)
+
+
+class TestStreamedCalls(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_iter_list_folder(self):
+        self.ol.stream_chunk_size = 16
+        listing = self.ol.list_folder()
+
+        entries = list(self.ol.iter_list_folder('4258'))
+
+        self.assertEqual(entries, [('folders', folder) for folder in listing['folders']] +
+                         [('files', f) for f in listing['files']])
+        self.assertEqual(self.server.requests[-1][2]['folder'], '4258')
+
+    def test_models(self):
+        self.ol.models = True
+
+        kind, entry = list(self.ol.iter_list_folder())[-1]
+
+        self.assertIsInstance(entry, File)
+        self.assertEqual(entry.size, 5114011)
+        self.assertEqual([status.status for status in self.ol.iter_remote_upload_status()], ['new'])
+
+    def test_errors(self):
+        self.server.set_result('file/listfolder', None, status=404, msg='Not Found')
+
+        self.assertRaises(FileNotFoundException, list, self.ol.iter_list_folder())
+
+    def test_abandoned_iterator_closes_half_open_circuit(self):
+        self.ol.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        self.server.fail('account/info')
+        self.assertRaises(openload.api_exceptions.ServerErrorException, self.ol.account_info)
+
+        entries = self.ol.iter_list_folder()
+        next(entries)
+        entries.close()
+
+        self.assertEqual(self.ol.circuit_breaker.state, CircuitBreaker.CLOSED)
+        self.assertIn('email', self.ol.account_info())
+
+
+if __name__ == '__main__':
+    unittest.main()
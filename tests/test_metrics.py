@@ -0,0 +1,149 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import openload
+from openload.api_exceptions import FileNotFoundException, TooManyRequestsException
+from openload.cache import ResponseCache
+from openload.metrics import HookList, Hooks, Metrics
+from openload.ratelimit import RateLimiter, TokenBucket
+from openload.retry import RetryPolicy
+from benchmarks.stub_server import StubServer
+
+
+class Recorder(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def request_start(self, endpoint):
+        self.events.append(('request_start', endpoint, {}))
+
+    def request_end(self, endpoint, elapsed, **fields):
+        self.events.append(('request_end', endpoint, dict(fields, elapsed=elapsed)))
+
+    def retry(self, endpoint, attempt, delay, exception):
+        self.events.append(('retry', endpoint, {'attempt': attempt, 'delay': delay}))
+
+    def throttle(self, endpoint, delay):
+        self.events.append(('throttle', endpoint, {'delay': delay}))
+
+    def cache_hit(self, endpoint):
+        self.events.append(('cache_hit', endpoint, {}))
+
+
+class TestHooks(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.recorder = Recorder()
+        self.events = self.recorder.events
+        self.metrics = Metrics(buckets=(0.5, 10.0))
+        self.hooks = HookList([self.metrics, self.recorder])
+        self.ol = self.client()
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def client(self, **options):
+        ol = openload.OpenLoad('login', 'key', hooks=self.hooks, **options)
+        ol.api_url = self.server.api_url
+        self.addCleanup(ol.close)
+        return ol
+
+    def named(self, event):
+        return [(endpoint, fields) for name, endpoint, fields in self.events if name == event]
+
+    def test_request_events(self):
+        self.ol.account_info()
+        self.server.fail('file/info', status=404, msg='File not found')
+        self.assertRaises(FileNotFoundException, self.ol.file_info, 'a')
+
+        self.assertEqual([(name, endpoint) for name, endpoint, _ in self.events],
+                         [('request_start', 'account/info'), ('request_end', 'account/info'),
+                          ('request_start', 'file/info'), ('request_end', 'file/info')])
+        (_, ok), (_, failed) = self.named('request_end')
+        self.assertIsNone(ok['exception'])
+        self.assertGreater(ok['received'], 100)
+        self.assertTrue(0 <= ok['decode_time'] <= ok['elapsed'])
+        self.assertTrue(0 <= ok['response_time'] <= ok['elapsed'])
+        self.assertIsInstance(failed['exception'], FileNotFoundException)
+
+        stats = self.metrics.stats()
+        self.assertEqual(stats['request_duration_seconds'][('account/info',)]['count'], 1)
+        self.assertEqual(stats['request_errors_total'], {('file/info', 'FileNotFoundException'): 1})
+        self.assertEqual(stats['requests_in_flight'], {('account/info',): 0, ('file/info',): 0})
+
+    def test_retry_throttle_and_cache_hit(self):
+        limiter = RateLimiter({'file': TokenBucket(50, burst=1)})
+        ol = self.client(retry_policy=RetryPolicy(backoff=0.001, jitter=False), rate_limiter=limiter,
+                         cache=ResponseCache())
+        self.server.fail('file/info', times=1, status=500)
+
+        ol.file_info('a')
+        ol.file_info('a')
+        self.server.fail('account/info', times=1, status=429, msg='Too Many Requests')
+        ol.account_info()
+
+        self.assertEqual([fields['attempt'] for _, fields in self.named('retry')], [1, 1])
+        self.assertEqual(sorted(endpoint for endpoint, _ in self.named('throttle')), ['account/info', 'file/info'])
+        self.assertEqual(self.named('cache_hit'), [('file/info', {})])
+        stats = self.metrics.stats()
+        self.assertEqual(stats['retries_total'], {('file/info',): 1, ('account/info',): 1})
+        self.assertEqual(stats['request_errors_total'][('account/info', 'TooManyRequestsException')], 1)
+        self.assertGreater(stats['throttled_seconds_total'][('file/info',)], 0)
+        self.assertEqual(stats['throttles_total'], {('account/info', 'api'): 1, ('file/info', 'limiter'): 1})
+
+    def test_transfers(self):
+        path = os.path.join(self.directory, 'upload.bin')
+        with open(path, 'wb') as f:
+            f.write(b'x' * 100000)
+        self.server.add_file('f1', b'y' * 50000, name='download.bin')
+
+        self.ol.upload_file(path)
+        self.ol.download('f1', self.directory)
+
+        stats = self.metrics.stats()
+        self.assertEqual(stats['sent_bytes_total'][('upload',)], 100000)
+        self.assertEqual(stats['received_bytes_total'][('download',)], 50000)
+        self.assertEqual(stats['request_duration_seconds'][('download',)]['count'], 1)
+
+    def test_exports(self):
+        self.ol.account_info()
+        self.server.fail('account/info', status=429, msg='Too Many Requests')
+        self.assertRaises(TooManyRequestsException, self.ol.account_info)
+
+        text = self.metrics.prometheus()
+        self.assertIn('# TYPE openload_request_duration_seconds histogram', text)
+        self.assertIn('openload_request_duration_seconds_bucket{endpoint="account/info",le="+Inf"} 2', text)
+        self.assertIn('openload_request_duration_seconds_count{endpoint="account/info"} 2', text)
+        self.assertIn('openload_request_errors_total{endpoint="account/info",exception="TooManyRequestsException"} 1',
+                      text)
+
+        export = self.metrics.otlp({'service.name': 'uploader'})['resourceMetrics'][0]
+        metrics = dict((metric['name'], metric) for metric in export['scopeMetrics'][0]['metrics'])
+        histogram = metrics['openload.request_duration_seconds']['histogram']
+        point = histogram['dataPoints'][0]
+        self.assertEqual(histogram['aggregationTemporality'], 2)
+        self.assertEqual(point['attributes'], [{'key': 'endpoint', 'value': {'stringValue': 'account/info'}}])
+        self.assertEqual((point['count'], point['explicitBounds'], len(point['bucketCounts'])), ('2', [0.5, 10.0], 3))
+        self.assertTrue(metrics['openload.request_errors_total']['sum']['isMonotonic'])
+
+    def test_disabled(self):
+        ol = openload.OpenLoad('login', 'key')
+        ol.api_url = self.server.api_url
+        self.addCleanup(ol.close)
+
+        ol.account_info()
+
+        self.assertIsNone(ol.hooks)
+        self.assertEqual(self.events, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
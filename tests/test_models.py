@@ -0,0 +1,90 @@
+import datetime
+import pickle
+import unittest
+
+import openload
+from openload.models import AccountInfo, DownloadTicket, File, RemoteUpload, to_datetime
+from benchmarks.stub_server import StubServer
+
+
+class TestModels(unittest.TestCase):
+    def test_lazy_conversion(self):
+        f = File.from_dict({'linkextid': 'UPPjeAk--30', 'size': '5114011', 'upload_at': '1419791256',
+                            'download_count': '48', 'content_type': 'video/mp4', 'unknown': 1})
+
+        self.assertEqual(f._size, '5114011')
+        self.assertEqual(f.size, 5114011)
+        self.assertEqual(f._size, 5114011)
+        self.assertEqual(f.upload_at, datetime.datetime(2014, 12, 28, 18, 27, 36))
+        self.assertEqual(f.download_count, 48)
+        self.assertIsNone(f.sha1)
+        self.assertEqual(f.extra, {'unknown': 1})
+        self.assertFalse(hasattr(f, '__dict__'))
+
+    def test_shared_strings_are_interned(self):
+        first, second = [File.from_dict({'linkextid': str(i), 'content_type': ''.join(['video/', 'mp4'])})
+                         for i in range(2)]
+
+        self.assertIs(first.content_type, second.content_type)
+
+    def test_file_info_id(self):
+        f = File.from_dict({'id': '72fA-_Lq8Ak3', 'status': 200, 'size': 123456789012})
+
+        self.assertEqual((f.id, f.linkextid, f.size, f.extra), ('72fA-_Lq8Ak3', '72fA-_Lq8Ak3', 123456789012, None))
+
+    def test_conversions(self):
+        upload = RemoteUpload.from_dict({'id': '22', 'status': 'downloading', 'bytes_loaded': '250',
+                                         'bytes_total': '1000', 'extid': False, 'added': '2015-02-21 09:20:26'})
+        account = AccountInfo.from_dict({'storage_left': -1, 'traffic': {'left': -1, 'used_24h': '10'}})
+        ticket = DownloadTicket.from_dict({'ticket': 't', 'captcha_url': False, 'wait_time': 10})
+
+        self.assertEqual(upload.progress, 0.25)
+        self.assertIsNone(upload.extid)
+        self.assertEqual(upload.added, datetime.datetime(2015, 2, 21, 9, 20, 26))
+        self.assertEqual((account.traffic_left, account.traffic_used_24h), (-1, 10))
+        self.assertIsNone(ticket.captcha_url)
+        self.assertIsNone(to_datetime('not a date'))
+
+    def test_pickle_and_equality(self):
+        f = File.from_dict({'linkextid': 'a', 'size': '1'})
+
+        self.assertEqual(pickle.loads(pickle.dumps(f)), f)
+        self.assertNotEqual(File.from_dict({'linkextid': 'b'}), f)
+
+
+class TestOpenLoadModels(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key', models=True)
+        self.ol.api_url = self.server.api_url
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_results_are_models(self):
+        listing = self.ol.list_folder()
+
+        self.assertEqual(listing['folders'][0].name, '.videothumb')
+        self.assertEqual(listing['files'][0].size, 5114011)
+        self.assertEqual(self.ol.account_info().storage_used, 32922117680)
+        self.assertEqual(self.ol.file_info('a')['a'].size, 123456789012)
+        self.assertEqual(self.ol.remote_upload_status()['24'].status, 'new')
+        self.assertEqual(self.ol.prepare_download('a').valid_until, datetime.datetime(2035, 8, 23, 18, 20, 13))
+
+    def test_helpers_still_work_on_dicts(self):
+        walked = list(self.ol.walk(max_depth=0))
+
+        self.assertEqual(walked[0][2][0]['size'], '5114011')
+        self.assertEqual(next(self.ol.download_links(['a'])).link['name'], 'The quick brown fox.txt')
+
+    def test_models_off(self):
+        self.ol.models = False
+
+        self.assertEqual(self.ol.list_folder()['files'][0]['size'], '5114011')
+
+
+if __name__ == '__main__':
+    unittest.main()
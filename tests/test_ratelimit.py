@@ -0,0 +1,89 @@
+import threading
+import time
+import unittest
+
+import openload
+from openload.api_exceptions import TooManyRequestsException
+from openload.ratelimit import RateLimiter, TokenBucket
+from benchmarks.stub_server import StubServer
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=10, burst=3)
+        delays = [bucket.reserve() for _ in range(5)]
+
+        self.assertEqual(delays[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(delays[3], 0.1, places=2)
+        self.assertAlmostEqual(delays[4], 0.2, places=2)
+
+    def test_throttled_lowers_rate(self):
+        bucket = TokenBucket(rate=100, min_rate=10, decrease_factor=0.5, recovery_time=3600)
+
+        bucket.throttled()
+        self.assertAlmostEqual(bucket.current_rate, 50, places=0)
+
+        for _ in range(10):
+            bucket.throttled()
+        self.assertEqual(bucket.current_rate, 10)
+        self.assertGreater(bucket.reserve(), 0)
+
+    def test_rate_recovers(self):
+        bucket = TokenBucket(rate=100, min_rate=1, recovery_time=0.1)
+        bucket.throttled()
+        time.sleep(0.15)
+        bucket.reserve()
+
+        self.assertEqual(bucket.current_rate, 100)
+
+    def test_shared_between_threads(self):
+        bucket = TokenBucket(rate=200, burst=1)
+        start = time.time()
+
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(41)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreaterEqual(time.time() - start, 0.19)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_groups(self):
+        limiter = RateLimiter({'file': 5})
+
+        self.assertIs(limiter.bucket('file/info'), limiter.bucket('file/listfolder'))
+        self.assertIsNone(limiter.bucket('account/info'))
+
+        limiter = RateLimiter(default=5)
+        self.assertIsNot(limiter.bucket('file/info'), limiter.bucket('remotedl/status'))
+
+    def test_client_is_limited(self):
+        with StubServer() as server:
+            ol = openload.OpenLoad('login', 'key', rate_limiter=RateLimiter({'account': TokenBucket(20, burst=1)}))
+            ol.api_url = server.api_url
+
+            start = time.time()
+            for _ in range(5):
+                ol.account_info()
+            ol.list_folder()
+
+            self.assertGreaterEqual(time.time() - start, 0.19)
+            ol.close()
+
+    def test_client_adapts_on_429(self):
+        limiter = RateLimiter({'file': 100})
+
+        with StubServer() as server:
+            server.set_result('file/info', None, status=429, msg='Too many requests')
+            ol = openload.OpenLoad('login', 'key', rate_limiter=limiter)
+            ol.api_url = server.api_url
+
+            self.assertRaises(TooManyRequestsException, ol.file_info, 'a')
+            self.assertLess(limiter.bucket('file').current_rate, 100)
+            ol.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import threading
+import time
+import unittest
+
+import openload
+from openload.api_exceptions import RemoteUploadFailedException
+from openload.remote import RemoteUploadManager
+from benchmarks.stub_server import StubServer
+
+
+class RecordingManager(RemoteUploadManager):
+    """Keeps the exceptions raised by polls, which would otherwise only end the poller thread."""
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingManager, self).__init__(*args, **kwargs)
+        self.poll_errors = []
+
+    def _poll(self, tracked):
+        try:
+            super(RecordingManager, self)._poll(tracked)
+        except Exception as e:
+            self.poll_errors.append(e)
+            raise
+
+
+class TestRemoteUploadManager(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+        self.server.simulate_remote_uploads(size=1000, rate=20000)
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def status_calls(self):
+        return [params for _, endpoint, params in self.server.requests if endpoint == 'remotedl/status']
+
+    def test_batched_polling(self):
+        urls = ['http://example.com/{0}.mp4'.format(i) for i in range(40)]
+
+        uploads = list(self.ol.remote_upload_many(urls, workers=8, min_interval=0.02, max_interval=0.5))
+
+        self.assertEqual(sorted(upload.remote_url for upload in uploads), sorted(urls))
+        self.assertTrue(all(upload.result()['status'] == 'finished' for upload in uploads))
+        self.assertEqual(uploads[0].result()['extid'], 'remote' + uploads[0].id)
+        self.assertEqual(uploads[0].progress, 1.0)
+        # One batched call covers every upload, instead of one call per upload and poll.
+        self.assertLess(len(self.status_calls()), len(urls))
+        self.assertTrue(all(params.get('limit') == '100' for params in self.status_calls()))
+
+    def test_failure_and_callbacks(self):
+        self.server.simulate_remote_uploads(size=1000, rate=20000, failing=['http://example.com/bad.mp4'])
+        done = []
+        lock = threading.Lock()
+
+        def callback(upload):
+            with lock:
+                done.append(upload)
+
+        with RemoteUploadManager(self.ol, min_interval=0.02) as manager:
+            good = manager.submit('http://example.com/good.mp4', callback=callback)
+            bad = manager.submit('http://example.com/bad.mp4', callback=callback)
+
+        self.assertEqual(good.result(timeout=0)['status'], 'finished')
+        self.assertRaises(RemoteUploadFailedException, bad.result, 0)
+        self.assertEqual(sorted(upload.remote_url for upload in done), [bad.remote_url, good.remote_url])
+
+    def test_add_failure(self):
+        self.server.fail('remotedl/add', status=400, msg='Bad Request')
+
+        with RemoteUploadManager(self.ol, min_interval=0.02) as manager:
+            upload = manager.submit('http://example.com/a.mp4')
+
+        self.assertRaises(openload.api_exceptions.BadRequestException, upload.result, 0)
+        self.assertEqual(self.status_calls(), [])
+
+    def test_max_active(self):
+        urls = ['http://example.com/{0}.mp4'.format(i) for i in range(6)]
+        list(self.ol.remote_upload_many(urls, workers=6, max_active=2, min_interval=0.01))
+
+        jobs = self.server.remote_jobs
+        for job in jobs:
+            running = [other for other in jobs if other['started'] <= job['started'] < other['finished']]
+            self.assertLessEqual(len(running), 2)
+
+    def test_adaptive_interval(self):
+        # 1 second upload, polled every min_interval it would take 50 polls.
+        self.server.simulate_remote_uploads(size=20000, rate=20000)
+
+        with RemoteUploadManager(self.ol, min_interval=0.02, max_interval=5) as manager:
+            upload = manager.submit('http://example.com/big.mp4')
+
+        self.assertEqual(upload.result(timeout=0)['status'], 'finished')
+        self.assertLess(len(self.status_calls()), 20)
+
+    def test_old_uploads_are_polled_by_id(self):
+        with RemoteUploadManager(self.ol, batch_size=2, min_interval=0.02) as manager:
+            uploads = [manager.submit('http://example.com/{0}.mp4'.format(i)) for i in range(3)]
+            for upload in uploads:
+                upload.result(timeout=5)
+
+        polled_ids = set(params['id'] for params in self.status_calls() if 'id' in params)
+        self.assertIn('1', polled_ids)
+        self.assertTrue(all(upload.result()['status'] == 'finished' for upload in uploads))
+
+    def test_track(self):
+        upload_id = self.ol.remote_upload('http://example.com/a.mp4')['id']
+
+        with RemoteUploadManager(self.ol, min_interval=0.02) as manager:
+            upload = manager.track(upload_id)
+
+        self.assertEqual(upload.result(timeout=0)['remoteurl'], 'http://example.com/a.mp4')
+
+    def test_close_while_adding(self):
+        self.server.latency = 0.3
+        manager = RemoteUploadManager(self.ol, min_interval=0.02)
+        upload = manager.submit('http://example.com/a.mp4')
+        time.sleep(0.1)
+
+        manager.close(wait=False)
+
+        self.assertRaises(RemoteUploadFailedException, upload.result, timeout=2)
+        self.assertRaises(RemoteUploadFailedException, manager.track('1').result, timeout=0)
+
+    def test_close_while_polling(self):
+        manager = RecordingManager(self.ol, min_interval=0.02)
+        upload = manager.submit('http://example.com/a.mp4')
+        while not self.status_calls():
+            time.sleep(0.01)
+        # The next poll is in flight when close fails the upload, its (finished) status comes after.
+        self.server.latency = 0.3
+        time.sleep(0.1)
+
+        manager.close(wait=False)
+
+        self.assertRaises(RemoteUploadFailedException, upload.result, timeout=0)
+        self.assertEqual(manager.poll_errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import time
+import unittest
+
+import openload
+from openload.api_exceptions import (BandwidthUsageExceeded, CircuitOpenException, FileNotFoundException,
+                                     ServerErrorException, TooManyRequestsException)
+from openload.ratelimit import clock
+from openload.retry import CircuitBreaker, RetryPolicy
+from benchmarks.stub_server import StubServer
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_idempotency(self):
+        policy = RetryPolicy()
+        error = ServerErrorException('down')
+
+        self.assertTrue(policy.is_retryable('file/info', error))
+        self.assertTrue(policy.is_retryable('file/listfolder', ValueError('not json')))
+        self.assertFalse(policy.is_retryable('remotedl/add', error))
+        self.assertFalse(policy.is_retryable('file/delete', error))
+        self.assertFalse(policy.is_retryable('file/info', FileNotFoundException('gone')))
+
+    def test_opt_in(self):
+        error = ServerErrorException('down')
+
+        self.assertTrue(RetryPolicy(unsafe_endpoints=['file/delete']).is_retryable('file/delete', error))
+        self.assertTrue(RetryPolicy(unsafe_endpoints=True).is_retryable('upload', error))
+
+    def test_too_many_requests_always_retried(self):
+        self.assertTrue(RetryPolicy().is_retryable('remotedl/add', TooManyRequestsException('slow down')))
+
+    def test_throttled_not_retried_when_disabled(self):
+        policy = RetryPolicy(retry_throttled=False, retry_exceptions=(BandwidthUsageExceeded,))
+
+        self.assertFalse(policy.is_retryable('file/info', TooManyRequestsException('slow down')))
+        self.assertFalse(policy.is_retryable('file/info', BandwidthUsageExceeded('over quota')))
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5, jitter=False)
+        self.assertEqual([policy.backoff_delay(attempt) for attempt in range(1, 6)], [1, 2, 4, 5, 5])
+
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+        self.assertTrue(all(0 <= policy.backoff_delay(4) <= 5 for _ in range(100)))
+
+    def test_limits(self):
+        policy = RetryPolicy(max_attempts=3, backoff=10, jitter=False, max_elapsed=15)
+        error = ServerErrorException('down')
+        now = clock()
+
+        self.assertEqual(policy.next_delay('file/info', error, 1, started_at=now), 10)
+        self.assertIsNone(policy.next_delay('file/info', error, 2, started_at=now))
+        self.assertIsNone(policy.next_delay('file/info', error, 3, started_at=now))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_and_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record(ServerErrorException('down'))
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertRaises(CircuitOpenException, breaker.before_call)
+
+        time.sleep(0.06)
+        breaker.before_call()
+        self.assertRaises(CircuitOpenException, breaker.before_call)
+
+        breaker.record()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_api_errors_are_not_failures(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record(FileNotFoundException('gone'))
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestClientRetries(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key', retry_policy=RetryPolicy(backoff=0.001))
+        self.ol.api_url = self.server.api_url
+
+        self.file_path = os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), 'file.txt')
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_transient_errors_are_retried(self):
+        self.server.fail('file/listfolder')
+        self.server.fail('file/listfolder', body=b'<html>Bad Gateway</html>')
+
+        self.assertIn('files', self.ol.list_folder())
+        self.assertEqual(self.server.count('file/listfolder'), 3)
+
+    def test_unsafe_calls_are_not_retried(self):
+        self.server.fail('file/delete')
+
+        self.assertRaises(ServerErrorException, self.ol.delete_file, 'a')
+        self.assertEqual(self.server.count('file/delete'), 1)
+
+    def test_gives_up(self):
+        self.server.fail('file/info', times=10)
+
+        self.assertRaises(ServerErrorException, self.ol.file_info, 'a')
+        self.assertEqual(self.server.count('file/info'), 4)
+
+    def test_upload_retried_when_opted_in(self):
+        self.ol.retry_policy = RetryPolicy(backoff=0.001, unsafe_endpoints=['upload'])
+        self.server.fail('upload')
+
+        self.assertEqual(self.ol.upload_file(self.file_path).get('name'), 'file.txt')
+        self.assertEqual(self.server.count('upload'), 2)
+
+    def test_circuit_breaker_fails_fast(self):
+        self.ol.retry_policy = None
+        self.ol.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.server.fail('account/info', times=2)
+
+        for _ in range(2):
+            self.assertRaises(ServerErrorException, self.ol.account_info)
+
+        self.assertRaises(CircuitOpenException, self.ol.account_info)
+        self.assertEqual(self.server.count('account/info'), 2)
+
+    def test_circuit_breaker_counts_uploads(self):
+        self.ol.retry_policy = None
+        self.ol.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        self.server.fail('upload')
+
+        self.assertRaises(ServerErrorException, self.ol.upload_file, self.file_path)
+
+        self.assertRaises(CircuitOpenException, self.ol.upload_file, self.file_path)
+        self.assertEqual(self.server.count('upload'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
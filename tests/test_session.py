@@ -0,0 +1,77 @@
+import os
+import unittest
+
+import requests
+
+import openload
+from benchmarks.stub_server import StubServer
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+        self.file_path = os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), 'file.txt')
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_calls_reuse_connection(self):
+        for _ in range(10):
+            self.ol.file_info('72fA-_Lq8Ak3')
+        self.ol.account_info()
+        self.ol.list_folder()
+
+        self.assertEqual(self.server.connections, 1)
+
+    def test_upload_file_uses_session(self):
+        file_info = self.ol.upload_file(self.file_path)
+
+        self.assertEqual(file_info.get('name'), 'file.txt')
+        self.assertEqual(self.server.connections, 1)
+
+    def test_timeout(self):
+        self.server.latency = 0.5
+        ol = openload.OpenLoad('login', 'key', timeout=0.05)
+        ol.api_url = self.server.api_url
+
+        with ol:
+            self.assertRaises(requests.exceptions.Timeout, ol.account_info)
+
+    def test_context_manager_closes_session(self):
+        with openload.OpenLoad('login', 'key') as ol:
+            ol.api_url = self.server.api_url
+            ol.account_info()
+            adapter = ol.session.get_adapter(self.server.url)
+            self.assertEqual(len(adapter.poolmanager.pools), 1)
+
+        self.assertEqual(len(adapter.poolmanager.pools), 0)
+
+    def test_external_session_is_not_closed(self):
+        session = requests.Session()
+        with openload.OpenLoad('login', 'key', session=session) as ol:
+            ol.api_url = self.server.api_url
+            ol.account_info()
+
+        adapter = session.get_adapter(self.server.url)
+        self.assertEqual(len(adapter.poolmanager.pools), 1)
+        session.close()
+
+    def test_pool_options(self):
+        ol = openload.OpenLoad('login', 'key', pool_connections=3, pool_maxsize=7, pool_block=True)
+        adapter = ol.session.get_adapter('https://api.openload.co/')
+
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertTrue(adapter._pool_block)
+        ol.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
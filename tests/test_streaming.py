@@ -0,0 +1,123 @@
+import hashlib
+import io
+import os
+import unittest
+
+import openload
+from openload.api_exceptions import ChecksumMismatchException
+from openload.retry import RetryPolicy
+from openload.streaming import HashingReader, multipart_stream, source_length
+from benchmarks.stub_server import StubServer
+
+
+class CountingFile(io.BytesIO):
+    def __init__(self, content):
+        io.BytesIO.__init__(self, content)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = io.BytesIO.read(self, size)
+        self.bytes_read += len(data)
+        return data
+
+
+class Pipe(object):
+    """File-like object without length, position nor file descriptor."""
+
+    def __init__(self, content):
+        self._content = io.BytesIO(content)
+
+    def read(self, size=-1):
+        return self._content.read(size)
+
+
+class TestStreamingHelpers(unittest.TestCase):
+    def test_hashing_reader(self):
+        hasher = hashlib.sha1()
+        reader = HashingReader(io.BytesIO(b'abcdef'), 4, hasher)
+
+        self.assertEqual(reader.len, 4)
+        self.assertEqual(reader.read(3), b'abc')
+        self.assertEqual(reader.len, 1)
+        self.assertEqual(reader.read(), b'd')
+        self.assertEqual(reader.read(), b'')
+        self.assertEqual(hasher.hexdigest(), hashlib.sha1(b'abcd').hexdigest())
+
+    def test_source_length(self):
+        f = io.BytesIO(b'abcdef')
+        f.read(2)
+
+        self.assertEqual(source_length(f), 4)
+        self.assertEqual(f.tell(), 2)
+        self.assertIsNone(source_length(Pipe(b'abc')))
+
+    def test_multipart_stream(self):
+        hasher = hashlib.sha1()
+        content_type, body = multipart_stream('files', 'a "b".txt', iter([b'12', b'', b'34']), hasher)
+        body = b''.join(body)
+
+        self.assertTrue(content_type.startswith('multipart/form-data; boundary='))
+        self.assertIn(b'filename="a \\"b\\".txt"', body)
+        self.assertIn(b'\r\n\r\n1234\r\n--', body)
+        self.assertEqual(hasher.hexdigest(), hashlib.sha1(b'1234').hexdigest())
+
+
+class TestStreamingUpload(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+        self.file_path = os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), 'file.txt')
+        self.content = os.urandom(300 * 1024)
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_path_with_verification(self):
+        file_info = self.ol.upload_file(self.file_path, verify_sha1=True)
+
+        with open(self.file_path, 'rb') as f:
+            self.assertEqual(file_info['sha1'], hashlib.sha1(f.read()).hexdigest())
+
+    def test_file_like_is_read_once(self):
+        f = CountingFile(self.content)
+        file_info = self.ol.upload_file(f, file_name='video.mp4', verify_sha1=True)
+
+        self.assertEqual(self.server.uploads, [('video.mp4', self.content)])
+        self.assertEqual(file_info['name'], 'video.mp4')
+        self.assertEqual(f.bytes_read, len(self.content))
+
+    def test_generator(self):
+        chunks = (self.content[i:i + 4096] for i in range(0, len(self.content), 4096))
+        self.ol.upload_file(chunks, file_name='stream.bin', verify_sha1=True)
+
+        self.assertEqual(self.server.uploads, [('stream.bin', self.content)])
+
+    def test_file_like_without_length(self):
+        self.ol.upload_file(Pipe(self.content), verify_sha1=True)
+
+        self.assertEqual(self.server.uploads, [('file', self.content)])
+
+    def test_checksum_mismatch(self):
+        self.server.upload_result = {'sha1': '0' * 40}
+
+        self.assertRaises(ChecksumMismatchException, self.ol.upload_file, io.BytesIO(b'abc'), verify_sha1=True)
+
+    def test_file_like_rewound_on_retry(self):
+        self.ol.retry_policy = RetryPolicy(backoff=0.001, unsafe_endpoints=['upload'])
+        self.server.fail('upload')
+        f = io.BytesIO(b'header' + self.content)
+        f.read(6)
+
+        self.ol.upload_file(f, verify_sha1=True)
+
+        self.assertEqual(self.server.uploads, [('file', self.content)])
+
+
+if __name__ == '__main__':
+    unittest.main()
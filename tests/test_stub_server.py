@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import openload
+from openload.api_exceptions import ServerErrorException, TooManyRequestsException
+from benchmarks import suite
+from benchmarks.stub_server import StubServer
+
+
+class TestStubServer(unittest.TestCase):
+    def setUp(self):
+        self.ol = openload.OpenLoad('login', 'key')
+
+    def tearDown(self):
+        self.ol.close()
+
+    def serve(self, **options):
+        server = StubServer(**options)
+        server.start()
+        self.addCleanup(server.stop)
+        self.ol.api_url = server.api_url
+        return server
+
+    def outcomes(self, calls):
+        outcomes = []
+        for _ in range(calls):
+            try:
+                self.ol.account_info()
+                outcomes.append('ok')
+            except (ServerErrorException, TooManyRequestsException) as e:
+                outcomes.append(type(e).__name__)
+        return outcomes
+
+    def test_throttle(self):
+        server = self.serve(throttle=5)
+
+        outcomes = self.outcomes(8)
+
+        self.assertEqual(outcomes[:5], ['ok'] * 5)
+        self.assertIn('TooManyRequestsException', outcomes[5:])
+        self.assertEqual(server.throttled, outcomes.count('TooManyRequestsException'))
+
+    def test_error_rate_is_repeatable(self):
+        server = self.serve(error_rate=0.3, seed=7)
+        first = self.outcomes(50)
+        server.stop()
+
+        self.serve(error_rate=0.3, seed=7)
+
+        self.assertEqual(self.outcomes(50), first)
+        self.assertEqual(server.errors, first.count('ServerErrorException'))
+        self.assertTrue(0 < server.errors < 50)
+
+    def test_payload_sizes(self):
+        server = self.serve()
+        server.set_listing(folders=3, files=250)
+        server.set_remote_statuses(40)
+
+        listing = self.ol.list_folder()
+
+        self.assertEqual((len(listing['folders']), len(listing['files'])), (3, 250))
+        self.assertEqual(len(set(f['linkextid'] for f in listing['files'])), 250)
+        self.assertEqual(len(self.ol.remote_upload_status(limit=100)), 40)
+
+
+class TestSuite(unittest.TestCase):
+    def test_run_save_and_compare(self):
+        results = suite.run(['account_info', 'list_folder', 'upload_file', 'download'], calls=5, transfers=2,
+                            size=64 * 1024, listing=50, isolate=False, latency=0.001)
+
+        self.assertEqual(list(results), ['account_info', 'list_folder', 'upload_file', 'download'])
+        for stats in results.values():
+            self.assertEqual(stats['errors'], 0)
+            self.assertGreater(stats['calls_per_s'], 0)
+            self.assertGreaterEqual(stats['p99_ms'], stats['p50_ms'])
+        self.assertIsNone(results['account_info']['mb_per_s'])
+        self.assertGreater(results['download']['mb_per_s'], 0)
+
+        table = suite.report(results, baseline=json.loads(json.dumps(results)))
+        self.assertEqual(table.count('vs baseline'), 4)
+        self.assertIn('+0%', table)
+
+    def test_main_saves_results(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'results', 'run.json')
+
+        suite.main(['--cases', 'file_info', '--calls', '3', '--in-process', '--save', path])
+
+        with open(path) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['settings']['calls'], 3)
+        self.assertEqual(saved['results']['file_info']['calls'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+import openload
+from openload.index import AccountIndex
+from openload.sync import sync
+from benchmarks.stub_server import StubServer
+
+
+def remote_file(linkextid, name, content):
+    return {'linkextid': linkextid, 'name': name, 'size': str(len(content)),
+            'sha1': hashlib.sha1(content).hexdigest(), 'content_type': 'video/mp4'}
+
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.directory = tempfile.mkdtemp()
+        self.write('a.mp4', b'same')
+        self.write('b.mp4', b'new version')
+        self.write('c.mp4', b'moved')
+        self.write('d.mp4', b'new file')
+        self.write(os.path.join('sub', 'e.mp4'), b'in sub')
+        self.write(os.path.join('nofolder', 'f.mp4'), b'no folder')
+
+        self.tree = {
+            'home': {'folders': [{'id': '7', 'name': 'sub'}],
+                     'files': [remote_file('A', 'a.mp4', b'same'), remote_file('B', 'b.mp4', b'old version'),
+                               remote_file('C', 'old_c.mp4', b'moved'), remote_file('Z', 'z.mp4', b'gone')]},
+            '7': {'folders': [], 'files': []},
+        }
+        self.server.set_result('file/listfolder', lambda params: self.tree[params.get('folder', 'home')])
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+        self.index = AccountIndex(self.ol, ':memory:')
+
+    def tearDown(self):
+        self.index.close()
+        self.ol.close()
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def summary(self, actions):
+        return sorted((action.kind, action.name or os.path.basename(action.path), action.file_id)
+                      for action in actions)
+
+    def changes(self):
+        return [(endpoint, params.get('file'), params.get('name')) for _, endpoint, params in self.server.requests
+                if endpoint in ('upload', 'file/rename', 'file/delete')]
+
+    def test_dry_run(self):
+        actions = sync(self.index, self.directory, dry_run=True, delete=True)
+
+        self.assertEqual(self.summary(actions), [
+            ('delete', 'z.mp4', 'Z'),
+            ('missing_folder', 'nofolder', None),
+            ('rename', 'c.mp4', 'C'),
+            ('replace', 'b.mp4', 'B'),
+            ('upload', 'd.mp4', None),
+            ('upload', 'e.mp4', None),
+        ])
+        self.assertEqual(self.changes(), [])
+
+    def test_sync(self):
+        actions = sync(self.index, self.directory)
+
+        self.assertTrue(all(action.ok for action in actions))
+        self.assertEqual(sorted(name for name, _ in self.server.uploads), ['b.mp4', 'd.mp4', 'e.mp4'])
+        self.assertIn(('file/rename', 'C', 'c.mp4'), self.changes())
+        self.assertIn(('file/delete', 'B', None), self.changes())
+        self.assertNotIn(('file/delete', 'Z', None), self.changes())
+        self.assertEqual(self.index.find(name='e.mp4')[0]['folderid'], '7')
+
+        del self.server.requests[:]
+        actions = sync(self.index, self.directory)
+
+        self.assertEqual(self.summary(actions), [('missing_folder', 'nofolder', None)])
+        self.assertEqual(self.server.requests, [])
+
+    def test_changed_file_only(self):
+        sync(self.index, self.directory)
+        uploaded = self.index.find(name='d.mp4')[0]['linkextid']
+        del self.server.requests[:]
+        self.write('d.mp4', b'edited file')
+
+        actions = sync(self.index, self.directory)
+
+        self.assertEqual(self.summary(actions), [('missing_folder', 'nofolder', None), ('replace', 'd.mp4', uploaded)])
+
+    def test_openload_sync(self):
+        # The state file is inside the synced directory, it must not be uploaded.
+        state_path = os.path.join(self.directory, 'state.sqlite')
+        self.ol.sync(self.directory, state_path=state_path, delete=True)
+        del self.server.requests[:]
+
+        actions = self.ol.sync(self.directory, state_path=state_path, delete=True)
+
+        self.assertEqual([action.kind for action in actions], ['missing_folder'])
+        self.assertEqual(self.server.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
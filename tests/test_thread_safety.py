@@ -0,0 +1,109 @@
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import openload
+from openload.cache import ResponseCache
+from benchmarks.stub_server import StubServer
+
+THREADS = 64
+CALLS = 20
+
+
+class TestThreadSafety(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.file_path = os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), 'file.txt')
+
+    def tearDown(self):
+        self.server.stop()
+
+    def client(self, **options):
+        ol = openload.OpenLoad('login', 'key', **options)
+        ol.api_url = self.server.api_url
+        self.addCleanup(ol.close)
+        return ol
+
+    def run_threads(self, function, threads=THREADS):
+        executor = ThreadPoolExecutor(max_workers=threads)
+        try:
+            return list(executor.map(function, range(threads)))
+        finally:
+            executor.shutdown()
+
+    def test_shared_instance(self):
+        ol = self.client(pool_maxsize=16, pool_block=True, cache=ResponseCache())
+
+        def work(worker):
+            mismatches = 0
+            for call in range(CALLS):
+                file_id = 'w{0}c{1}'.format(worker, call)
+                if list(ol.file_info(file_id)) != [file_id]:
+                    mismatches += 1
+                if ol.account_info()['extid'] != 'extuserid':
+                    mismatches += 1
+                ol.list_folder('4258')
+            if ol.upload_file(self.file_path).get('name') != 'file.txt':
+                mismatches += 1
+            return mismatches
+
+        self.assertEqual(self.run_threads(work), [0] * THREADS)
+
+        api_calls = [params for method, _, params in self.server.requests if method == 'GET']
+        self.assertEqual(self.server.count('file/info'), THREADS * CALLS)
+        self.assertLess(self.server.count('account/info'), THREADS * CALLS)
+        self.assertEqual(self.server.count('upload'), THREADS)
+        self.assertTrue(all(params['login'] == 'login' and params['key'] == 'key' for params in api_calls))
+        self.assertLessEqual(self.server.connections, 16)
+        self.assertLessEqual(self.server.max_in_flight, 16)
+
+    def test_params_are_not_modified(self):
+        ol = self.client()
+        params = {'folder': '4258'}
+
+        self.run_threads(lambda worker: ol._get('file/listfolder', params), threads=16)
+
+        self.assertEqual(params, {'folder': '4258'})
+        self.assertEqual(self.server.requests[-1][2], {'folder': '4258', 'login': 'login', 'key': 'key'})
+
+    def test_session_per_thread(self):
+        ol = self.client(session_per_thread=True)
+        sessions = set()
+        # Every task waits for the 8 to have started, so each one runs in a thread of its own
+        # (threading.Barrier is not available on Python 2).
+        started = [0]
+        all_started = threading.Condition()
+
+        def work(worker):
+            with all_started:
+                started[0] += 1
+                all_started.notify_all()
+                while started[0] < 8:
+                    all_started.wait()
+            for _ in range(CALLS):
+                ol.account_info()
+            sessions.add(ol.session)
+            return ol.session.get_adapter(self.server.url)
+
+        adapters = self.run_threads(work, threads=8)
+
+        self.assertEqual(len(sessions), 8)
+        self.assertEqual(self.server.connections, 8)
+        ol.close()
+        self.assertEqual([len(adapter.poolmanager.pools) for adapter in adapters], [0] * 8)
+
+    def test_session_per_thread_with_session(self):
+        session = requests.Session()
+        self.addCleanup(session.close)
+
+        self.assertRaises(ValueError, openload.OpenLoad, 'login', 'key', session=session, session_per_thread=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import openload
+from openload.api_exceptions import CaptchaRequiredException, FileNotFoundException
+from benchmarks.stub_server import StubServer
+
+
+class TestTicketScheduler(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+        self.file_ids = ['f{0}'.format(i) for i in range(8)]
+        for file_id in self.file_ids:
+            self.server.add_file(file_id, file_id.encode('ascii') * 100, name=file_id + '.bin')
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def set_ticket(self, **values):
+        self.server.set_result('file/dlticket', dict(self.server.results['file/dlticket'], **values))
+
+    def test_waits_overlap(self):
+        self.set_ticket(wait_time=0.3)
+
+        started_at = time.time()
+        results = list(self.ol.download_links(self.file_ids))
+        elapsed = time.time() - started_at
+
+        self.assertEqual(sorted(result.file_id for result in results), self.file_ids)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertTrue(all(result.link['name'] == result.file_id + '.bin' for result in results))
+        self.assertGreaterEqual(elapsed, 0.3)
+        self.assertLess(elapsed, 1.0)
+
+    def test_captcha_queue(self):
+        self.set_ticket(captcha_url='https://openload.co/dlcaptcha/b9.png')
+        lock = threading.Lock()
+        solving = [0, 0]
+
+        def solve(ticket):
+            with lock:
+                solving[0] += 1
+                solving[1] = max(solving)
+            time.sleep(0.02)
+            with lock:
+                solving[0] -= 1
+            return 'solution'
+
+        results = list(self.ol.download_links(self.file_ids, captcha_solver=solve, captcha_workers=2))
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(solving[1], 2)
+        self.assertTrue(all(params['captcha_response'] == 'solution'
+                            for _, endpoint, params in self.server.requests if endpoint == 'file/dl'))
+
+    def test_captcha_without_solver(self):
+        self.set_ticket(captcha_url='https://openload.co/dlcaptcha/b9.png')
+        results = list(self.ol.download_links(self.file_ids[:2]))
+
+        self.assertTrue(all(isinstance(result.error, CaptchaRequiredException) for result in results))
+        self.assertEqual(self.server.count('file/dl'), 0)
+
+    def test_expired_ticket_is_requested_again(self):
+        self.set_ticket(valid_until='2000-01-01 00:00:00')
+        results = list(self.ol.download_links(self.file_ids[:3]))
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(self.server.count('file/dlticket'), 6)
+
+    def test_errors(self):
+        self.server.fail('file/dlticket', status=404, msg='File not found')
+        results = list(self.ol.download_links(self.file_ids[:1]))
+
+        self.assertIsInstance(results[0].error, FileNotFoundException)
+
+    def test_download_with_link(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for result in self.ol.download_links(self.file_ids[:2]):
+                path = self.ol.download(result.file_id, directory, link=result.link)
+                with open(path, 'rb') as f:
+                    self.assertEqual(f.read(), result.file_id.encode('ascii') * 100)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(self.server.count('file/dlticket'), 2)
+        self.assertEqual(self.server.count('file/dl'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import time
+import threading
+import unittest
+
+import openload
+from openload.api_exceptions import ServerErrorException
+from openload.upload_pool import UploadLinkPool, parse_api_time
+from benchmarks.stub_server import StubServer
+
+
+class FakeApi(object):
+    def __init__(self, valid_until='2035-08-19 19:06:46'):
+        self.valid_until = valid_until
+        self.calls = []
+        self.error = None
+        self._lock = threading.Lock()
+
+    def __call__(self, folder_id, httponly):
+        with self._lock:
+            self.calls.append((folder_id, httponly))
+            count = len(self.calls)
+        if self.error is not None:
+            raise self.error
+        return {'url': 'https://upload/{0}'.format(count), 'valid_until': self.valid_until}
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestUploadLinkPool(unittest.TestCase):
+    def test_parse_api_time(self):
+        self.assertEqual(parse_api_time('1970-01-02 00:00:00'), 86400.0)
+        self.assertIsNone(parse_api_time(None))
+        self.assertIsNone(parse_api_time('tomorrow'))
+
+    def test_links_are_kept_ready(self):
+        api = FakeApi()
+        with UploadLinkPool(api, size=3) as pool:
+            first = pool.get('4258')
+
+            self.assertTrue(wait_for(lambda: pool.ready('4258') == 3))
+            urls = set(pool.get('4258') for _ in range(3))
+            self.assertEqual(len(urls | set([first])), 4)
+            self.assertEqual(pool.ready('1'), 0)
+            self.assertTrue(all(call == ('4258', False) for call in api.calls))
+
+    def test_expired_links_are_discarded(self):
+        api = FakeApi(valid_until='2000-01-01 00:00:00')
+        with UploadLinkPool(api, size=2) as pool:
+            pool.get()
+            self.assertTrue(wait_for(lambda: len(api.calls) >= 3))
+            self.assertEqual(pool.ready(), 0)
+
+    def test_max_age(self):
+        api = FakeApi()
+        with UploadLinkPool(api, size=1, max_age=0.05) as pool:
+            pool.get()
+            self.assertTrue(wait_for(lambda: pool.ready() == 1))
+            time.sleep(0.06)
+            self.assertEqual(pool.ready(), 0)
+
+    def test_failing_refill_raises(self):
+        api = FakeApi()
+        api.error = ServerErrorException('down')
+        with UploadLinkPool(api, size=2) as pool:
+            self.assertRaises(ServerErrorException, pool.get)
+
+    def test_closed(self):
+        pool = UploadLinkPool(FakeApi())
+        pool.close()
+        self.assertRaises(RuntimeError, pool.get)
+
+
+class TestUploadWithPool(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+
+        self.ol = openload.OpenLoad('login', 'key', upload_link_pool_size=2)
+        self.ol.api_url = self.server.api_url
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_upload_takes_ready_link(self):
+        self.ol.upload_link_pool.get()
+        self.assertTrue(wait_for(lambda: self.ol.upload_link_pool.ready() == 2))
+        link_requests = self.server.count('file/ul')
+
+        self.ol.upload_file(__file__)
+
+        self.assertEqual(len(self.server.uploads), 1)
+        self.assertTrue(wait_for(lambda: self.ol.upload_link_pool.ready() == 2))
+        # The link used was ready, the one fetched afterwards only refills the pool.
+        self.assertEqual(self.server.count('file/ul'), link_requests + 1)
+
+    def test_sha1_bypasses_pool(self):
+        self.ol.upload_file(__file__, sha1='0' * 40)
+
+        params = [params for _, endpoint, params in self.server.requests if endpoint == 'file/ul']
+        self.assertEqual(params[0]['sha1'], '0' * 40)
+        self.assertEqual(self.ol.upload_link_pool.ready(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import openload
+from openload.api_exceptions import ServerErrorException
+from benchmarks.stub_server import StubServer
+
+
+def tree_listing(depth, breadth):
+    """Builds a list_folder result function of a tree where each folder has breadth subfolders and 2 files."""
+    def listing(params):
+        folder_id = params.get('folder', 'home')
+        level = folder_id.count('.')
+        folders = []
+        if level < depth:
+            folders = [{'id': '{0}.{1}'.format(folder_id, i), 'name': 'dir{0}'.format(i)} for i in range(breadth)]
+        files = [{'name': name, 'linkextid': folder_id + name, 'folderid': folder_id}
+                 for name in ('video.mp4', 'notes.txt')]
+        return {'folders': folders, 'files': files}
+    return listing
+
+
+class TestWalk(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.start()
+        self.server.set_result('file/listfolder', tree_listing(depth=3, breadth=3))
+
+        self.ol = openload.OpenLoad('login', 'key')
+        self.ol.api_url = self.server.api_url
+
+    def tearDown(self):
+        self.ol.close()
+        self.server.stop()
+
+    def test_walks_whole_tree(self):
+        walked = list(self.ol.walk())
+        paths = [folder['path'] for folder, _, _ in walked]
+
+        self.assertEqual(len(walked), 1 + 3 + 9 + 27)
+        self.assertEqual(len(set(paths)), len(paths))
+        self.assertIn('dir2/dir0/dir1', paths)
+        self.assertEqual(walked[0][0]['path'], '')
+        for folder, subfolders, files in walked:
+            self.assertEqual(len(files), 2)
+            self.assertTrue(all(sub['depth'] == folder['depth'] + 1 for sub in subfolders))
+
+    def test_listings_are_concurrent(self):
+        self.server.latency = 0.02
+        list(self.ol.walk(workers=4))
+
+        self.assertEqual(self.server.max_in_flight, 4)
+
+    def test_max_depth(self):
+        walked = list(self.ol.walk(max_depth=1))
+
+        self.assertEqual(len(walked), 4)
+        self.assertEqual(self.server.count('file/listfolder'), 4)
+
+    def test_filters(self):
+        walked = list(self.ol.walk(folder_filter='dir[01]', file_filter=['*.mp4', '*.mkv']))
+
+        self.assertEqual(len(walked), 1 + 2 + 4 + 8)
+        self.assertTrue(all(f['name'] == 'video.mp4' for _, _, files in walked for f in files))
+        self.assertTrue(all('dir2' not in folder['path'] for folder, _, _ in walked))
+
+    def test_subfolder(self):
+        walked = list(self.ol.walk('home.1', max_depth=0))
+
+        self.assertEqual(len(walked), 1)
+        self.assertEqual([sub['path'] for sub in walked[0][1]], ['dir0', 'dir1', 'dir2'])
+
+    def test_lazy(self):
+        walker = self.ol.walk(workers=2)
+        next(walker)
+        walker.close()
+
+        self.assertLess(self.server.count('file/listfolder'), 5)
+
+    def test_errors(self):
+        self.server.fail('file/listfolder', times=1)
+        self.assertRaises(ServerErrorException, list, self.ol.walk())
+
+        errors = []
+        self.server.fail('file/listfolder', times=1)
+        walked = list(self.ol.walk(onerror=lambda folder, e: errors.append(folder)))
+
+        self.assertEqual(walked, [])
+        self.assertEqual(errors[0]['path'], '')
+
+
+if __name__ == '__main__':
+    unittest.main()